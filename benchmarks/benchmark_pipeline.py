@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# Proyecto: Content Processor
+# Script: Benchmark de extremo a extremo contra servicios simulados
+# Autor: Eduardo Llaguno Velasco
+
+"""
+Ejecuta generar_noticias y generar_articulo de principio a fin contra los
+servicios de benchmarks/servicios_simulados.py, sin tocar APIs de pago ni un
+sitio real.
+
+Cada escenario (modo, número de temas, concurrencia, backend de WordPress)
+corre en un proceso propio con un directorio de almacenamiento temporal, de
+modo que la memoria pico y las cachés de un escenario no afectan a los demás.
+Los resultados (publicaciones por segundo, latencia p50/p95 y RSS pico) se
+escriben en benchmarks/resultados/<fecha>.json y se pueden comparar con una
+ejecución anterior mediante --comparar.
+
+Uso:
+    python -m benchmarks.benchmark_pipeline --temas 2,5,10 --concurrencia 1,4 --iteraciones 3
+    python -m benchmarks.benchmark_pipeline --modos articulo --comparar benchmarks/resultados/anterior.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+SITIO = 'benchmark'
+PREFIJO_RESULTADO = 'RESULTADO '
+
+
+def percentil(valores, p):
+    """Percentil con interpolación lineal; None si no hay valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def rss_pico_mb(quien=resource.RUSAGE_SELF):
+    """RSS pico en MB (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    maximo = resource.getrusage(quien).ru_maxrss
+    return round(maximo / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def construir_config(escenario, base_url):
+    """Configuración equivalente a la de producción, apuntando a los servicios simulados."""
+    sitio = {
+        'url': f"{base_url}/xmlrpc.php",
+        'username': 'benchmark',
+        'password': 'benchmark'
+    }
+    if escenario['backend'] == 'rest':
+        sitio.update({
+            'backend': 'rest',
+            'rest_url': f"{base_url}/wp-json/wp/v2",
+            'application_password': 'benchmark'
+        })
+
+    return {
+        'openai': {
+            'api_key': 'sk-benchmark',
+            'model': 'gpt-4o',
+            'image_model': 'dall-e-3',
+            'base_url': f"{base_url}/v1",
+            'cache': {'enabled': False}
+        },
+        'http': {'feed_cache': {'enabled': False}},
+        'metrics': {'enabled': False},
+        'image_settings': {
+            'save_local': False,
+            'watermark': {'enabled': True, 'path': os.path.join(RAIZ, 'assets', 'sello.svg')}
+        },
+        'content_settings': {
+            'article': {'stream': escenario.get('stream', False), 'max_words': escenario.get('max_palabras', 2000)},
+            'news': {
+                'max_concurrent_summaries': escenario['concurrencia'],
+                'feed_base_url': base_url,
+                'batch_summaries': escenario.get('agrupar', False),
+                'check_wordpress': True
+            }
+        },
+        'sites': {SITIO: sitio},
+        'article_topics': [f"Tema de artículo {i}" for i in range(1, escenario['concurrencia'] + 1)],
+        'news_topics': [
+            {'nombre': f"Tema {i}", 'imagen': f"{base_url}/wp-content/uploads/tema-{i}.png"}
+            for i in range(1, escenario['temas'] + 1)
+        ]
+    }
+
+
+async def ejecutar_escenario(escenario):
+    """
+    Corre un escenario dentro del proceso actual.
+
+    En modo 'noticias' cada iteración es un resumen completo con
+    'concurrencia' resúmenes simultáneos. En modo 'articulo' cada iteración
+    lanza 'concurrencia' artículos a la vez.
+    """
+    # Importar después de fijar PUBLICADOR_STORAGE_DIR
+    from src.crea_articulo import generar_articulo
+    from src.crea_noticias import generar_noticias
+    from src.utils.metrics_utils import metricas
+    from src.utils.openai_utils import cerrar_clientes_openai
+    from src.utils.wordpress_rest_utils import cerrar_clientes_rest
+
+    config = construir_config(escenario, escenario['base_url'])
+
+    async def publicar(tema=None):
+        inicio = time.monotonic()
+        if escenario['modo'] == 'noticias':
+            await generar_noticias(SITIO, config)
+        else:
+            await generar_articulo(tema, SITIO, config)
+        return time.monotonic() - inicio
+
+    async def iteracion():
+        if escenario['modo'] == 'noticias':
+            return await asyncio.gather(publicar(), return_exceptions=True)
+        return await asyncio.gather(
+            *(publicar(tema) for tema in config['article_topics']), return_exceptions=True
+        )
+
+    latencias = []
+    errores = []
+    try:
+        # Las iteraciones de calentamiento llenan las cachés de taxonomías y arrancan los pools
+        for _ in range(escenario['calentamiento']):
+            await iteracion()
+        metricas.reiniciar()
+
+        inicio = time.monotonic()
+        for _ in range(escenario['iteraciones']):
+            for resultado in await iteracion():
+                if isinstance(resultado, Exception):
+                    errores.append(f"{type(resultado).__name__}: {resultado}")
+                else:
+                    latencias.append(resultado)
+        duracion = time.monotonic() - inicio
+    finally:
+        await cerrar_clientes_openai()
+        await cerrar_clientes_rest()
+
+    etapas = {}
+    for etapa in metricas.resumen()['etapas']:
+        nombre = etapa['etapa'] + ''.join(f"[{v}]" for _, v in sorted(etapa['etiquetas'].items()))
+        etapas[nombre] = etapa['segundos_total']
+
+    return {
+        'publicaciones': len(latencias),
+        'errores': len(errores),
+        'detalle_errores': errores[:5],
+        'segundos': round(duracion, 3),
+        'publicaciones_por_segundo': round(len(latencias) / duracion, 4) if duracion else None,
+        'latencia_p50': round(percentil(latencias, 50), 3) if latencias else None,
+        'latencia_p95': round(percentil(latencias, 95), 3) if latencias else None,
+        'latencia_max': round(max(latencias), 3) if latencias else None,
+        'rss_pico_mb': rss_pico_mb(),
+        'rss_pico_hijos_mb': rss_pico_mb(resource.RUSAGE_CHILDREN),
+        'etapas_segundos': etapas
+    }
+
+
+def correr_worker(escenario_json):
+    """Punto de entrada del proceso hijo: imprime el resultado en una sola línea."""
+    escenario = json.loads(escenario_json)
+    resultado = asyncio.run(ejecutar_escenario(escenario))
+    print(PREFIJO_RESULTADO + json.dumps(resultado, ensure_ascii=False), flush=True)
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servicios(args, puerto):
+    """Arranca los servicios simulados en otro proceso y espera a que respondan."""
+    proceso = subprocess.Popen(
+        [
+            sys.executable, '-m', 'benchmarks.servicios_simulados',
+            '--puerto', str(puerto),
+            '--latencia-llm', str(args.latencia_llm),
+            '--tokens-por-segundo', str(args.tokens_por_segundo),
+            '--tokens-respuesta', str(args.tokens_respuesta),
+            '--latencia-imagen', str(args.latencia_imagen),
+            '--latencia-feed', str(args.latencia_feed),
+            '--latencia-wp', str(args.latencia_wp)
+        ],
+        cwd=RAIZ
+    )
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("Los servicios simulados terminaron al arrancar")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_estadisticas", timeout=1).read()
+            return proceso
+        except OSError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError("Los servicios simulados no respondieron a tiempo")
+
+
+def correr_escenario_en_subproceso(escenario):
+    """Ejecuta un escenario en un proceso nuevo con almacenamiento temporal."""
+    with tempfile.TemporaryDirectory(prefix='publicador-bench-') as storage:
+        entorno = dict(os.environ, PUBLICADOR_STORAGE_DIR=storage)
+        proceso = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.benchmark_pipeline', '--worker', json.dumps(escenario)],
+            cwd=RAIZ, env=entorno, capture_output=True, text=True
+        )
+    for linea in reversed(proceso.stdout.splitlines()):
+        if linea.startswith(PREFIJO_RESULTADO):
+            return json.loads(linea[len(PREFIJO_RESULTADO):])
+    return {
+        'publicaciones': 0,
+        'errores': 1,
+        'detalle_errores': [proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else
+                            f"El proceso terminó con código {proceso.returncode}"]
+    }
+
+
+def generar_escenarios(args):
+    escenarios = []
+    for modo in args.modos:
+        for backend in args.backends:
+            for concurrencia in args.concurrencia:
+                # El número de temas solo aplica al resumen de noticias
+                for temas in (args.temas if modo == 'noticias' else [1]):
+                    escenarios.append({
+                        'modo': modo,
+                        'backend': backend,
+                        'temas': temas,
+                        'concurrencia': concurrencia,
+                        'iteraciones': args.iteraciones,
+                        'calentamiento': args.calentamiento,
+                        'stream': args.stream,
+                        'agrupar': args.agrupar,
+                        'max_palabras': args.max_palabras
+                    })
+    return escenarios
+
+
+def nombre_escenario(escenario):
+    return (f"{escenario['modo']}/{escenario['backend']}"
+            f"/temas={escenario['temas']}/concurrencia={escenario['concurrencia']}"
+            + ("/stream" if escenario.get('stream') else "")
+            + ("/agrupado" if escenario.get('agrupar') else ""))
+
+
+def version_codigo():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def imprimir_tabla(resultados, anteriores=None):
+    anteriores = {r['nombre']: r for r in (anteriores or [])}
+    print(f"\n{'escenario':<45} {'pub/s':>8} {'p50 s':>8} {'p95 s':>8} {'RSS MB':>8} {'errores':>8}")
+    for r in resultados:
+        fila = (f"{r['nombre']:<45} {r.get('publicaciones_por_segundo') or 0:>8.3f} "
+                f"{r.get('latencia_p50') or 0:>8.2f} {r.get('latencia_p95') or 0:>8.2f} "
+                f"{r.get('rss_pico_mb') or 0:>8.1f} {r.get('errores', 0):>8}")
+        anterior = anteriores.get(r['nombre'])
+        if anterior and anterior.get('latencia_p50') and r.get('latencia_p50'):
+            cambio = (r['latencia_p50'] - anterior['latencia_p50']) / anterior['latencia_p50'] * 100
+            fila += f"   p50 {cambio:+.1f}% vs anterior"
+        print(fila)
+
+
+def lista_enteros(valor):
+    return [int(v) for v in valor.split(',') if v.strip()]
+
+
+def lista_textos(valor):
+    return [v.strip() for v in valor.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo del publicador")
+    parser.add_argument("--modos", type=lista_textos, default=['noticias', 'articulo'],
+                        help="Modos separados por coma: noticias, articulo")
+    parser.add_argument("--backends", type=lista_textos, default=['rest'],
+                        help="Backends de WordPress separados por coma: rest, xmlrpc")
+    parser.add_argument("--temas", type=lista_enteros, default=[2, 5, 10],
+                        help="Números de temas de noticias a probar")
+    parser.add_argument("--concurrencia", type=lista_enteros, default=[1, 4],
+                        help="Resúmenes simultáneos (noticias) o artículos simultáneos (artículo)")
+    parser.add_argument("--iteraciones", type=int, default=3)
+    parser.add_argument("--calentamiento", type=int, default=1)
+    parser.add_argument("--stream", action="store_true",
+                        help="Generar el contenido de los artículos en streaming")
+    parser.add_argument("--agrupar", action="store_true",
+                        help="Resumir varios temas de noticias por llamada (batch_summaries)")
+    parser.add_argument("--max-palabras", type=int, default=2000,
+                        help="content_settings.article.max_words para los artículos")
+    parser.add_argument("--latencia-llm", type=float, default=0.3)
+    parser.add_argument("--tokens-por-segundo", type=float, default=300)
+    parser.add_argument("--tokens-respuesta", type=int, default=300)
+    parser.add_argument("--latencia-imagen", type=float, default=1.0)
+    parser.add_argument("--latencia-feed", type=float, default=0.05)
+    parser.add_argument("--latencia-wp", type=float, default=0.05)
+    parser.add_argument("--salida", help="Archivo de resultados (por defecto benchmarks/resultados/<fecha>.json)")
+    parser.add_argument("--comparar", help="Resultados anteriores contra los que comparar")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        correr_worker(args.worker)
+        return
+
+    puerto = puerto_libre()
+    servicios = iniciar_servicios(args, puerto)
+    resultados = []
+    try:
+        for escenario in generar_escenarios(args):
+            escenario['base_url'] = f"http://127.0.0.1:{puerto}"
+            print(f"Ejecutando {nombre_escenario(escenario)}...", flush=True)
+            resultado = correr_escenario_en_subproceso(escenario)
+            escenario.pop('base_url')
+            resultados.append({'nombre': nombre_escenario(escenario), 'escenario': escenario, **resultado})
+            if resultado.get('errores'):
+                print(f"  {resultado['errores']} errores: {resultado.get('detalle_errores')}")
+    finally:
+        servicios.terminate()
+        servicios.wait()
+
+    salida = args.salida or os.path.join(DIRECTORIO_RESULTADOS, time.strftime("%Y-%m-%d_%H-%M-%S") + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump({
+            'fecha': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'version': version_codigo(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'servicios': {
+                'latencia_llm': args.latencia_llm,
+                'tokens_por_segundo': args.tokens_por_segundo,
+                'tokens_respuesta': args.tokens_respuesta,
+                'latencia_imagen': args.latencia_imagen,
+                'latencia_feed': args.latencia_feed,
+                'latencia_wp': args.latencia_wp
+            },
+            'resultados': resultados
+        }, f, ensure_ascii=False, indent=2)
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anteriores = json.load(f)['resultados']
+    imprimir_tabla(resultados, anteriores)
+    print(f"\nResultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+# Proyecto: Content Processor
+# Script: Servicios simulados (Google News, OpenAI y WordPress) para benchmarks
+# Autor: Eduardo Llaguno Velasco
+
+"""
+Servidor local que imita las APIs externas que usa el publicador:
+
+- Feeds RSS de Google News (titulares y búsqueda por tema)
+- OpenAI: /v1/chat/completions y /v1/images/generations, con latencia fija
+  más un tiempo proporcional a los tokens generados, y la Batch API
+  (/v1/files y /v1/batches), cuyos lotes terminan tras --latencia-lote
+- WordPress: XML-RPC (/xmlrpc.php) y REST (/wp-json/wp/v2)
+
+Todo vive en memoria. Cada feed devuelve noticias con enlaces y titulares
+nuevos y cada imagen generada tiene bytes distintos, para que la
+deduplicación y el índice de medios no conviertan las ejecuciones
+repetidas en aciertos de caché.
+
+Uso:
+    python -m benchmarks.servicios_simulados --puerto 8765 --latencia-llm 0.5
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import random
+import re
+import time
+import xmlrpc.client
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from aiohttp import web
+from PIL import Image
+
+PALABRAS = (
+    "gobierno congreso mercado energía salud ciencia tecnología clima elecciones empresa "
+    "inversión tratado acuerdo reforma proyecto satélite vacuna universidad récord torneo "
+    "inflación exportaciones lluvias sismo programa ministro presidente banco central "
+    "investigadores datos red inteligencia artificial seguridad frontera puerto tren "
+    "hospital escuela festival cine museo agua litio petróleo aranceles turismo"
+).split()
+
+METODOS_XMLRPC = [
+    'mt.supportedMethods', 'system.multicall', 'wp.getPosts', 'wp.newPost', 'wp.uploadFile',
+    'wp.getMediaItem', 'wp.getTerms', 'wp.newTerm'
+]
+
+# Posts que se conservan para las consultas de posts recientes
+MAX_POSTS_GUARDADOS = 20
+
+
+class ServiciosSimulados:
+    """
+    Estado y manejadores de los servicios simulados.
+
+    :param latencia_llm: Segundos fijos por llamada de chat
+    :param tokens_por_segundo: Velocidad de generación simulada
+    :param tokens_respuesta: Tokens de salida por respuesta (acotados por max_tokens)
+    :param latencia_imagen: Segundos por imagen generada
+    :param latencia_feed: Segundos por feed RSS
+    :param latencia_wp: Segundos por llamada a WordPress
+    :param items_por_feed: Noticias en cada feed
+    :param lado_imagen: Lado en píxeles de las imágenes generadas
+    :param latencia_lote: Segundos hasta que un lote de la Batch API termina
+    """
+
+    def __init__(self, latencia_llm=0.3, tokens_por_segundo=300, tokens_respuesta=300,
+                 latencia_imagen=1.0, latencia_feed=0.05, latencia_wp=0.05,
+                 items_por_feed=8, lado_imagen=1024, latencia_lote=2.0, semilla=0):
+        self.latencia_llm = latencia_llm
+        self.tokens_por_segundo = tokens_por_segundo
+        self.tokens_respuesta = tokens_respuesta
+        self.latencia_imagen = latencia_imagen
+        self.latencia_feed = latencia_feed
+        self.latencia_wp = latencia_wp
+        self.items_por_feed = items_por_feed
+        self.lado_imagen = lado_imagen
+        self.latencia_lote = latencia_lote
+        self._random = random.Random(semilla)
+        self._ids = itertools.count(1000)
+        self._imagenes = itertools.count(1)
+        self._base_imagen = None
+        self.base_url = ''
+
+        self.imagenes = {}
+        self.medios = {}
+        self.archivos = {}
+        self.lotes = {}
+        self._inicio_lotes = {}
+        self.posts = []
+        self.terminos = {'category': {}, 'post_tag': {}}
+        self.peticiones = {}
+
+    # --- Utilidades ---
+
+    def _contar(self, servicio):
+        self.peticiones[servicio] = self.peticiones.get(servicio, 0) + 1
+
+    def _frase(self, palabras):
+        return ' '.join(self._random.choice(PALABRAS) for _ in range(palabras))
+
+    def _texto_html(self, tokens):
+        """Genera HTML de aproximadamente el número de tokens indicado."""
+        palabras = max(1, int(tokens * 0.75))
+        parrafos = []
+        while palabras > 0:
+            n = min(palabras, 60)
+            parrafos.append(f"<p>{self._frase(n).capitalize()}.</p>")
+            palabras -= n
+        return '\n'.join(parrafos)
+
+    def _imagen_unica(self):
+        """PNG con un patrón distinto en cada llamada (se ejecuta en un hilo)."""
+        if self._base_imagen is None:
+            lado = self.lado_imagen
+            self._base_imagen = Image.effect_noise((lado, lado), 64).convert('RGB')
+        imagen = self._base_imagen.copy()
+        numero = next(self._imagenes)
+        imagen.putpixel((0, 0), (numero % 256, (numero >> 8) % 256, (numero >> 16) % 256))
+        buffer = io.BytesIO()
+        imagen.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    # --- Google News ---
+
+    async def feed_rss(self, request):
+        self._contar('feed')
+        await asyncio.sleep(self.latencia_feed)
+        tema = request.query.get('q') or request.match_info.get('seccion', 'portada')
+        items = []
+        for _ in range(self.items_por_feed):
+            numero = next(self._ids)
+            titulo = f"{self._frase(10).capitalize()} - Medio {numero % 7}"
+            items.append(
+                "<item>"
+                f"<title>{escape(titulo)}</title>"
+                f"<link>{self.base_url}/articulos/{numero}?utm_source=rss</link>"
+                f"<pubDate>{formatdate(time.time())}</pubDate>"
+                f"<description>{escape(self._frase(30))}</description>"
+                f"<source url=\"{self.base_url}\">Medio {numero % 7}</source>"
+                "</item>"
+            )
+        xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<rss version="2.0"><channel><title>{escape(tema)}</title>{"".join(items)}</channel></rss>'
+        )
+        return web.Response(text=xml, content_type='application/rss+xml')
+
+    # --- OpenAI ---
+
+    def _completar_chat(self, cuerpo):
+        """Contenido, tokens y uso de una petición de chat (sin la espera simulada)."""
+        prompt = ' '.join(str(m.get('content', '')) for m in cuerpo.get('messages', []))
+        tokens = min(int(cuerpo.get('max_tokens') or self.tokens_respuesta), self.tokens_respuesta)
+        contenido = self._frase(8).capitalize() if tokens <= 50 else self._texto_html(tokens)
+        if (cuerpo.get('response_format') or {}).get('type') == 'json_object':
+            # Resúmenes agrupados: una sección por identificador [tema_N] del prompt
+            claves = list(dict.fromkeys(re.findall(r'\[(tema_\d+)\]', prompt)))
+            por_clave = max(60, tokens // max(len(claves), 1))
+            contenido = json.dumps({clave: self._texto_html(por_clave) for clave in claves}, ensure_ascii=False)
+        usage = {
+            'prompt_tokens': len(prompt) // 4,
+            'completion_tokens': tokens,
+            'total_tokens': len(prompt) // 4 + tokens
+        }
+        return contenido, tokens, usage
+
+    def _respuesta_chat(self, cuerpo, contenido, usage):
+        return {
+            'id': f"chatcmpl-{next(self._ids)}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': cuerpo.get('model', 'simulado'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': contenido},
+                'finish_reason': 'stop'
+            }],
+            'usage': usage
+        }
+
+    async def chat_completions(self, request):
+        self._contar('chat')
+        cuerpo = await request.json()
+        contenido, tokens, usage = self._completar_chat(cuerpo)
+        if cuerpo.get('stream'):
+            return await self._chat_streaming(request, cuerpo, contenido, tokens, usage)
+
+        await asyncio.sleep(self.latencia_llm + tokens / self.tokens_por_segundo)
+        return web.json_response(self._respuesta_chat(cuerpo, contenido, usage))
+
+    async def _chat_streaming(self, request, cuerpo, contenido, tokens, usage):
+        """Respuesta SSE: la latencia fija antes del primer fragmento y luego los tokens a su ritmo."""
+        respuesta = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await respuesta.prepare(request)
+        await asyncio.sleep(self.latencia_llm)
+
+        base = {
+            'id': f"chatcmpl-{next(self._ids)}",
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': cuerpo.get('model', 'simulado')
+        }
+
+        def evento(choices, **extra):
+            return f"data: {json.dumps({**base, 'choices': choices, **extra})}\n\n".encode('utf-8')
+
+        # Se envían grupos de 10 tokens (unos 4 caracteres por token)
+        paso = max(1, len(contenido) * 10 // max(tokens, 1))
+        try:
+            for inicio in range(0, len(contenido), paso):
+                delta = {'content': contenido[inicio:inicio + paso]}
+                if inicio == 0:
+                    delta['role'] = 'assistant'
+                await respuesta.write(evento([{'index': 0, 'delta': delta, 'finish_reason': None}]))
+                await asyncio.sleep(10 / self.tokens_por_segundo)
+            await respuesta.write(evento([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+            if cuerpo.get('stream_options', {}).get('include_usage'):
+                await respuesta.write(evento([], usage=usage))
+            await respuesta.write(b"data: [DONE]\n\n")
+            await respuesta.write_eof()
+        except ConnectionResetError:
+            # El cliente cortó la respuesta (por ejemplo, al llegar a max_words)
+            self._contar('chat_cortado')
+        return respuesta
+
+    async def images_generations(self, request):
+        self._contar('imagen')
+        await request.read()
+        await asyncio.sleep(self.latencia_imagen)
+        loop = asyncio.get_running_loop()
+        datos = await loop.run_in_executor(None, self._imagen_unica)
+        nombre = f"{next(self._ids)}.png"
+        self.imagenes[nombre] = datos
+        return web.json_response({
+            'created': int(time.time()),
+            'data': [{'url': f"{self.base_url}/imagenes/{nombre}"}]
+        })
+
+    async def descargar_imagen(self, request):
+        datos = self.imagenes.pop(request.match_info['nombre'], None)
+        if datos is None:
+            raise web.HTTPNotFound()
+        return web.Response(body=datos, content_type='image/png')
+
+    # --- OpenAI: archivos y Batch API ---
+
+    def _objeto_archivo(self, file_id, nombre, proposito):
+        return {
+            'id': file_id,
+            'object': 'file',
+            'bytes': len(self.archivos[file_id]),
+            'created_at': int(time.time()),
+            'filename': nombre,
+            'purpose': proposito,
+            'status': 'processed'
+        }
+
+    async def subir_archivo(self, request):
+        self._contar('archivo')
+        formulario = await request.post()
+        archivo = formulario['file']
+        file_id = f"file-{next(self._ids)}"
+        self.archivos[file_id] = archivo.file.read()
+        return web.json_response(self._objeto_archivo(file_id, archivo.filename, formulario.get('purpose', 'batch')))
+
+    async def contenido_archivo(self, request):
+        datos = self.archivos.get(request.match_info['id'])
+        if datos is None:
+            raise web.HTTPNotFound()
+        return web.Response(body=datos, content_type='application/octet-stream')
+
+    async def crear_lote(self, request):
+        self._contar('lote')
+        cuerpo = await request.json()
+        entrada = self.archivos.get(cuerpo.get('input_file_id'))
+        if entrada is None:
+            return web.json_response({'error': {'message': 'input_file_id no encontrado'}}, status=400)
+        batch_id = f"batch_{next(self._ids)}"
+        self.lotes[batch_id] = {
+            'id': batch_id,
+            'object': 'batch',
+            'endpoint': cuerpo.get('endpoint'),
+            'input_file_id': cuerpo['input_file_id'],
+            'completion_window': cuerpo.get('completion_window', '24h'),
+            'status': 'in_progress',
+            'created_at': int(time.time()),
+            'output_file_id': None,
+            'error_file_id': None,
+            'metadata': cuerpo.get('metadata'),
+            'request_counts': {'total': len(entrada.splitlines()), 'completed': 0, 'failed': 0}
+        }
+        self._inicio_lotes[batch_id] = time.monotonic()
+        return web.json_response(self.lotes[batch_id])
+
+    def _completar_lote(self, lote):
+        """Responde todas las peticiones del archivo de entrada y crea el de salida."""
+        salida = []
+        for linea in self.archivos[lote['input_file_id']].decode('utf-8').splitlines():
+            if not linea.strip():
+                continue
+            peticion = json.loads(linea)
+            contenido, _, usage = self._completar_chat(peticion['body'])
+            salida.append(json.dumps({
+                'id': f"batch_req_{next(self._ids)}",
+                'custom_id': peticion['custom_id'],
+                'response': {
+                    'status_code': 200,
+                    'request_id': f"req_{next(self._ids)}",
+                    'body': self._respuesta_chat(peticion['body'], contenido, usage)
+                },
+                'error': None
+            }, ensure_ascii=False))
+        file_id = f"file-{next(self._ids)}"
+        self.archivos[file_id] = "\n".join(salida).encode('utf-8')
+        lote.update(
+            status='completed',
+            output_file_id=file_id,
+            completed_at=int(time.time()),
+            request_counts={'total': len(salida), 'completed': len(salida), 'failed': 0}
+        )
+
+    async def consultar_lote(self, request):
+        self._contar('lote_consulta')
+        lote = self.lotes.get(request.match_info['id'])
+        if lote is None:
+            raise web.HTTPNotFound()
+        if lote['status'] == 'in_progress' and \
+                time.monotonic() - self._inicio_lotes[lote['id']] >= self.latencia_lote:
+            self._completar_lote(lote)
+        return web.json_response(lote)
+
+    # --- WordPress: operaciones comunes ---
+
+    def _guardar_medio(self, nombre, tipo):
+        media_id = next(self._ids)
+        url = f"{self.base_url}/wp-content/uploads/{media_id}-{nombre}"
+        self.medios[media_id] = url
+        return media_id, url, tipo
+
+    def _buscar_terminos(self, taxonomia, busqueda=None):
+        terminos = self.terminos[taxonomia]
+        if busqueda:
+            busqueda = busqueda.lower()
+            return [(i, n) for i, n in terminos.items() if busqueda in n.lower()]
+        return list(terminos.items())
+
+    def _crear_termino(self, taxonomia, nombre):
+        for term_id, existente in self.terminos[taxonomia].items():
+            if existente.lower() == nombre.lower():
+                return term_id, False
+        term_id = next(self._ids)
+        self.terminos[taxonomia][term_id] = nombre
+        return term_id, True
+
+    def _guardar_post(self, titulo, contenido, terminos):
+        post_id = next(self._ids)
+        self.posts.insert(0, {'id': post_id, 'title': titulo, 'content': contenido, 'terms': terminos})
+        del self.posts[MAX_POSTS_GUARDADOS:]
+        return post_id
+
+    def _categorias_post(self, post):
+        return [
+            (term_id, self.terminos['category'].get(term_id, ''))
+            for term_id in post['terms'].get('category', [])
+        ]
+
+    def _pagina_posts(self, desplazamiento, numero):
+        return self.posts[desplazamiento:desplazamiento + numero]
+
+    # --- WordPress XML-RPC ---
+
+    def _termino_xmlrpc(self, taxonomia, term_id, nombre):
+        return {
+            'term_id': str(term_id), 'group': '0', 'taxonomy': taxonomia,
+            'term_taxonomy_id': str(term_id), 'name': nombre, 'slug': nombre.lower().replace(' ', '-'),
+            'description': '', 'parent': '0', 'count': 0
+        }
+
+    def _llamar_xmlrpc(self, metodo, params):
+        if metodo == 'mt.supportedMethods':
+            return METODOS_XMLRPC
+        if metodo == 'system.multicall':
+            resultados = []
+            for llamada in params[0]:
+                try:
+                    resultados.append([self._llamar_xmlrpc(llamada['methodName'], llamada['params'])])
+                except xmlrpc.client.Fault as f:
+                    resultados.append({'faultCode': f.faultCode, 'faultString': f.faultString})
+            return resultados
+
+        argumentos = params[3:]
+        if metodo == 'wp.getTerms':
+            taxonomia = argumentos[0]
+            filtro = argumentos[1] if len(argumentos) > 1 else {}
+            return [
+                self._termino_xmlrpc(taxonomia, term_id, nombre)
+                for term_id, nombre in self._buscar_terminos(taxonomia, filtro.get('search'))
+            ]
+        if metodo == 'wp.newTerm':
+            datos = argumentos[0]
+            term_id, creado = self._crear_termino(datos['taxonomy'], datos['name'])
+            if not creado:
+                raise xmlrpc.client.Fault(500, 'A term with the name provided already exists.')
+            return str(term_id)
+        if metodo == 'wp.uploadFile':
+            datos = argumentos[0]
+            media_id, url, tipo = self._guardar_medio(datos['name'], datos['type'])
+            return {'id': str(media_id), 'file': datos['name'], 'url': url, 'type': tipo}
+        if metodo == 'wp.getMediaItem':
+            media_id = int(argumentos[0])
+            url = self.medios.get(media_id)
+            if url is None:
+                raise xmlrpc.client.Fault(404, 'Invalid attachment ID.')
+            return {'attachment_id': str(media_id), 'link': url, 'title': '', 'caption': '', 'description': ''}
+        if metodo == 'wp.newPost':
+            datos = argumentos[0]
+            terminos = {t: [int(i) for i in ids] for t, ids in datos.get('terms', {}).items()}
+            return str(self._guardar_post(datos.get('post_title', ''), datos.get('post_content', ''), terminos))
+        if metodo == 'wp.getPosts':
+            filtro = argumentos[0] if argumentos else {}
+            return [
+                {
+                    'post_id': str(post['id']),
+                    'post_title': post['title'],
+                    'post_content': post['content'],
+                    'post_status': 'publish',
+                    'post_type': 'post',
+                    'terms': [self._termino_xmlrpc('category', i, n) for i, n in self._categorias_post(post)]
+                }
+                for post in self._pagina_posts(int(filtro.get('offset', 0)), int(filtro.get('number', 10)))
+            ]
+        raise xmlrpc.client.Fault(-32601, f'server error. requested method {metodo} does not exist.')
+
+    async def xmlrpc(self, request):
+        self._contar('wp_xmlrpc')
+        params, metodo = xmlrpc.client.loads(await request.read(), use_builtin_types=True)
+        await asyncio.sleep(self.latencia_wp)
+        try:
+            respuesta = xmlrpc.client.dumps((self._llamar_xmlrpc(metodo, params),), methodresponse=True, allow_none=True)
+        except xmlrpc.client.Fault as f:
+            respuesta = xmlrpc.client.dumps(f, methodresponse=True)
+        return web.Response(text=respuesta, content_type='text/xml')
+
+    # --- WordPress REST ---
+
+    async def rest_subir_media(self, request):
+        self._contar('wp_rest')
+        tamano = 0
+        async for bloque in request.content.iter_chunked(64 * 1024):
+            tamano += len(bloque)
+        await asyncio.sleep(self.latencia_wp)
+        disposicion = request.headers.get('Content-Disposition', '')
+        nombre = disposicion.split('filename="', 1)[-1].split('"', 1)[0] or 'archivo'
+        media_id, url, _ = self._guardar_medio(nombre, request.content_type)
+        return web.json_response({'id': media_id, 'source_url': url}, status=201)
+
+    async def rest_obtener_media(self, request):
+        self._contar('wp_rest')
+        await asyncio.sleep(self.latencia_wp)
+        media_id = int(request.match_info['id'])
+        url = self.medios.get(media_id)
+        if url is None:
+            return web.json_response({'code': 'rest_post_invalid_id'}, status=404)
+        return web.json_response({'id': media_id, 'source_url': url})
+
+    async def rest_listar_terminos(self, request):
+        self._contar('wp_rest')
+        await asyncio.sleep(self.latencia_wp)
+        taxonomia = 'category' if request.match_info['taxonomia'] == 'categories' else 'post_tag'
+        terminos = self._buscar_terminos(taxonomia, request.query.get('search'))
+        por_pagina = int(request.query.get('per_page', 10))
+        inicio = (int(request.query.get('page', 1)) - 1) * por_pagina
+        return web.json_response([{'id': i, 'name': n} for i, n in terminos[inicio:inicio + por_pagina]])
+
+    async def rest_crear_termino(self, request):
+        self._contar('wp_rest')
+        datos = await request.json()
+        await asyncio.sleep(self.latencia_wp)
+        taxonomia = 'category' if request.match_info['taxonomia'] == 'categories' else 'post_tag'
+        term_id, creado = self._crear_termino(taxonomia, datos['name'])
+        if not creado:
+            return web.json_response({'code': 'term_exists', 'data': {'term_id': term_id}}, status=400)
+        return web.json_response({'id': term_id, 'name': datos['name']}, status=201)
+
+    async def rest_crear_post(self, request):
+        self._contar('wp_rest')
+        datos = await request.json()
+        await asyncio.sleep(self.latencia_wp)
+        terminos = {'category': datos.get('categories', []), 'post_tag': datos.get('tags', [])}
+        post_id = self._guardar_post(datos.get('title', ''), datos.get('content', ''), terminos)
+        return web.json_response({'id': post_id}, status=201)
+
+    async def rest_listar_posts(self, request):
+        self._contar('wp_rest')
+        await asyncio.sleep(self.latencia_wp)
+        return web.json_response([
+            {
+                'id': post['id'],
+                'content': {'rendered': post['content']},
+                '_embedded': {'wp:term': [[
+                    {'id': i, 'name': n, 'taxonomy': 'category'} for i, n in self._categorias_post(post)
+                ]]}
+            }
+            for post in self._pagina_posts(
+                int(request.query.get('offset', 0)), int(request.query.get('per_page', 10))
+            )
+        ])
+
+    # --- Estado ---
+
+    async def estadisticas(self, request):
+        return web.json_response({
+            'peticiones': self.peticiones,
+            'posts': len(self.posts),
+            'terminos': {t: len(v) for t, v in self.terminos.items()}
+        })
+
+    def crear_app(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.add_routes([
+            web.get('/rss/search', self.feed_rss),
+            web.get('/news/rss/headlines/section/topic/{seccion}', self.feed_rss),
+            web.post('/v1/chat/completions', self.chat_completions),
+            web.post('/v1/images/generations', self.images_generations),
+            web.get('/imagenes/{nombre}', self.descargar_imagen),
+            web.post('/v1/files', self.subir_archivo),
+            web.get('/v1/files/{id}/content', self.contenido_archivo),
+            web.post('/v1/batches', self.crear_lote),
+            web.get('/v1/batches/{id}', self.consultar_lote),
+            web.post('/xmlrpc.php', self.xmlrpc),
+            web.post('/wp-json/wp/v2/media', self.rest_subir_media),
+            web.get('/wp-json/wp/v2/media/{id}', self.rest_obtener_media),
+            web.get('/wp-json/wp/v2/{taxonomia:categories|tags}', self.rest_listar_terminos),
+            web.post('/wp-json/wp/v2/{taxonomia:categories|tags}', self.rest_crear_termino),
+            web.post('/wp-json/wp/v2/posts', self.rest_crear_post),
+            web.get('/wp-json/wp/v2/posts', self.rest_listar_posts),
+            web.get('/_estadisticas', self.estadisticas),
+        ])
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicios simulados para benchmarks del publicador")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--latencia-llm", type=float, default=0.3, help="Segundos fijos por llamada de chat")
+    parser.add_argument("--tokens-por-segundo", type=float, default=300, help="Velocidad de generación simulada")
+    parser.add_argument("--tokens-respuesta", type=int, default=300, help="Tokens de salida por respuesta")
+    parser.add_argument("--latencia-imagen", type=float, default=1.0, help="Segundos por imagen generada")
+    parser.add_argument("--latencia-feed", type=float, default=0.05, help="Segundos por feed RSS")
+    parser.add_argument("--latencia-wp", type=float, default=0.05, help="Segundos por llamada a WordPress")
+    parser.add_argument("--items-por-feed", type=int, default=8)
+    parser.add_argument("--lado-imagen", type=int, default=1024)
+    parser.add_argument("--latencia-lote", type=float, default=2.0,
+                        help="Segundos hasta que un lote de la Batch API termina")
+    args = parser.parse_args()
+
+    servicios = ServiciosSimulados(
+        latencia_llm=args.latencia_llm,
+        tokens_por_segundo=args.tokens_por_segundo,
+        tokens_respuesta=args.tokens_respuesta,
+        latencia_imagen=args.latencia_imagen,
+        latencia_feed=args.latencia_feed,
+        latencia_wp=args.latencia_wp,
+        items_por_feed=args.items_por_feed,
+        lado_imagen=args.lado_imagen,
+        latencia_lote=args.latencia_lote
+    )
+    servicios.base_url = f"http://{args.host}:{args.puerto}"
+    web.run_app(servicios.crear_app(), host=args.host, port=args.puerto, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,137 @@
 #!/usr/bin/env python3
+import sys
+
+# El perfil se activa antes de cualquier otra importación para poder medirlas todas
+if '--startup-profile' in sys.argv:
+    from src.utils.startup_utils import iniciar_perfil_arranque
+    iniciar_perfil_arranque()
+
 import argparse
 import asyncio
 import os
-import sys
-from src.utils.config_utils import load_config
+import signal
+from datetime import datetime
+from src.utils.scheduler_utils import TrabajoEnCurso, bloqueo_trabajo, obtener_config_programador
+from src.utils.settings_utils import ErrorConfiguracion, configuracion_compartida
+from src.utils.startup_utils import fase_arranque, obtener_perfil_arranque
 import random
 
+def exportar_metricas(config, **etiquetas):
+    """Escribe el resumen JSON y el textfile de Prometheus de la ejecución."""
+    from src.utils.metrics_utils import metricas
+    metrics_config = config.metricas
+    if not metrics_config.enabled:
+        return
+    try:
+        ruta_json, _ = metricas.exportar(metrics_config.dir, metrics_config.textfile, **etiquetas)
+        print(f"Métricas de la ejecución: {ruta_json}")
+    except Exception as e:
+        print(f"Error al escribir métricas: {e}")
+
+async def ejecutar_trabajo(tipo, sitio, config, tema=None, ejecucion=None, bloquear=True):
+    """
+    Genera y publica un artículo o un resumen de noticias; devuelve el ID del post.
+
+    :param config: Configuracion validada (settings_utils)
+    :param ejecucion: Con un artículo, identificador para reanudarlo sin volver
+                      a generar el título, el contenido y la imagen
+    :param bloquear: Tomar el bloqueo del tipo de trabajo y sitio, el mismo que
+                     usa el daemon, para no solaparse con él; el daemon pasa
+                     False porque su programador ya lo tiene
+    :raises TrabajoEnCurso: Si otro proceso está ejecutando el mismo trabajo
+    """
+    if bloquear:
+        lock_dir = obtener_config_programador(config.datos)['lock_dir']
+        with bloqueo_trabajo(tipo, sitio, lock_dir):
+            return await ejecutar_trabajo(tipo, sitio, config, tema, ejecucion, bloquear=False)
+
+    if tipo == 'articulo':
+        with fase_arranque('importación de src.crea_articulo'):
+            from src.crea_articulo import generar_articulo
+
+        if not tema:
+            if not config.temas_articulos:
+                raise ValueError("No hay temas de artículos configurados.")
+            tema = random.choice(config.temas_articulos)
+
+        if ejecucion:
+            print(f"Ejecución {ejecucion} (tema: {tema}); para reanudarla si falla: "
+                  f"--ejecucion {ejecucion} --tema \"{tema}\"")
+        return await generar_articulo(tema=tema, sitio=sitio, config=config, ejecucion=ejecucion)
+
+    with fase_arranque('importación de src.crea_noticias'):
+        from src.crea_noticias import generar_noticias
+    return await generar_noticias(sitio=sitio, config=config)
+
+async def ejecutar_lote(sitio, config, num_temas=None, esperar=True):
+    """
+    Genera los títulos y contenidos de varios artículos con la Batch API de
+    OpenAI y los publica cuando llegan los resultados. Si hay un lote sin
+    terminar se retoma en lugar de crear otro.
+
+    :raises TrabajoEnCurso: Si otro proceso está procesando los lotes del
+                            sitio; sin el bloqueo, dos ejecuciones de cron
+                            retomarían el mismo lote y publicarían dos veces
+    """
+    from src.utils.batch_utils import ejecutar_lote_articulos
+    with fase_arranque('importación de src.crea_articulo'):
+        from src.crea_articulo import generar_articulo
+
+    temas = list(config.temas_articulos)
+    if num_temas:
+        temas = random.sample(temas, min(num_temas, len(temas)))
+
+    async def publicar(tema, titulo, contenido):
+        return await generar_articulo(tema=tema, sitio=sitio, config=config, titulo=titulo, contenido=contenido)
+
+    lock_dir = obtener_config_programador(config.datos)['lock_dir']
+    with bloqueo_trabajo('lote', sitio, lock_dir):
+        return await ejecutar_lote_articulos(sitio, config, temas, publicar, esperar=esperar)
+
+async def ejecutar_daemon(recargable):
+    """
+    Modo daemon: ejecuta los trabajos de 'schedule.jobs' con los clientes HTTP
+    compartidos siempre calientes. Cada trabajo usa la configuración vigente:
+    si el archivo cambia se recarga sin reiniciar (SIGHUP fuerza la recarga).
+    Los trabajos programados se leen al arrancar; cambiarlos requiere reiniciar.
+    SIGTERM o SIGINT detienen el programador tras terminar los trabajos en curso.
+    """
+    from src.utils.scheduler_utils import crear_programador
+
+    async def trabajo(tarea):
+        config = recargable.actual()
+        try:
+            return await ejecutar_trabajo(tarea.tipo, tarea.sitio, config, tarea.tema, bloquear=False)
+        finally:
+            # Los contadores son acumulativos durante toda la vida del daemon
+            exportar_metricas(config, modo='daemon')
+
+    try:
+        programador = crear_programador(recargable.actual().datos, trabajo)
+    except ValueError as e:
+        print(f"Error en la configuración de 'schedule': {e}")
+        sys.exit(1)
+    loop = asyncio.get_running_loop()
+    for senal in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(senal, programador.detener)
+    loop.add_signal_handler(signal.SIGHUP, recargable.recargar, True)
+
+    print(f"Daemon iniciado con {len(programador.tareas)} trabajos programados")
+    await programador.ejecutar()
+    print("Daemon detenido")
+
+async def cerrar_recursos():
+    """
+    Cierra los clientes y pools compartidos. Solo se revisan los módulos que
+    llegaron a importarse: si un módulo no se cargó, no hay nada que cerrar.
+    """
+    openai_utils = sys.modules.get('src.utils.openai_utils')
+    if openai_utils is not None:
+        await openai_utils.cerrar_clientes_openai()
+    wordpress_rest_utils = sys.modules.get('src.utils.wordpress_rest_utils')
+    if wordpress_rest_utils is not None:
+        await wordpress_rest_utils.cerrar_clientes_rest()
+
 async def main():
     parser = argparse.ArgumentParser(description="Publicador de contenido WordPress")
     
@@ -15,63 +141,82 @@ async def main():
                        help="Generar y publicar un artículo")
     grupo.add_argument("--noticias", action="store_true", 
                        help="Generar y publicar un resumen de noticias")
+    grupo.add_argument("--daemon", action="store_true",
+                       help="Ejecutar los trabajos programados en 'schedule' sin terminar")
+    grupo.add_argument("--lote", action="store_true",
+                       help="Generar artículos de 'article_topics' con la Batch API de OpenAI y publicarlos")
     
     # Argumentos opcionales
     parser.add_argument("--tema", type=str, 
                         help="Tema específico para el artículo")
     parser.add_argument("--sitio", type=str, default="pruebas",
                         help="Sitio de WordPress para publicar")
+    parser.add_argument("--num-temas", type=int,
+                        help="Con --lote, número de temas al azar (por defecto todos)")
+    parser.add_argument("--no-esperar", action="store_true",
+                        help="Con --lote, enviar o consultar el lote una vez y salir sin esperar los resultados")
+    parser.add_argument("--ejecucion", type=str,
+                        help="Con --articulo, ID de una ejecución anterior que falló para reanudarla "
+                             "(con el mismo --tema) sin volver a generar el contenido")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Mostrar el tiempo de importación e inicialización por módulo")
     
     args = parser.parse_args()
 
     try:
-        config = load_config()
-    except Exception as e:
+        # La configuración se valida completa al arrancar, antes de tocar ninguna API
+        with fase_arranque('carga de configuración'):
+            recargable = configuracion_compartida()
+    except ErrorConfiguracion as e:
         print(f"Error al cargar la configuración: {e}")
         sys.exit(1)
+    config = recargable.actual()
 
     try:
-        if args.sitio not in config.get('sites', {}):
+        if args.daemon:
+            await ejecutar_daemon(recargable)
+            return
+
+        if args.sitio not in config.sitios:
             print(f"Error: El sitio {args.sitio} no está configurado.")
             sys.exit(1)
 
-        openai_config = config.get('openai', {})
-        if not openai_config.get('api_key'):
-            print("Error: API Key de OpenAI no configurada.")
-            sys.exit(1)
+        if args.lote:
+            publicados = await ejecutar_lote(args.sitio, config, args.num_temas, esperar=not args.no_esperar)
+            print(f"Artículos del lote publicados en esta ejecución: {len(publicados)} {publicados}")
+            return
 
-        if args.articulo:
-            from src.crea_articulo import generar_articulo
-            
-            if not args.tema:
-                article_topics = config.get('article_topics', [])
-                if not article_topics:
-                    print("Error: No hay temas de artículos configurados.")
-                    sys.exit(1)
-                args.tema = random.choice(article_topics)
-            
-            resultado = await generar_articulo(
-                tema=args.tema, 
-                sitio=args.sitio, 
-                config=config
-            )
-
-        elif args.noticias:
-            from src.crea_noticias import generar_noticias
-            resultado = await generar_noticias(
-                sitio=args.sitio, 
-                config=config
-            )
+        resultado = await ejecutar_trabajo(
+            'articulo' if args.articulo else 'noticias',
+            args.sitio,
+            config,
+            tema=args.tema,
+            ejecucion=args.ejecucion or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        )
 
         if resultado:
             print(f"Publicación exitosa. ID del post: {resultado}")
         else:
             print("No se pudo generar la publicación.")
 
+    except TrabajoEnCurso as e:
+        print(f"Ejecución omitida: {e}")
     except ImportError as e:
         print(f"Error al importar módulo: {e}")
     except Exception as e:
         print(f"Error inesperado: {e}")
+    finally:
+        # Cerrar los clientes compartidos (pools keep-alive)
+        await cerrar_recursos()
+        if args.daemon:
+            exportar_metricas(config, modo='daemon')
+        elif args.lote:
+            exportar_metricas(config, modo='lote', sitio=args.sitio)
+        else:
+            exportar_metricas(config, modo='articulo' if args.articulo else 'noticias', sitio=args.sitio)
+        perfil = obtener_perfil_arranque()
+        if perfil is not None:
+            print(perfil.reporte(), file=sys.stderr)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
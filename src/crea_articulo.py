@@ -1,91 +1,134 @@
 import random
 import asyncio
 import os
-import json
-import tempfile
 from datetime import datetime
 from src.utils.openai_utils import generate_title, generate_content, generate_image_dalle
 from src.utils.wordpress_utils import get_wordpress_client, publicar_en_wordpress, subir_imagen_wordpress
-from src.utils.image_utils import descargar_imagen, aplicar_sello_a_imagen
+from src.utils.image_utils import descargar_imagen, aplicar_sello, generar_imagen_salida
 from src.utils.config_utils import ensure_storage_directories, save_content
+from src.utils.archive_utils import obtener_archivo
+from src.utils.settings_utils import como_configuracion
 from src.utils.logging_utils import get_logger
-from openai import AsyncOpenAI
+from src.utils.pipeline_utils import Etapa, ejecutar_pipeline, ejecutar_bloqueante
 
 logger = get_logger(__name__)
 
-async def generar_articulo(tema=None, sitio="pruebas", config=None):
-    # Verificar configuración de OpenAI
-    openai_config = config.get('openai', {})
-    
-    # Verificar API key
-    api_key = openai_config.get('api_key')
-    if not api_key:
-        raise ValueError("No se encontró la API key de OpenAI")
-    
+async def generar_articulo(tema=None, sitio="pruebas", config=None, titulo=None, contenido=None, ejecucion=None):
+    """
+    Genera y publica un artículo.
+
+    :param config: Configuracion validada o el diccionario de wordpress_config.json
+    :param titulo: Título ya generado (por ejemplo, por la Batch API); si se
+                   indica no se pide al modelo
+    :param contenido: Contenido HTML ya generado y limpio; si se indica no se
+                      pide al modelo
+    :param ejecucion: Identificador de la ejecución; al repetirlo con el mismo
+                      tema se reutilizan el título, el contenido y la imagen
+                      ya generados (caché LLM) en lugar de pedirlos de nuevo
+    :return: ID del post publicado
+    """
+    configuracion = como_configuracion(config)
+    openai_config = configuracion.openai
+    api_key = openai_config.api_key
+
     # Si no se proporciona tema, seleccionar uno aleatorio
     if not tema:
-        tema = random.choice(config.get('article_topics', []))
+        tema = random.choice(configuracion.temas_articulos)
 
-    try:
-        # Primero generar el título
-        titulo = await generate_title(tema, api_key, openai_config)
-        print(f"Título generado: {titulo}")
-        
-        #print("DEBUG - Estructura de config recibida:", json.dumps(config, indent=2))
-
-        # Luego generar el contenido
-        try:
-            contenido = await generate_content(tema, api_key, openai_config)
-            print(f"Contenido generado. Longitud: {len(contenido)}")
-        except Exception as e:
-            print("Error al llamar generate_content")
-            print("openai_config:", json.dumps(openai_config, indent=2))
-            raise
-
-        # Luego generar el contenido
-        contenido = await generate_content(tema, api_key, openai_config)
-        print(f"Contenido generado. Longitud: {len(contenido)}")
-        
-        # Después generar la imagen
-        imagen_url = await generate_image_dalle(titulo, api_key, openai_config)
+    watermark_config = configuracion.imagen.watermark
+    guardar_imagenes = configuracion.imagen.save_local
+    sitio_config = configuracion.sitio(sitio)
+
+    async def etapa_titulo():
+        if titulo:
+            return titulo
+        titulo_generado = await generate_title(tema, api_key, openai_config, ejecucion=ejecucion)
+        print(f"Título generado: {titulo_generado}")
+        return titulo_generado
+
+    async def etapa_contenido():
+        if contenido:
+            return contenido
+        contenido_generado = await generate_content(
+            tema, api_key, openai_config,
+            article_settings=configuracion.articulo,
+            ejecucion=ejecucion
+        )
+        print(f"Contenido generado. Longitud: {len(contenido_generado)}")
+        return contenido_generado
+
+    async def etapa_imagen_url(titulo):
+        imagen_url = await generate_image_dalle(titulo, api_key, openai_config, ejecucion=ejecucion)
         print(f"Imagen generada: {imagen_url}")
-        
+        return imagen_url
+
+    async def etapa_imagen(imagen_url):
         # Descargar y procesar la imagen
         imagen_bytes = await descargar_imagen(imagen_url)
+        return await ejecutar_bloqueante(procesar_imagen, imagen_bytes)
+
+    def procesar_imagen(imagen_bytes):
+        # El sello se aplica en memoria; guardar en disco es opcional
+        imagen_original_path = None
+        imagen_con_sello_path = None
+        if guardar_imagenes:
+            dirs = ensure_storage_directories()
+            fecha = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            imagen_original_path = os.path.join(dirs['imagenes'], f"{fecha}_original.png")
+            with open(imagen_original_path, 'wb') as f:
+                f.write(imagen_bytes)
         
-        # Guardar imagen original
-        dirs = ensure_storage_directories()
-        fecha = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        imagen_original_path = os.path.join(dirs['imagenes'], f"{fecha}_original.png")
-        with open(imagen_original_path, 'wb') as f:
-            f.write(imagen_bytes)
-        
-        # Aplicar sello si está configurado
-        if config.get('image_settings', {}).get('watermark', {}).get('enabled'):
-            sello_path = config['image_settings']['watermark']['path']
-            imagen_con_sello_path = os.path.join(dirs['imagenes'], f"{fecha}_con_sello.png")
-            aplicar_sello_a_imagen(imagen_original_path, sello_path, imagen_con_sello_path)
-            with open(imagen_con_sello_path, 'rb') as f:
-                imagen_bytes = f.read()
+        # Aplicar sello si está configurado; la imagen PIL pasa sin recodificar a la salida
+        imagen = imagen_bytes
+        if watermark_config.enabled:
+            if guardar_imagenes:
+                imagen_con_sello_path = os.path.join(dirs['imagenes'], f"{fecha}_con_sello.png")
+            imagen = aplicar_sello(
+                imagen_bytes, watermark_config.path, ruta_salida=imagen_con_sello_path
+            )
         
+        return {
+            'imagen': imagen,
+            'original': imagen_original_path,
+            'con_sello': imagen_con_sello_path
+        }
+
+    async def etapa_wp_client():
+        return await ejecutar_bloqueante(get_wordpress_client, sitio_config)
+
+    async def etapa_imagen_salida(imagen):
+        return await generar_imagen_salida(imagen['imagen'], configuracion.datos)
+
+    async def etapa_subida_imagen(wp_client, titulo, imagen_salida):
+        # Un solo adjunto: WordPress genera los tamaños intermedios a partir de él
+        imagen_wp_url, imagen_wp_id = await subir_imagen_wordpress(
+            wp_client, imagen_salida['bytes'], titulo, imagen_salida['mime'], imagen_salida['extension']
+        )
+        print(f"Imagen subida a WordPress: {imagen_wp_url}")
+        return imagen_wp_url, imagen_wp_id, imagen_salida['ancho'], imagen_salida['alto']
+
+    async def etapa_guardado_local(titulo, contenido, imagen):
         # Guardar contenido localmente
         metadata = {
             'tema': tema,
             'sitio': sitio,
-            'imagen_original': imagen_original_path,
-            'imagen_con_sello': imagen_con_sello_path if config.get('image_settings', {}).get('watermark', {}).get('enabled') else None
+            'imagen_original': imagen['original'],
+            'imagen_con_sello': imagen['con_sello']
         }
-        content_dir = save_content('articulos', titulo, contenido, imagen_con_sello_path, metadata)
-        print(f"Contenido guardado localmente en: {content_dir}")
-        
-        # Continuar con la publicación en WordPress
-        sitio_config = config['sites'][sitio]
-        wp_client = get_wordpress_client(sitio_config)
-        
-        imagen_wp_url, imagen_wp_id = subir_imagen_wordpress(wp_client, imagen_bytes, titulo)
-        print(f"Imagen subida a WordPress: {imagen_wp_url}")
-        
-        contenido_html = f'<img src="{imagen_wp_url}" alt="{titulo}">\n{contenido}'
+        entrada_id = await ejecutar_bloqueante(
+            save_content, 'articulos', titulo, contenido, imagen['con_sello'] or imagen['original'], metadata,
+            configuracion.datos
+        )
+        return entrada_id, metadata
+
+    async def etapa_publicacion(wp_client, titulo, contenido, subida_imagen, guardado_local):
+        imagen_wp_url, imagen_wp_id, ancho, alto = subida_imagen
+        entrada_id, metadata = guardado_local
+        # Con la clase wp-image-<ID>, WordPress agrega srcset y sizes al mostrar el post
+        contenido_html = (
+            f'<img src="{imagen_wp_url}" class="wp-image-{imagen_wp_id}" '
+            f'width="{ancho}" height="{alto}" alt="{titulo}">\n{contenido}'
+        )
         
         # Generar tags relevantes
         palabras_clave = set()  # Usamos set para evitar duplicados
@@ -97,13 +140,14 @@ async def generar_articulo(tema=None, sitio="pruebas", config=None):
         tags = list(palabras_clave)
 
         # Publicar en WordPress
-        post_id = publicar_en_wordpress(
+        post_id = await publicar_en_wordpress(
             wp_client, 
             titulo, 
             contenido_html, 
             categorias=[tema],
             tags=tags,
-            imagen_destacada_id=imagen_wp_id
+            imagen_destacada_id=imagen_wp_id,
+            max_tags_nuevos=configuracion.articulo.max_new_tags
         )
         
         # Actualizar metadatos con información de WordPress
@@ -112,12 +156,31 @@ async def generar_articulo(tema=None, sitio="pruebas", config=None):
         metadata['tags'] = tags
         metadata['categorias'] = [tema]
         
-        with open(os.path.join(content_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        await ejecutar_bloqueante(
+            obtener_archivo(configuracion.datos).actualizar, entrada_id, post_id=post_id, metadata=metadata
+        )
         
         return post_id
+
+    etapas = [
+        Etapa('titulo', etapa_titulo),
+        Etapa('contenido', etapa_contenido),
+        Etapa('imagen_url', etapa_imagen_url, ['titulo']),
+        Etapa('imagen', etapa_imagen, ['imagen_url']),
+        Etapa('wp_client', etapa_wp_client),
+        Etapa('imagen_salida', etapa_imagen_salida, ['imagen']),
+        Etapa('subida_imagen', etapa_subida_imagen, ['wp_client', 'titulo', 'imagen_salida']),
+        Etapa('guardado_local', etapa_guardado_local, ['titulo', 'contenido', 'imagen']),
+        Etapa('publicacion', etapa_publicacion,
+              ['wp_client', 'titulo', 'contenido', 'subida_imagen', 'guardado_local']),
+    ]
+
+    try:
+        # ejecutar_pipeline registra la ruta crítica
+        resultados, _ = await ejecutar_pipeline(etapas, f"artículo '{tema}'")
+        return resultados['publicacion']
         
     except Exception as e:
         print(f"Error detallado: {type(e)}")
         print(f"Detalles del error: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -1,52 +1,82 @@
 import random
 import asyncio
-import os
-import json
-import locale
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-from src.utils.openai_utils import generate_news_summary
-from src.utils.wordpress_utils import get_wordpress_client, publicar_en_wordpress, subir_imagen_wordpress
-from src.utils.config_utils import ensure_storage_directories, save_content
+from functools import partial
+from urllib.parse import quote_plus
+from src.utils.openai_utils import generate_news_summary, generate_news_summaries
+from src.utils.wordpress_utils import get_wordpress_client, publicar_en_wordpress, subir_imagen_wordpress, obtener_posts_recientes
+from src.utils.config_utils import save_content
+from src.utils.archive_utils import obtener_archivo
+from src.utils.url_store_utils import RegistroURLs
+from src.utils.dedup_utils import IndiceSimHash, huella_noticia
+from src.utils.rss_utils import iterar_items, leer_items
+from src.utils.prompt_utils import construir_contexto_noticias, compactar_prompt, titular_sin_medio, estimar_tokens, DEFAULT_TOKEN_BUDGET
+from src.utils.metrics_utils import metricas
+from src.utils.pipeline_utils import ejecutar_bloqueante
+from src.utils.http_utils import crear_sesion_http, obtener_contenido, obtener_cache_feeds
+from src.utils.settings_utils import como_configuracion
 from src.utils.logging_utils import get_logger
-from openai import AsyncOpenAI
 import re
-from wordpress_xmlrpc import Client, WordPressPost
-from wordpress_xmlrpc.methods import posts, media, taxonomies
 
 logger = get_logger(__name__)
 
-# Configurar locale para fechas en español
-locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
+# Nombres en español para las fechas, sin depender del locale instalado en el sistema
+DIAS_SEMANA = ('lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo')
+MESES = ('enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+         'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre')
 
-async def obtener_ultima_publicacion(wp_client):
+# Posts por consulta y consultas como máximo al revisar los posts de WordPress
+POSTS_POR_PAGINA = 20
+MAX_PAGINAS_WORDPRESS = 10
+
+def formatear_fecha(fecha):
+    """Fecha larga en español, por ejemplo 'Lunes, 06 de enero de 2025'."""
+    return (f"{DIAS_SEMANA[fecha.weekday()]}, {fecha.day:02d} de "
+            f"{MESES[fecha.month - 1]} de {fecha.year}").capitalize()
+
+async def obtener_urls_publicadas(wp_client, ultimo_post_id=0):
+    """
+    Obtiene las URLs citadas en los resúmenes de noticias publicados en WordPress
+    después del último post ya revisado.
+
+    Se pagina hasta llegar a ese post, para no saltarse ninguno aunque se hayan
+    publicado muchos entre dos ejecuciones; la primera vez solo se lee una
+    página. Si una consulta falla, el cursor no avanza y los posts se revisan
+    en la siguiente ejecución.
+
+    :return: Tupla (conjunto de URLs, ID del post más reciente revisado)
+    """
+    urls = set()
+    max_id = ultimo_post_id
+    paginas = MAX_PAGINAS_WORDPRESS if ultimo_post_id else 1
     try:
-        query = {
-            'posts_per_page': 5,
-            'post_type': 'post',
-            'post_status': 'publish',
-            'orderby': 'date',
-            'order': 'DESC'
-        }
-        try:
-            posts = wp_client.call(posts.GetPosts(query))
-            for post in posts:
-                categories = [term.name for term in post.terms_names.get('category', [])]
-                if 'Noticias' in categories:
-                    return post.content
-        except Exception as e:
-            logger.warning(f"Error al obtener posts: {e}")
-        return None
+        for pagina in range(paginas):
+            recientes = await obtener_posts_recientes(wp_client, POSTS_POR_PAGINA, pagina * POSTS_POR_PAGINA)
+            for post in recientes:
+                if post['id'] <= ultimo_post_id:
+                    return urls, max_id
+                max_id = max(max_id, post['id'])
+                if 'Noticias' in post['categorias']:
+                    urls.update(extraer_urls_anteriores(post['content']))
+            if len(recientes) < POSTS_POR_PAGINA:
+                return urls, max_id
     except Exception as e:
-        logger.error(f"Error obteniendo última publicación: {e}")
-        return None
+        logger.warning(f"Error al obtener posts: {e}")
+        return urls, ultimo_post_id
+    if ultimo_post_id:
+        logger.warning(
+            f"Se revisaron {paginas * POSTS_POR_PAGINA} posts sin llegar al último revisado "
+            f"({ultimo_post_id}); los anteriores no se revisan"
+        )
+    return urls, max_id
 
 def extraer_urls_anteriores(contenido_anterior):
     if not contenido_anterior:
         return set()
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(contenido_anterior, 'html.parser')
-    return {a['href'] for a in soup.find_all('a')}
+    return {a['href'] for a in soup.find_all('a', href=True)}
 
 def es_noticia_local(titulo, descripcion):
     palabras_locales = {
@@ -63,34 +93,39 @@ def formatear_referencias(noticias):
     referencias_html += '</div>'
     return referencias_html
 
-async def obtener_titulares_principales():
+# Base de los feeds; se puede cambiar con content_settings.news.feed_base_url
+GOOGLE_NEWS_URL = "https://news.google.com"
+
+FUENTES_TITULARES = [
+    "/news/rss/headlines/section/topic/WORLD?hl=es-419&gl=MX&ceid=MX:es-419",  # Mundial
+    "/news/rss/headlines/section/topic/NATION?hl=es-419&gl=MX&ceid=MX:es-419",  # Nacional
+    "/news/rss/headlines/section/topic/BREAKING?hl=es-419&gl=MX&ceid=MX:es-419"  # Breaking News
+]
+
+async def obtener_titulares_principales(session, cache=None, base_url=GOOGLE_NEWS_URL):
     """
     Obtiene los titulares más importantes de los principales medios.
+
+    Las fuentes se descargan de forma concurrente con la sesión compartida.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    # Principales medios globales
-    fuentes = [
-        "https://news.google.com/news/rss/headlines/section/topic/WORLD?hl=es-419&gl=MX&ceid=MX:es-419",  # Mundial
-        "https://news.google.com/news/rss/headlines/section/topic/NATION?hl=es-419&gl=MX&ceid=MX:es-419",  # Nacional
-        "https://news.google.com/news/rss/headlines/section/topic/BREAKING?hl=es-419&gl=MX&ceid=MX:es-419"  # Breaking News
-    ]
+    urls = [base_url.rstrip('/') + fuente for fuente in FUENTES_TITULARES]
+    respuestas = await asyncio.gather(
+        *(obtener_contenido(session, url, cache) for url in urls),
+        return_exceptions=True
+    )
     
     titulares_importantes = []
     
-    for url in fuentes:
+    for url, contenido in zip(urls, respuestas):
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'xml')
+            if isinstance(contenido, Exception):
+                raise contenido
             
             # Tomar solo los 3 más importantes de cada fuente
-            for item in soup.find_all('item')[:3]:
+            for item in iterar_items(contenido, limite=3):
                 titular = {
-                    'titulo': item.title.text,
-                    'fuente': item.source.text if item.source else "Google News"
+                    'titulo': item['titulo'],
+                    'fuente': item['fuente'] or "Google News"
                 }
                 titulares_importantes.append(titular)
         except Exception as e:
@@ -123,7 +158,8 @@ async def generar_resumen_general(titulares_principales, api_key, openai_config)
     titulares_texto = []
     for titular in titulares_principales:
         if 'titulo' in titular and 'fuente' in titular:
-            titulares_texto.append(f"- {titular['titulo']} ({titular['fuente']})")
+            titulo = titular_sin_medio(titular['titulo'], titular['fuente'])
+            titulares_texto.append(f"- {titulo} ({titular['fuente']})")
     
     titulares_formateados = "\n".join(titulares_texto)
     
@@ -153,57 +189,29 @@ async def generar_resumen_general(titulares_principales, api_key, openai_config)
     <p>Segundo párrafo...</p>
     <p>Tercer párrafo...</p>
     """
+    prompt = compactar_prompt(prompt)
+    metricas.contar('prompt_tokens_estimados', estimar_tokens(prompt), tipo='news_summary')
 
     resumen = await generate_news_summary("Resumen Global", prompt, api_key, openai_config)
     return markdown_to_html(resumen)  # Convertir por si acaso viene en markdown
 
 
-async def obtener_noticias_por_tema(tema):
+async def obtener_noticias_por_tema(tema, session, cache=None, base_url=GOOGLE_NEWS_URL):
     """
     Obtiene noticias de Google News para un tema específico.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    url = f"https://news.google.com/rss/search?q={tema}&hl=es-419&gl=MX&ceid=MX:es-419"
+    url = f"{base_url.rstrip('/')}/rss/search?q={quote_plus(tema)}&hl=es-419&gl=MX&ceid=MX:es-419"
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'xml')
-        noticias = []
-        
-        for item in soup.find_all('item')[:5]:  # Tomar las 5 primeras noticias
-            noticia = {
-                'titulo': item.title.text,
-                'link': item.link.text,
-                'fecha': item.pubDate.text,
-                'descripcion': item.description.text if item.description else ""
-            }
-            noticias.append(noticia)
-            
-        return noticias
+        contenido = await obtener_contenido(session, url, cache)
+        # Tomar las 5 primeras noticias
+        return leer_items(contenido, limite=5)
     except Exception as e:
         logger.error(f"Error al obtener noticias para {tema}: {e}")
         return []
 
-async def generar_resumen_tema(tema, noticias, api_key, openai_config):
-    """
-    Genera un resumen para un tema específico.
-    """
-    noticias_texto = []
-    for noticia in noticias:
-        noticias_texto.append(f"TITULAR: {noticia['titulo']}\n"
-                            f"DESCRIPCIÓN: {noticia['descripcion']}\n"
-                            f"FUENTE: {noticia['link']}")
-    
-    context = "\n\n".join(noticias_texto)
-    
-    prompt = f"""Genera un resumen sobre {tema} basado ÚNICAMENTE en estas noticias.
-
-    {context}
-
-    REGLAS ESTRICTAS:
+# Reglas comunes a los resúmenes por tema, individuales o agrupados
+REGLAS_RESUMEN_TEMA = """REGLAS ESTRICTAS:
     1. Usa SOLO la información proporcionada en las noticias
     2. Mantén todos los datos cuantitativos exactamente como aparecen
     3. Si citas declaraciones, mantenlas textuales
@@ -222,125 +230,239 @@ async def generar_resumen_tema(tema, noticias, api_key, openai_config):
     <p>Segundo párrafo con más información...</p>
     """
 
+async def generar_resumen_tema(tema, noticias, api_key, openai_config, presupuesto_tokens=DEFAULT_TOKEN_BUDGET):
+    """
+    Genera un resumen para un tema específico.
+
+    Las noticias se envían sin HTML ni enlaces, identificadas por el mismo
+    número que llevan en las referencias, y recortadas al presupuesto de tokens.
+    """
+    context, _ = construir_contexto_noticias(noticias, presupuesto_tokens)
+    
+    prompt = f"""Genera un resumen sobre {tema} basado ÚNICAMENTE en estas noticias (el número entre corchetes identifica la fuente).
+
+    {context}
+
+    {REGLAS_RESUMEN_TEMA}"""
+    prompt = compactar_prompt(prompt)
+    metricas.contar('prompt_tokens_estimados', estimar_tokens(prompt), tipo='news_summary')
+
     resumen = await generate_news_summary(tema, prompt, api_key, openai_config)
     return markdown_to_html(resumen) 
 
+async def generar_resumenes_agrupados(secciones, api_key, openai_config, presupuesto_tokens=DEFAULT_TOKEN_BUDGET):
+    """
+    Genera los resúmenes de varios temas con una sola llamada al LLM.
+
+    Las reglas se envían una sola vez y la respuesta es un objeto JSON con un
+    resumen por identificador de tema. Los temas cuya sección falta o no es
+    válida se resumen después con generar_resumen_tema().
+
+    :param secciones: Lista de tuplas (TemaNoticias, noticias)
+    :return: Resúmenes en el mismo orden que las secciones
+    """
+    claves = [f"tema_{i}" for i in range(1, len(secciones) + 1)]
+    bloques = []
+    for clave, (tema, noticias) in zip(claves, secciones):
+        context, _ = construir_contexto_noticias(noticias, presupuesto_tokens)
+        bloques.append(f"[{clave}] {tema.nombre}\n{context}")
+    noticias_por_tema = "\n\n".join(bloques)
+
+    prompt = f"""Genera un resumen para cada uno de estos temas basado ÚNICAMENTE en sus propias noticias (el número entre corchetes identifica la fuente dentro de cada tema).
+
+    {noticias_por_tema}
+
+    {REGLAS_RESUMEN_TEMA}
+    RESPUESTA: un objeto JSON cuyas claves son los identificadores de tema ({', '.join(claves)}) y cuyos valores son el resumen en HTML de ese tema.
+    """
+    prompt = compactar_prompt(prompt)
+    metricas.contar('prompt_tokens_estimados', estimar_tokens(prompt), tipo='news_summary_batch')
+
+    resultado = await generate_news_summaries(claves, prompt, api_key, openai_config)
+
+    resumenes = [markdown_to_html(resultado[clave]) if clave in resultado else None for clave in claves]
+    fallidos = [i for i, resumen in enumerate(resumenes) if resumen is None]
+    if fallidos:
+        logger.warning(f"{len(fallidos)} de {len(secciones)} temas sin resumen válido; se resumen por separado")
+        metricas.contar('resumenes_agrupados_fallidos', len(fallidos))
+        reintentos = await asyncio.gather(*(
+            generar_resumen_tema(secciones[i][0].nombre, secciones[i][1], api_key, openai_config, presupuesto_tokens)
+            for i in fallidos
+        ))
+        for i, resumen in zip(fallidos, reintentos):
+            resumenes[i] = resumen
+    return resumenes
+
+async def resumir_en_paralelo(tareas, max_concurrencia=4):
+    """
+    Ejecuta las tareas de resumen de forma concurrente con un límite de concurrencia.
+
+    :param tareas: Lista de funciones sin argumentos que devuelven una corutina
+    :param max_concurrencia: Número máximo de llamadas simultáneas al LLM
+    :return: Resultados en el mismo orden que las tareas
+    """
+    semaforo = asyncio.Semaphore(max(1, max_concurrencia))
+
+    async def ejecutar(tarea):
+        async with semaforo:
+            return await tarea()
+
+    return await asyncio.gather(*(ejecutar(tarea) for tarea in tareas))
+
 async def generar_noticias(sitio="sesolibre", config=None, num_temas=5):
+    registro_urls = None
     try:
-        if not config:
-            raise ValueError("Configuración no proporcionada")
-            
-        openai_config = config.get('openai', {})
-        api_key = openai_config.get('api_key')
-        sitio_config = config['sites'].get(sitio)
-        temas_seleccionados = config.get('news_topics', [])
-        
-        if not sitio_config:
-            raise ValueError(f"Sitio {sitio} no encontrado")
+        configuracion = como_configuracion(config)
+        openai_config = configuracion.openai
+        api_key = openai_config.api_key
+        sitio_config = configuracion.sitio(sitio)
+        temas_seleccionados = configuracion.temas_noticias
 
-        # Create storage directories
-        dirs = ensure_storage_directories()
-        
-        # Check local storage for previous content
-        local_news_dir = os.path.join(dirs['noticias'])
-        previous_urls = set()
-        
-        # Get URLs from last 5 local files
-        try:
-            for entry in sorted(os.listdir(local_news_dir))[-5:]:
-                metadata_path = os.path.join(local_news_dir, entry, 'metadata.json')
-                if os.path.exists(metadata_path):
-                    with open(metadata_path, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                        if 'urls' in metadata:
-                            previous_urls.update(metadata['urls'])
-        except Exception as e:
-            logger.warning(f"Error reading local storage: {e}")
+        # Registro persistente de URLs ya usadas en el sitio
+        news_settings = configuracion.noticias
+        registro_urls = RegistroURLs(max_age_days=news_settings.url_history_days)
+        if registro_urls.esta_vacio(sitio):
+            registro_urls.importar_archivo(sitio, obtener_archivo(configuracion.datos))
 
-        # Get WordPress client
-        client = get_wordpress_client(sitio_config)
+        # Con XML-RPC, crear el cliente hace una llamada de red bloqueante
+        client = await ejecutar_bloqueante(get_wordpress_client, sitio_config)
         
-        # Get previous content from WordPress
-        contenido_anterior = await obtener_ultima_publicacion(client)
-        if contenido_anterior:
-            urls_anteriores = extraer_urls_anteriores(contenido_anterior)
-            previous_urls.update(urls_anteriores)
+        # Revisar solo los posts de WordPress posteriores al último visto
+        if news_settings.check_wordpress:
+            urls_anteriores, ultimo_post_id = await obtener_urls_publicadas(
+                client, registro_urls.ultimo_post_id(sitio)
+            )
+            if urls_anteriores:
+                registro_urls.agregar(sitio, urls_anteriores)
+            registro_urls.guardar_ultimo_post_id(sitio, ultimo_post_id)
 
-        fecha_formato = datetime.now().strftime("%A, %d de %B de %Y").capitalize()
+        fecha_formato = formatear_fecha(datetime.now())
         titulo_wp = f"Resumen de noticias - {fecha_formato}"
 
-        titulares_principales = await obtener_titulares_principales()
-        resumen_general = await generar_resumen_general(
-            titulares_principales,
-            api_key,
-            openai_config
-        )
+        # Descargar titulares y feeds de todos los temas de forma concurrente
+        cache_feeds = obtener_cache_feeds(configuracion.datos)
+        feed_base_url = news_settings.feed_base_url
+        async with crear_sesion_http(configuracion.datos) as session:
+            titulares_principales, *noticias_por_tema = await asyncio.gather(
+                obtener_titulares_principales(session, cache_feeds, feed_base_url),
+                *(
+                    obtener_noticias_por_tema(tema.nombre, session, cache_feeds, feed_base_url)
+                    for tema in temas_seleccionados
+                )
+            )
 
-        contenido = "<div class='resumen-noticias'>\n"
-        contenido += f"<div class='resumen-general'>\n{resumen_general}\n</div>\n\n"
-        
         # Track all URLs for this run
         current_urls = []
+        current_huellas = []
+        secciones = []
+        
+        # Índice de casi duplicados con las noticias de ejecuciones anteriores
+        indice_huellas = IndiceSimHash(news_settings.near_duplicate_distance)
+        for huella in registro_urls.huellas(sitio):
+            indice_huellas.agregar(huella)
         
-        for tema in temas_seleccionados:
-            noticias = await obtener_noticias_por_tema(tema['nombre'])
+        for tema, noticias in zip(temas_seleccionados, noticias_por_tema):
             
             # Filter out previously used URLs
-            noticias = [n for n in noticias if n['link'] not in previous_urls]
+            noticias = [n for n in noticias if not registro_urls.contiene(sitio, n['link'])]
             
             # Filter local news in international section
-            if tema['nombre'].lower() == 'internacional':
+            if tema.nombre.lower() == 'internacional':
                 noticias = [n for n in noticias if not es_noticia_local(n['titulo'], n['descripcion'])]
             
+            # Descartar la misma historia publicada por otro medio o con otro enlace;
+            # solo se registran las huellas de las noticias que se publican
+            noticias_unicas = []
+            for noticia in noticias:
+                huella = huella_noticia(noticia)
+                if indice_huellas.es_duplicado(huella):
+                    logger.info(f"Noticia casi duplicada descartada: {noticia['titulo']}")
+                    continue
+                indice_huellas.agregar(huella)
+                current_huellas.append(huella)
+                noticias_unicas.append(noticia)
+            noticias = noticias_unicas
+            
             if noticias:
                 current_urls.extend([n['link'] for n in noticias])
-                resumen_tema = await generar_resumen_tema(
-                    tema['nombre'],
-                    noticias,
-                    api_key,
-                    openai_config
-                )
-                
-                contenido += f"\n<div class='seccion-tema'>\n"
-                contenido += f"<h2>{tema['nombre']}</h2>\n"
-                contenido += f"<img src='{tema['imagen']}' alt='{tema['nombre']}'/>\n"
-                contenido += f"{resumen_tema}\n"
-                contenido += formatear_referencias(noticias)
-                contenido += "<hr></div>\n"
+                secciones.append((tema, noticias))
+
+        # Generar el resumen general y los de cada tema en paralelo
+        max_concurrencia = news_settings.max_concurrent_summaries
+        presupuesto_tokens = news_settings.prompt_token_budget
+        if news_settings.batch_summaries:
+            # Varios temas por llamada, en grupos de batch_size
+            tamano_lote = news_settings.batch_size
+            lotes = [secciones[i:i + tamano_lote] for i in range(0, len(secciones), tamano_lote)]
+            resumen_general, *resumenes_lotes = await resumir_en_paralelo(
+                [
+                    partial(generar_resumen_general, titulares_principales, api_key, openai_config),
+                    *(
+                        partial(generar_resumenes_agrupados, lote, api_key, openai_config, presupuesto_tokens)
+                        for lote in lotes
+                    )
+                ],
+                max_concurrencia
+            )
+            resumenes_tema = [resumen for resumenes in resumenes_lotes for resumen in resumenes]
+        else:
+            resumen_general, *resumenes_tema = await resumir_en_paralelo(
+                [
+                    partial(generar_resumen_general, titulares_principales, api_key, openai_config),
+                    *(
+                        partial(generar_resumen_tema, tema.nombre, noticias, api_key, openai_config,
+                                presupuesto_tokens)
+                        for tema, noticias in secciones
+                    )
+                ],
+                max_concurrencia
+            )
+
+        contenido = "<div class='resumen-noticias'>\n"
+        contenido += f"<div class='resumen-general'>\n{resumen_general}\n</div>\n\n"
+        
+        # Las secciones conservan el orden configurado de los temas
+        for (tema, noticias), resumen_tema in zip(secciones, resumenes_tema):
+            contenido += f"\n<div class='seccion-tema'>\n"
+            contenido += f"<h2>{tema.nombre}</h2>\n"
+            contenido += f"<img src='{tema.imagen}' alt='{tema.nombre}'/>\n"
+            contenido += f"{resumen_tema}\n"
+            contenido += formatear_referencias(noticias)
+            contenido += "<hr></div>\n"
 
         contenido += "</div>"
 
         # Save current content locally
         fecha_actual = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        content_dir = os.path.join(dirs['noticias'], f"{fecha_actual}_noticias")
-        os.makedirs(content_dir, exist_ok=True)
-
-        with open(os.path.join(content_dir, 'content.html'), 'w', encoding='utf-8') as f:
-            f.write(contenido)
-
         metadata = {
             'sitio': sitio,
             'fecha_generacion': fecha_actual,
-            'temas_seleccionados': [t['nombre'] for t in temas_seleccionados],
+            'temas_seleccionados': [t.nombre for t in temas_seleccionados],
             'urls': current_urls
         }
-        
-        with open(os.path.join(content_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        entrada_id = save_content('noticias', titulo_wp, contenido, metadata=metadata, config=configuracion.datos)
 
         # Publish to WordPress
-        post_id = publicar_en_wordpress(
+        post_id = await publicar_en_wordpress(
             client,
             titulo_wp,
             contenido,
             categorias=['Noticias'],
-            tags=[t['nombre'] for t in temas_seleccionados],
+            tags=[t.nombre for t in temas_seleccionados],
             imagen_destacada_id=7278 if sitio == "sesolibre" else None,
             estado='draft'
         )
         
+        obtener_archivo(configuracion.datos).actualizar(entrada_id, post_id=post_id)
+        registro_urls.agregar(sitio, current_urls)
+        registro_urls.agregar_huellas(sitio, current_huellas)
+        
         return post_id
         
     except Exception as e:
         logger.error(f"Error al generar noticias: {e}")
         raise
+    finally:
+        # También en los errores, para no dejar una conexión abierta por ejecución en modo daemon
+        if registro_urls is not None:
+            registro_urls.close()
@@ -0,0 +1,332 @@
+# Proyecto: Content Processor
+# Script: Archivo compacto de contenidos publicados
+# Autor: Eduardo Llaguno Velasco
+
+"""
+Archivo (SQLite) de los artículos y resúmenes generados, en lugar de un
+directorio con contenido.html y metadata.json por ejecución.
+
+El HTML se guarda comprimido con zlib y las consultas por sitio, fecha, tema
+o ID de post usan índices. Uso desde la línea de comandos:
+
+    python -m src.utils.archive_utils migrar [--borrar]
+    python -m src.utils.archive_utils buscar --sitio pruebas --tema Ciencia
+    python -m src.utils.archive_utils purgar --dias 365
+    python -m src.utils.archive_utils compactar
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_ARCHIVE_PATH = os.path.join(STORAGE_DIR, 'archivo.sqlite')
+
+DEFAULT_ARCHIVE_CONFIG = {
+    'path': DEFAULT_ARCHIVE_PATH,
+    # Días que se conservan las entradas (0 para conservarlas siempre)
+    'retention_days': 0
+}
+
+FORMATO_FECHA = "%Y-%m-%d_%H-%M-%S"
+
+# Tipos de contenido y nombre del HTML en los directorios anteriores
+TIPOS_CONTENIDO = {'articulos': 'contenido.html', 'noticias': 'content.html'}
+
+_archivos = {}
+
+
+class ArchivoContenido:
+    """
+    Archivo persistente de contenidos generados.
+
+    Cada entrada guarda el HTML comprimido y los metadatos en JSON, con
+    columnas indexadas para sitio, fecha, tema e ID del post. Las entradas más
+    antiguas que 'retention_days' se purgan al abrir el archivo y las páginas
+    libres se devuelven al sistema con un vacuum incremental.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH, retention_days=0):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Solo tiene efecto al crear la base; permite liberar espacio tras purgar
+        self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS contenidos (
+                id INTEGER PRIMARY KEY,
+                tipo TEXT NOT NULL,
+                sitio TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                creado REAL NOT NULL,
+                tema TEXT,
+                titulo TEXT NOT NULL,
+                post_id INTEGER,
+                contenido BLOB NOT NULL,
+                metadata TEXT NOT NULL,
+                origen TEXT UNIQUE
+            );
+            CREATE INDEX IF NOT EXISTS idx_contenidos_sitio_fecha ON contenidos (sitio, tipo, fecha);
+            CREATE INDEX IF NOT EXISTS idx_contenidos_tema ON contenidos (tema, fecha);
+            CREATE INDEX IF NOT EXISTS idx_contenidos_post ON contenidos (sitio, post_id);
+            CREATE INDEX IF NOT EXISTS idx_contenidos_creado ON contenidos (creado);
+        """)
+        self.purgar()
+
+    def guardar(self, tipo, sitio, titulo, contenido, metadata=None, tema=None, post_id=None,
+                fecha=None, creado=None, origen=None):
+        """
+        Guarda un contenido y devuelve el ID de la entrada.
+
+        :param origen: Directorio del que se migró la entrada; evita duplicados
+                       si la migración se repite
+        """
+        creado = creado or time.time()
+        fecha = fecha or datetime.fromtimestamp(creado).strftime(FORMATO_FECHA)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO contenidos "
+                "(tipo, sitio, fecha, creado, tema, titulo, post_id, contenido, metadata, origen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    tipo, sitio or '', fecha, creado, tema, titulo, post_id,
+                    zlib.compress(contenido.encode('utf-8')),
+                    json.dumps(metadata or {}, ensure_ascii=False), origen
+                )
+            )
+            self._conn.commit()
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def actualizar(self, entrada_id, post_id=None, metadata=None):
+        """Registra el ID del post publicado y/o reemplaza los metadatos."""
+        with self._lock:
+            if post_id is not None:
+                self._conn.execute("UPDATE contenidos SET post_id = ? WHERE id = ?", (int(post_id), entrada_id))
+            if metadata is not None:
+                self._conn.execute(
+                    "UPDATE contenidos SET metadata = ? WHERE id = ?",
+                    (json.dumps(metadata, ensure_ascii=False), entrada_id)
+                )
+            self._conn.commit()
+
+    @staticmethod
+    def _fila(fila, con_contenido):
+        entrada = {
+            'id': fila[0], 'tipo': fila[1], 'sitio': fila[2], 'fecha': fila[3], 'creado': fila[4],
+            'tema': fila[5], 'titulo': fila[6], 'post_id': fila[7], 'metadata': json.loads(fila[8])
+        }
+        if con_contenido:
+            entrada['contenido'] = zlib.decompress(fila[9]).decode('utf-8')
+        return entrada
+
+    def obtener(self, entrada_id):
+        """Devuelve la entrada completa (con el HTML) o None."""
+        fila = self._conn.execute(
+            "SELECT id, tipo, sitio, fecha, creado, tema, titulo, post_id, metadata, contenido "
+            "FROM contenidos WHERE id = ?", (entrada_id,)
+        ).fetchone()
+        return self._fila(fila, True) if fila else None
+
+    def buscar(self, sitio=None, tipo=None, tema=None, post_id=None, desde=None, hasta=None, limite=50):
+        """
+        Busca entradas (sin el HTML), de la más reciente a la más antigua.
+
+        :param desde: Fecha inicial 'YYYY-MM-DD' (incluida)
+        :param hasta: Fecha final 'YYYY-MM-DD' (incluida)
+        """
+        condiciones = []
+        valores = []
+        for columna, valor in (('sitio', sitio), ('tipo', tipo), ('tema', tema), ('post_id', post_id)):
+            if valor is not None:
+                condiciones.append(f"{columna} = ?")
+                valores.append(valor)
+        if desde:
+            condiciones.append("fecha >= ?")
+            valores.append(desde)
+        if hasta:
+            # Las fechas llevan la hora detrás; '~' ordena después de cualquier hora del día
+            condiciones.append("fecha < ?")
+            valores.append(hasta + '~')
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        filas = self._conn.execute(
+            "SELECT id, tipo, sitio, fecha, creado, tema, titulo, post_id, metadata "
+            f"FROM contenidos {donde} ORDER BY fecha DESC LIMIT ?",
+            (*valores, limite)
+        ).fetchall()
+        return [self._fila(fila, False) for fila in filas]
+
+    def purgar(self, retention_days=None):
+        """Elimina las entradas más antiguas que la retención y libera sus páginas."""
+        dias = self.retention_days if retention_days is None else retention_days
+        if not dias:
+            return 0
+        limite = time.time() - dias * 86400
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM contenidos WHERE creado < ?", (limite,))
+            self._conn.commit()
+            if cursor.rowcount:
+                self._conn.execute("PRAGMA incremental_vacuum")
+        if cursor.rowcount:
+            logger.info(f"Se purgaron {cursor.rowcount} entradas antiguas del archivo")
+        return cursor.rowcount
+
+    def compactar(self):
+        """Reescribe la base completa (VACUUM) para recuperar el espacio y desfragmentarla."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def migrar_directorios(self, base_dir=STORAGE_DIR, borrar=False):
+        """
+        Importa los directorios por ejecución (contenido.html/content.html y
+        metadata.json) de storage/articulos y storage/noticias.
+
+        :param borrar: Eliminar cada directorio una vez importado
+        :return: Tupla (importados, omitidos)
+        """
+        importados = omitidos = 0
+        for tipo, nombre_html in TIPOS_CONTENIDO.items():
+            directorio = os.path.join(base_dir, tipo)
+            if not os.path.isdir(directorio):
+                continue
+            for entry in sorted(os.listdir(directorio)):
+                ruta = os.path.join(directorio, entry)
+                ruta_html = os.path.join(ruta, nombre_html)
+                if not os.path.isfile(ruta_html):
+                    omitidos += 1
+                    continue
+                try:
+                    with open(ruta_html, 'r', encoding='utf-8') as f:
+                        contenido = f.read()
+                    metadata = {}
+                    ruta_metadata = os.path.join(ruta, 'metadata.json')
+                    if os.path.isfile(ruta_metadata):
+                        with open(ruta_metadata, 'r', encoding='utf-8') as f:
+                            metadata = json.load(f)
+                    fecha = metadata.get('fecha_creacion') or metadata.get('fecha_generacion') or entry[:19]
+                    try:
+                        creado = datetime.strptime(fecha, FORMATO_FECHA).timestamp()
+                    except ValueError:
+                        creado = os.path.getmtime(ruta_html)
+                        fecha = datetime.fromtimestamp(creado).strftime(FORMATO_FECHA)
+                    entrada_id = self.guardar(
+                        tipo, metadata.get('sitio'), metadata.get('titulo') or entry[20:] or entry,
+                        contenido, metadata,
+                        tema=metadata.get('tema'),
+                        post_id=metadata.get('wordpress_post_id'),
+                        fecha=fecha, creado=creado,
+                        origen=f"{tipo}/{entry}"
+                    )
+                except (OSError, ValueError) as e:
+                    logger.warning(f"No se pudo migrar {ruta}: {e}")
+                    omitidos += 1
+                    continue
+                # None: el directorio ya se había migrado antes
+                if entrada_id is None:
+                    omitidos += 1
+                else:
+                    importados += 1
+                if borrar:
+                    shutil.rmtree(ruta)
+        logger.info(f"Migración terminada: {importados} directorios importados, {omitidos} omitidos")
+        return importados, omitidos
+
+    def close(self):
+        self._conn.close()
+
+
+def obtener_config_archivo(config=None):
+    """Combina la sección 'archive' con los valores por defecto."""
+    archive_config = dict(DEFAULT_ARCHIVE_CONFIG)
+    if config:
+        archive_config.update(config.get('archive', {}))
+    return archive_config
+
+
+def obtener_archivo(config=None):
+    """Devuelve el archivo de contenidos compartido según la sección 'archive'."""
+    archive_config = obtener_config_archivo(config)
+    path = archive_config['path']
+    archivo = _archivos.get(path)
+    if archivo is None:
+        archivo = ArchivoContenido(path, archive_config['retention_days'])
+        _archivos[path] = archivo
+    return archivo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivo de contenidos generados")
+    parser.add_argument("--path", help="Base SQLite del archivo (por defecto, archive.path de la configuración)")
+    parser.add_argument("--config", help="Archivo de configuración (por defecto, config/wordpress_config.json)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    migrar = comandos.add_parser("migrar", help="Importar los directorios de storage/articulos y storage/noticias")
+    migrar.add_argument("--origen", default=STORAGE_DIR, help="Directorio de almacenamiento a migrar")
+    migrar.add_argument("--borrar", action="store_true", help="Eliminar cada directorio tras importarlo")
+
+    buscar = comandos.add_parser("buscar", help="Listar entradas del archivo")
+    buscar.add_argument("--sitio")
+    buscar.add_argument("--tipo", choices=sorted(TIPOS_CONTENIDO))
+    buscar.add_argument("--tema")
+    buscar.add_argument("--post-id", type=int)
+    buscar.add_argument("--desde", help="YYYY-MM-DD")
+    buscar.add_argument("--hasta", help="YYYY-MM-DD")
+    buscar.add_argument("--limite", type=int, default=50)
+
+    mostrar = comandos.add_parser("mostrar", help="Imprimir el HTML de una entrada")
+    mostrar.add_argument("id", type=int)
+
+    purgar = comandos.add_parser("purgar", help="Eliminar entradas más antiguas que N días")
+    purgar.add_argument("--dias", type=int, required=True)
+
+    comandos.add_parser("compactar", help="Recuperar el espacio libre (VACUUM)")
+
+    args = parser.parse_args()
+    if not args.path:
+        # Importación diferida: settings_utils importa este módulo
+        from src.utils.settings_utils import ErrorConfiguracion, cargar_configuracion
+        try:
+            args.path = obtener_config_archivo(cargar_configuracion(args.config).datos)['path']
+        except ErrorConfiguracion as e:
+            # Sin la configuración no se sabe en qué base escribe el publicador
+            print(f"Error al cargar la configuración: {e}\nIndica la base con --path")
+            sys.exit(1)
+    archivo = ArchivoContenido(args.path)
+    try:
+        if args.comando == "migrar":
+            importados, omitidos = archivo.migrar_directorios(args.origen, args.borrar)
+            print(f"Importados: {importados}; omitidos: {omitidos}")
+        elif args.comando == "buscar":
+            for entrada in archivo.buscar(args.sitio, args.tipo, args.tema, args.post_id,
+                                          args.desde, args.hasta, args.limite):
+                print(f"{entrada['id']:>6}  {entrada['fecha']}  {entrada['tipo']:<9} {entrada['sitio']:<12} "
+                      f"post={entrada['post_id'] or '-':<7} {entrada['titulo']}")
+        elif args.comando == "mostrar":
+            entrada = archivo.obtener(args.id)
+            if entrada is None:
+                print(f"No existe la entrada {args.id}")
+            else:
+                print(entrada['contenido'])
+        elif args.comando == "purgar":
+            print(f"Entradas eliminadas: {archivo.purgar(args.dias)}")
+        elif args.comando == "compactar":
+            antes = os.path.getsize(args.path)
+            archivo.compactar()
+            print(f"Tamaño: {antes} -> {os.path.getsize(args.path)} bytes")
+    finally:
+        archivo.close()
+
+
+if __name__ == "__main__":
+    main()
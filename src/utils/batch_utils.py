@@ -0,0 +1,320 @@
+# Proyecto: Content Processor
+# Script: Generación de artículos con la Batch API de OpenAI
+# Autor: Eduardo Llaguno Velasco
+
+import asyncio
+import glob
+import json
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import metricas
+from src.utils.openai_utils import (
+    obtener_cliente_openai, peticion_titulo, peticion_contenido, limpiar_titulo, limpiar_contenido
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_CONFIG = {
+    # Un archivo JSON por lote con su estado, para retomarlo tras un reinicio
+    'state_dir': os.path.join(STORAGE_DIR, 'lotes'),
+    'poll_interval': 60,
+    'completion_window': '24h',
+    # Artículos que se publican a la vez cuando llegan los resultados
+    'publish_concurrency': 2,
+    # Completar con llamadas normales los artículos cuyo título o contenido falló en el lote
+    'realtime_fallback': False,
+    # Intentos de publicación de cada artículo; después se marca como fallido
+    # para que el lote pueda terminar
+    'max_publish_attempts': 3
+}
+
+ENDPOINT = '/v1/chat/completions'
+
+# Estados de la Batch API tras los cuales ya no habrá más resultados
+ESTADOS_FINALES = ('completed', 'failed', 'expired', 'cancelled')
+
+# Tipo de petición de cada custom_id y su nombre en las métricas
+TIPOS_PETICION = {'titulo': 'title', 'contenido': 'content'}
+
+
+def obtener_config_lotes(openai_config=None):
+    """Combina la sección openai.batch (de ConfigOpenAI) con los valores por defecto."""
+    batch_config = dict(DEFAULT_BATCH_CONFIG)
+    if openai_config:
+        batch_config.update(openai_config.batch)
+    return batch_config
+
+
+class TrabajoLote:
+    """
+    Estado persistente de un lote de artículos enviado a la Batch API.
+
+    El estado pasa por 'pendiente' (aún sin enviar), 'enviado', 'resultados'
+    (títulos y contenidos descargados, publicación en curso) y 'terminado'.
+    Cada artículo lleva la cuenta de sus intentos de publicación y se marca
+    como 'fallido' al agotarlos.
+    Se reescribe de forma atómica tras cada cambio, de modo que otro proceso
+    puede retomar el lote donde se quedó sin publicar dos veces un artículo.
+    """
+
+    def __init__(self, ruta, datos):
+        self.ruta = ruta
+        self.datos = datos
+
+    @classmethod
+    def nuevo(cls, directorio, sitio, temas):
+        identificador = f"{datetime.now():%Y-%m-%d_%H-%M-%S}_{sitio}"
+        datos = {
+            'id': identificador,
+            'sitio': sitio,
+            'estado': 'pendiente',
+            'creado': time.time(),
+            'input_file_id': None,
+            'batch_id': None,
+            'articulos': [
+                {
+                    'tema': tema, 'titulo': None, 'contenido': None, 'post_id': None, 'error': None,
+                    'intentos': 0, 'fallido': False
+                }
+                for tema in temas
+            ]
+        }
+        return cls(os.path.join(directorio, f"{identificador}.json"), datos)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls(ruta, json.load(f))
+
+    @classmethod
+    def pendientes(cls, directorio, sitio):
+        """Lotes del sitio que aún no terminaron, del más antiguo al más reciente."""
+        trabajos = []
+        for ruta in sorted(glob.glob(os.path.join(directorio, '*.json'))):
+            try:
+                trabajo = cls.cargar(ruta)
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudo leer el estado del lote {ruta}: {e}")
+                continue
+            if trabajo.datos['sitio'] == sitio and trabajo.estado != 'terminado':
+                trabajos.append(trabajo)
+        return trabajos
+
+    @property
+    def estado(self):
+        return self.datos['estado']
+
+    @property
+    def articulos(self):
+        return self.datos['articulos']
+
+    def guardar(self, **cambios):
+        self.datos.update(cambios)
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.datos, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, self.ruta)
+
+
+def construir_peticiones(temas, openai_config, article_settings=None):
+    """
+    Archivo JSONL con una petición de título y otra de contenido por tema.
+
+    Usa los mismos mensajes y parámetros que generate_title y generate_content.
+    Las imágenes no van en el lote: la Batch API no admite el endpoint de
+    imágenes y las URLs de DALL-E caducan antes de que termine un lote, así
+    que se generan al publicar.
+    """
+    lineas = []
+    for indice, tema in enumerate(temas):
+        model, messages, params = peticion_titulo(tema, openai_config)
+        lineas.append({
+            'custom_id': f"{indice}:titulo",
+            'method': 'POST',
+            'url': ENDPOINT,
+            'body': {'model': model, 'messages': messages, **params}
+        })
+        messages, params, _ = peticion_contenido(tema, openai_config, article_settings)
+        lineas.append({
+            'custom_id': f"{indice}:contenido",
+            'method': 'POST',
+            'url': ENDPOINT,
+            'body': {'model': openai_config.model, 'messages': messages, **params}
+        })
+    return "\n".join(json.dumps(linea, ensure_ascii=False) for linea in lineas).encode('utf-8')
+
+
+async def enviar_lote(client, trabajo, contenido_jsonl, ventana='24h'):
+    """Sube el archivo de peticiones y crea el lote, guardando cada paso."""
+    if not trabajo.datos['input_file_id']:
+        archivo = await client.files.create(file=(f"{trabajo.datos['id']}.jsonl", contenido_jsonl), purpose='batch')
+        trabajo.guardar(input_file_id=archivo.id)
+
+    lote = await client.batches.create(
+        input_file_id=trabajo.datos['input_file_id'],
+        endpoint=ENDPOINT,
+        completion_window=ventana,
+        metadata={'sitio': trabajo.datos['sitio'], 'trabajo': trabajo.datos['id']}
+    )
+    trabajo.guardar(batch_id=lote.id, estado='enviado')
+    metricas.contar('lotes_enviados')
+    logger.info(f"Lote {lote.id} enviado con {len(trabajo.articulos)} artículos")
+
+
+def _aplicar_resultados(trabajo, texto):
+    """Copia al estado los títulos y contenidos de un archivo de salida o de errores."""
+    for linea in texto.splitlines():
+        if not linea.strip():
+            continue
+        resultado = json.loads(linea)
+        indice, tipo = resultado['custom_id'].split(':')
+        articulo = trabajo.articulos[int(indice)]
+        respuesta = resultado.get('response') or {}
+        cuerpo = respuesta.get('body') or {}
+
+        if resultado.get('error') or respuesta.get('status_code') != 200 or not cuerpo.get('choices'):
+            error = resultado.get('error') or cuerpo.get('error') or f"HTTP {respuesta.get('status_code')}"
+            articulo['error'] = f"{tipo}: {error}"
+            metricas.contar('lote_peticiones_fallidas', tipo=TIPOS_PETICION[tipo])
+            continue
+
+        texto_respuesta = cuerpo['choices'][0]['message']['content']
+        articulo[tipo] = limpiar_titulo(texto_respuesta) if tipo == 'titulo' else limpiar_contenido(texto_respuesta)
+        if cuerpo.get('usage'):
+            metricas.registrar_uso_tokens(
+                SimpleNamespace(**cuerpo['usage']), cuerpo.get('model', ''), f"{TIPOS_PETICION[tipo]}_batch"
+            )
+
+
+async def consultar_lote(client, trabajo):
+    """
+    Consulta el lote y, si ya terminó, descarga sus resultados.
+
+    :return: True si el lote terminó (con o sin resultados)
+    """
+    lote = await client.batches.retrieve(trabajo.datos['batch_id'])
+    conteo = lote.request_counts
+    if conteo is not None:
+        logger.info(f"Lote {lote.id}: {lote.status} ({conteo.completed}/{conteo.total} completadas, {conteo.failed} fallidas)")
+    if lote.status not in ESTADOS_FINALES:
+        return False
+
+    if lote.status != 'completed':
+        logger.warning(f"El lote {lote.id} terminó con estado {lote.status}; se usan los resultados parciales")
+    for file_id in (lote.output_file_id, lote.error_file_id):
+        if file_id:
+            respuesta = await client.files.content(file_id)
+            _aplicar_resultados(trabajo, respuesta.text)
+    trabajo.guardar(estado='resultados', estado_lote=lote.status)
+    return True
+
+
+async def publicar_resultados(trabajo, publicar, concurrencia=2, completar_en_tiempo_real=False, max_intentos=3):
+    """
+    Publica los artículos del lote que aún no tienen post.
+
+    :param publicar: Función asíncrona (tema, titulo, contenido) -> post_id
+    :param max_intentos: Intentos de publicación por artículo, contando los de
+                         ejecuciones anteriores; al agotarlos se marca como fallido
+    :return: IDs de los posts publicados en esta llamada
+    """
+    semaforo = asyncio.Semaphore(max(1, concurrencia))
+    publicados = []
+
+    async def publicar_articulo(articulo):
+        completo = articulo['titulo'] and articulo['contenido']
+        if not completo and not completar_en_tiempo_real:
+            logger.warning(f"Artículo '{articulo['tema']}' sin publicar: {articulo['error'] or 'sin resultado'}")
+            return
+        async with semaforo:
+            articulo['intentos'] = articulo.get('intentos', 0) + 1
+            try:
+                post_id = await publicar(articulo['tema'], articulo['titulo'], articulo['contenido'])
+            except Exception as e:
+                logger.error(
+                    f"Error al publicar el artículo '{articulo['tema']}' del lote "
+                    f"(intento {articulo['intentos']} de {max_intentos}): {e}"
+                )
+                articulo['error'] = f"publicacion: {e}"
+                if articulo['intentos'] >= max_intentos:
+                    articulo['fallido'] = True
+                    metricas.contar('lote_articulos_fallidos')
+                    logger.warning(f"Artículo '{articulo['tema']}' marcado como fallido tras {articulo['intentos']} intentos")
+                trabajo.guardar()
+                return
+        articulo['post_id'] = post_id
+        articulo['error'] = None
+        trabajo.guardar()
+        publicados.append(post_id)
+
+    await asyncio.gather(*(
+        publicar_articulo(a) for a in trabajo.articulos if not a['post_id'] and not a.get('fallido')
+    ))
+
+    # Un lote queda abierto mientras haya artículos que se puedan reintentar
+    reintentables = [
+        a for a in trabajo.articulos
+        if not a['post_id'] and not a.get('fallido')
+        and (completar_en_tiempo_real or (a['titulo'] and a['contenido']))
+    ]
+    if not reintentables:
+        trabajo.guardar(estado='terminado')
+    return publicados
+
+
+async def ejecutar_lote_articulos(sitio, config, temas, publicar, esperar=True):
+    """
+    Envía, consulta y publica los lotes de artículos de un sitio.
+
+    Si hay lotes sin terminar se retoman (y 'temas' se ignora); si no, se
+    crea uno nuevo con 'temas'. Con esperar=False se hace una sola consulta,
+    lo que permite retomar el lote desde cron en ejecuciones sucesivas.
+
+    :param config: Configuracion validada (settings_utils)
+    :param publicar: Función asíncrona (tema, titulo, contenido) -> post_id
+    :return: IDs de los posts publicados en esta ejecución
+    """
+    openai_config = config.openai
+    batch_config = obtener_config_lotes(openai_config)
+    client = obtener_cliente_openai(openai_config.api_key, openai_config)
+
+    trabajos = TrabajoLote.pendientes(batch_config['state_dir'], sitio)
+    if trabajos:
+        logger.info(f"Retomando {len(trabajos)} lotes sin terminar del sitio {sitio}")
+    else:
+        if not temas:
+            raise ValueError("No hay temas para el lote")
+        trabajo = TrabajoLote.nuevo(batch_config['state_dir'], sitio, temas)
+        trabajo.guardar()
+        trabajos = [trabajo]
+
+    publicados = []
+    for trabajo in trabajos:
+        if trabajo.estado == 'pendiente':
+            temas_lote = [a['tema'] for a in trabajo.articulos]
+            await enviar_lote(
+                client, trabajo, construir_peticiones(temas_lote, openai_config, config.articulo),
+                batch_config['completion_window']
+            )
+
+        while trabajo.estado == 'enviado':
+            if await consultar_lote(client, trabajo):
+                break
+            if not esperar:
+                logger.info(f"El lote {trabajo.datos['batch_id']} sigue en proceso; se retomará en la siguiente ejecución")
+                break
+            await asyncio.sleep(batch_config['poll_interval'])
+
+        if trabajo.estado == 'resultados':
+            publicados += await publicar_resultados(
+                trabajo, publicar,
+                batch_config['publish_concurrency'],
+                batch_config['realtime_fallback'],
+                batch_config['max_publish_attempts']
+            )
+    return publicados
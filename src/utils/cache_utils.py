@@ -0,0 +1,159 @@
+# Proyecto: Content Processor
+# Script: Caché persistente de respuestas LLM
+# Autor: Eduardo Llaguno Velasco
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(STORAGE_DIR, 'cache', 'llm_cache.sqlite')
+
+DEFAULT_CACHE_CONFIG = {
+    'enabled': True,
+    'path': DEFAULT_CACHE_PATH,
+    'ttl_seconds': 7 * 24 * 3600,
+    'max_bytes': 50 * 1024 * 1024,
+    # Las URLs de DALL-E expiran aproximadamente una hora después de generarse
+    'image_ttl_seconds': 3000
+}
+
+# Instancias compartidas, una por archivo de caché
+_caches = {}
+
+
+class CacheLLM:
+    """
+    Caché en disco (SQLite) direccionada por contenido.
+
+    Cada entrada se indexa con el hash del modelo, el prompt y los parámetros de
+    generación. Las entradas expiran por TTL y, cuando se supera 'max_bytes',
+    se eliminan las menos usadas recientemente (LRU).
+    """
+
+    def __init__(self, path, ttl_seconds, max_bytes):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS respuestas (
+                clave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL,
+                creado REAL NOT NULL,
+                ultimo_acceso REAL NOT NULL,
+                tamano INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_respuestas_acceso ON respuestas (ultimo_acceso)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def clave(tipo, model, prompt, params=None):
+        """Calcula la clave de caché a partir del modelo, el prompt y los parámetros."""
+        datos = json.dumps(
+            {'tipo': tipo, 'model': model, 'prompt': prompt, 'params': params or {}},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(datos.encode('utf-8')).hexdigest()
+
+    def get(self, clave, ttl_seconds=None):
+        """Devuelve el valor almacenado o None si no existe o expiró."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        fila = self._conn.execute(
+            "SELECT valor, creado FROM respuestas WHERE clave = ?", (clave,)
+        ).fetchone()
+        ahora = time.time()
+
+        if fila is None or (ttl and ahora - fila[1] > ttl):
+            if fila is not None:
+                self._conn.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+                self._conn.commit()
+            self.misses += 1
+            return None
+
+        self._conn.execute(
+            "UPDATE respuestas SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave)
+        )
+        self._conn.commit()
+        self.hits += 1
+        return json.loads(fila[0])
+
+    def set(self, clave, valor):
+        """Guarda un valor serializable en JSON y aplica la política de expulsión."""
+        serializado = json.dumps(valor, ensure_ascii=False)
+        ahora = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO respuestas (clave, valor, creado, ultimo_acceso, tamano) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (clave, serializado, ahora, ahora, len(serializado.encode('utf-8')))
+        )
+        self._expulsar(ahora)
+        self._conn.commit()
+
+    def _expulsar(self, ahora):
+        """Elimina entradas expiradas y, si hace falta, las menos usadas recientemente."""
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM respuestas WHERE creado < ?", (ahora - self.ttl_seconds,)
+            )
+        if not self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for clave, tamano in self._conn.execute(
+            "SELECT clave, tamano FROM respuestas ORDER BY ultimo_acceso ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+            total -= tamano
+            if total <= self.max_bytes:
+                break
+
+    def estadisticas(self):
+        """Devuelve los contadores de aciertos y fallos de la caché."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+def obtener_config_cache(config=None):
+    """Combina la sección 'cache' del config de OpenAI (ConfigOpenAI) con los valores por defecto."""
+    cache_config = dict(DEFAULT_CACHE_CONFIG)
+    if config:
+        cache_config.update(config.cache)
+    return cache_config
+
+
+def obtener_cache_llm(config=None):
+    """
+    Devuelve la caché compartida según la sección 'cache' del config de OpenAI,
+    o None si la caché está deshabilitada.
+    """
+    cache_config = obtener_config_cache(config)
+    if not cache_config['enabled']:
+        return None
+
+    path = cache_config['path']
+    cache = _caches.get(path)
+    if cache is None:
+        cache = CacheLLM(path, cache_config['ttl_seconds'], cache_config['max_bytes'])
+        _caches[path] = cache
+    return cache
@@ -1,86 +1,63 @@
 import os
-import json
 from datetime import datetime
 from src.utils.logging_utils import get_logger
-from pathlib import Path  # Añadimos esta importación
 
 logger = get_logger(__name__)
 
-def load_config(config_path=None):
+# Directorio raíz de almacenamiento; se puede redirigir con PUBLICADOR_STORAGE_DIR
+STORAGE_DIR = os.environ.get('PUBLICADOR_STORAGE_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'storage'
+)
+
+# Directorios ya creados en este proceso
+_directorios = None
+
+def ensure_storage_directories():
     """
-    Carga la configuración desde archivos JSON.
-    
-    :param config_path: Ruta al archivo de configuración. 
-                       Si no se proporciona, usa la ubicación predeterminada.
-    :return: Diccionario con la configuración cargada
+    Asegura que existan los directorios de almacenamiento.
+
+    Los directorios se crean una sola vez por proceso; las llamadas siguientes
+    solo devuelven sus rutas.
     """
-    # Si config_path es un string, convertirlo a Path
-    if isinstance(config_path, str):
-        config_path = Path(config_path)
-    
-    # Si no se proporciona ruta, usar ubicación predeterminada
-    if config_path is None:
-        config_path = Path(__file__).parent.parent.parent / 'config' / 'wordpress_config.json'
-    
-    try:
-        with open(config_path, 'r') as config_file:
-            config = json.load(config_file)
-        logger.info(f"Configuración cargada exitosamente desde {config_path}")
-        
-        return config
-    
-    except FileNotFoundError as e:
-        logger.error(f"Error: Archivo de configuración no encontrado: {e.filename}")
-        raise
-    except json.JSONDecodeError as e:
-        logger.error(f"Error: Problema al decodificar JSON en {e.doc}: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Error inesperado al cargar la configuración: {e}")
-        raise
+    global _directorios
+    if _directorios is not None:
+        return _directorios
 
-def ensure_storage_directories():
-    """Asegura que existan los directorios de almacenamiento."""
-    base_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'storage')
+    base_dir = STORAGE_DIR
     dirs = {
         'articulos': os.path.join(base_dir, 'articulos'),
         'noticias': os.path.join(base_dir, 'noticias'),
         'imagenes': os.path.join(base_dir, 'imagenes')
     }
     
-    for dir_path in dirs.values():
-        os.makedirs(dir_path, exist_ok=True)
-        logger.info(f"Directorio asegurado: {dir_path}")
+    # articulos y noticias solo existen en instalaciones anteriores al archivo;
+    # se conservan las rutas para la migración, pero ya no se crean
+    os.makedirs(dirs['imagenes'], exist_ok=True)
+    logger.debug(f"Directorio de imágenes asegurado: {dirs['imagenes']}")
     
+    _directorios = dirs
     return dirs
 
-def save_content(content_type, titulo, contenido, imagen_path=None, metadata=None):
+def save_content(content_type, titulo, contenido, imagen_path=None, metadata=None, config=None):
     """
-    Guarda el contenido generado localmente.
+    Guarda el contenido generado en el archivo local (ver archive_utils).
+
+    :param content_type: 'articulos' o 'noticias'
+    :param config: Configuración completa, para la sección 'archive'
+    :return: ID de la entrada en el archivo
     """
-    dirs = ensure_storage_directories()
+    # Importación diferida: archive_utils depende de este módulo
+    from src.utils.archive_utils import obtener_archivo
+
+    metadata = metadata if metadata is not None else {}
     fecha = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    safe_titulo = "".join(c for c in titulo if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    safe_titulo = safe_titulo[:50]  # Limitar longitud del título
-    
-    content_dir = os.path.join(dirs[content_type], f"{fecha}_{safe_titulo}")
-    os.makedirs(content_dir, exist_ok=True)
-    logger.info(f"Directorio de contenido creado: {content_dir}")
-    
-    # Guardar contenido
-    content_path = os.path.join(content_dir, 'contenido.html')
-    with open(content_path, 'w', encoding='utf-8') as f:
-        f.write(contenido)
-    logger.info(f"Contenido guardado en: {content_path}")
-    
-    # Guardar metadatos
-    if metadata:
-        metadata['titulo'] = titulo
-        metadata['fecha_creacion'] = fecha
-        metadata['imagen_path'] = imagen_path
-        metadata_path = os.path.join(content_dir, 'metadata.json')
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-        logger.info(f"Metadatos guardados en: {metadata_path}")
-    
-    return content_dir
+    metadata['titulo'] = titulo
+    metadata['fecha_creacion'] = fecha
+    metadata['imagen_path'] = imagen_path
+
+    entrada_id = obtener_archivo(config).guardar(
+        content_type, metadata.get('sitio'), titulo, contenido, metadata,
+        tema=metadata.get('tema'), fecha=fecha
+    )
+    logger.info(f"Contenido guardado en el archivo local (entrada {entrada_id})")
+    return entrada_id
@@ -0,0 +1,115 @@
+# Proyecto: Content Processor
+# Script: Detección de noticias casi duplicadas (SimHash)
+# Autor: Eduardo Llaguno Velasco
+
+import hashlib
+import html
+import re
+import unicodedata
+from src.utils.logging_utils import get_logger
+from src.utils.prompt_utils import compactar_descripcion, texto_plano, titular_sin_medio
+
+logger = get_logger(__name__)
+
+BITS = 64
+
+# Distancia por defecto: tolera cambiar o agregar una o dos palabras del titular
+DEFAULT_DISTANCIA = 10
+
+# Más allá de esto dos textos sin relación empiezan a parecer duplicados
+# (la distancia esperada entre huellas independientes es 32)
+MAX_DISTANCIA = 16
+
+
+def normalizar_texto(texto):
+    """
+    Normaliza título o descripción: sin HTML, sin acentos, en minúsculas y
+    sin el sufijo ' - Medio' que Google News agrega a los títulos.
+    """
+    texto = html.unescape(re.sub(r'<[^>]+>', ' ', texto or ''))
+    texto = re.sub(r'\s+-\s+[^-]{1,60}$', '', texto.strip())
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9ñ ]+', ' ', texto)
+
+
+def _hash_64(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(texto):
+    """
+    Calcula la huella SimHash de 64 bits de un texto a partir de sus palabras.
+
+    No se usan bigramas: en un titular corto, cambiar una palabra altera
+    también los dos bigramas vecinos y la huella se aleja demasiado.
+    """
+    tokens = [p for p in normalizar_texto(texto).split() if len(p) > 2]
+    if not tokens:
+        return 0
+
+    pesos = [0] * BITS
+    for token in tokens:
+        h = _hash_64(token)
+        for i in range(BITS):
+            pesos[i] += 1 if h >> i & 1 else -1
+
+    return sum(1 << i for i, peso in enumerate(pesos) if peso > 0)
+
+
+def huella_noticia(noticia):
+    """
+    Huella de una noticia a partir de su título y descripción, sin el nombre
+    del medio: en Google News la descripción suele ser el mismo titular
+    enlazado seguido de la fuente, y solo se conserva si aporta algo más.
+    """
+    fuente = texto_plano(noticia.get('fuente', ''))
+    titulo = titular_sin_medio(noticia.get('titulo', ''), fuente)
+    descripcion = compactar_descripcion(noticia.get('descripcion', ''), titulo, fuente)
+    return simhash(f"{titulo} {descripcion}")
+
+
+def distancia_hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class IndiceSimHash:
+    """
+    Índice por bandas de huellas SimHash.
+
+    La huella se divide en umbral + 1 bloques; dos huellas a distancia
+    <= umbral coinciden al menos en un bloque, así que solo se comparan los
+    candidatos de las mismas cubetas en lugar de todas las huellas.
+    """
+
+    def __init__(self, umbral=DEFAULT_DISTANCIA):
+        if not 0 <= umbral <= MAX_DISTANCIA:
+            raise ValueError(f"La distancia de casi duplicados debe estar entre 0 y {MAX_DISTANCIA}, no {umbral}")
+        self.umbral = umbral
+        bandas = umbral + 1
+        limites = [i * BITS // bandas for i in range(bandas + 1)]
+        # (desplazamiento, máscara) de cada bloque
+        self._bandas_bits = [
+            (inicio, (1 << (fin - inicio)) - 1) for inicio, fin in zip(limites, limites[1:])
+        ]
+        self._cubetas = [{} for _ in range(bandas)]
+
+    def _bandas(self, huella):
+        for i, (desplazamiento, mascara) in enumerate(self._bandas_bits):
+            yield i, (huella >> desplazamiento) & mascara
+
+    def agregar(self, huella):
+        if not huella:
+            return
+        for i, banda in self._bandas(huella):
+            self._cubetas[i].setdefault(banda, set()).add(huella)
+
+    def es_duplicado(self, huella):
+        """Indica si existe una huella a distancia de Hamming <= umbral."""
+        if not huella:
+            return False
+        for i, banda in self._bandas(huella):
+            for candidata in self._cubetas[i].get(banda, ()):
+                if distancia_hamming(huella, candidata) <= self.umbral:
+                    return True
+        return False
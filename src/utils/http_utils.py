@@ -0,0 +1,200 @@
+# Proyecto: Content Processor
+# Script: Utilidades HTTP asíncronas
+# Autor: Eduardo Llaguno Velasco
+
+import hashlib
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import metricas
+
+logger = get_logger(__name__)
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+
+DEFAULT_HTTP_CONFIG = {
+    'timeout': 20,
+    'connect_timeout': 10,
+    'limit': 20,
+    'limit_per_host': 4,
+    'feed_cache': {
+        'enabled': True,
+        'path': os.path.join(STORAGE_DIR, 'cache', 'feeds'),
+        # Segundos durante los que una copia se sirve sin consultar al servidor
+        'fresh_seconds': 300
+    }
+}
+
+
+def obtener_config_http(config=None):
+    """
+    Combina la sección 'http' de la configuración con los valores por defecto.
+    """
+    http_config = dict(DEFAULT_HTTP_CONFIG)
+    if config:
+        http_config.update(config.get('http', {}))
+    feed_cache = dict(DEFAULT_HTTP_CONFIG['feed_cache'])
+    feed_cache.update(http_config.get('feed_cache') or {})
+    http_config['feed_cache'] = feed_cache
+    return http_config
+
+
+class CacheFeeds:
+    """
+    Caché HTTP en disco para feeds con peticiones condicionales.
+
+    Guarda el cuerpo junto con ETag/Last-Modified. Dentro de la ventana de
+    frescura la copia se sirve sin red; fuera de ella se envía una petición
+    condicional y un 304 se responde desde disco.
+    """
+
+    def __init__(self, path, fresh_seconds):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        os.makedirs(path, exist_ok=True)
+
+    def _rutas(self, url):
+        nombre = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.path, nombre)
+        return base + '.json', base + '.body'
+
+    def leer(self, url):
+        """Devuelve (metadatos, cuerpo) almacenados o (None, None)."""
+        ruta_meta, ruta_cuerpo = self._rutas(url)
+        try:
+            with open(ruta_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(ruta_cuerpo, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    @staticmethod
+    def _escribir(ruta, datos):
+        # Escritura atómica: otro proceso que lea la caché a la vez nunca ve un archivo a medias
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+
+    def guardar(self, url, cuerpo, etag=None, last_modified=None):
+        # El cuerpo va antes que los metadatos, que son los que lo dan por fresco
+        _, ruta_cuerpo = self._rutas(url)
+        self._escribir(ruta_cuerpo, cuerpo)
+        self.renovar(url, etag, last_modified)
+
+    def renovar(self, url, etag=None, last_modified=None):
+        """Actualiza la marca de tiempo (y validadores) de una copia existente."""
+        ruta_meta, _ = self._rutas(url)
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'guardado': time.time()
+        }
+        self._escribir(ruta_meta, json.dumps(meta).encode('utf-8'))
+
+    def es_fresco(self, meta):
+        return meta is not None and time.time() - meta['guardado'] < self.fresh_seconds
+
+
+def obtener_cache_feeds(config=None):
+    """Crea la caché de feeds según 'http.feed_cache', o None si está deshabilitada."""
+    feed_cache = obtener_config_http(config)['feed_cache']
+    if not feed_cache['enabled']:
+        return None
+    return CacheFeeds(feed_cache['path'], feed_cache['fresh_seconds'])
+
+
+@asynccontextmanager
+async def crear_sesion_http(config=None):
+    """
+    Crea una sesión aiohttp compartida para toda la ejecución.
+
+    La sesión usa un pool de conexiones con límite global y por host,
+    y tiempos de espera configurables en la sección 'http' del config.
+    """
+    # aiohttp se carga aquí: settings_utils importa este módulo solo por DEFAULT_HTTP_CONFIG
+    import aiohttp
+
+    http_config = obtener_config_http(config)
+    connector = aiohttp.TCPConnector(
+        limit=http_config['limit'],
+        limit_per_host=http_config['limit_per_host']
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=http_config['timeout'],
+        connect=http_config['connect_timeout']
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={'User-Agent': USER_AGENT}
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def obtener_contenido(session, url, cache=None):
+    """
+    Descarga el cuerpo de una URL usando la sesión compartida.
+
+    :param cache: CacheFeeds opcional para peticiones condicionales
+    :return: Bytes de la respuesta
+    """
+    with metricas.medir('feed_fetch'):
+        return await _obtener_contenido(session, url, cache)
+
+
+async def _obtener_contenido(session, url, cache):
+    if cache is None:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            cuerpo = await response.read()
+            metricas.contar('bytes', len(cuerpo), etapa='feed_fetch', direccion='entrada')
+            return cuerpo
+
+    meta, cuerpo = cache.leer(url)
+    if cuerpo is not None and cache.es_fresco(meta):
+        logger.debug(f"Feed servido desde caché (fresco): {url}")
+        metricas.contar('cache_hits', cache='feeds')
+        return cuerpo
+
+    headers = {}
+    if cuerpo is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cuerpo is not None:
+                logger.debug(f"Feed no modificado (304): {url}")
+                metricas.contar('cache_hits', cache='feeds')
+                cache.renovar(url, meta.get('etag'), meta.get('last_modified'))
+                return cuerpo
+            response.raise_for_status()
+            nuevo = await response.read()
+            metricas.contar('cache_misses', cache='feeds')
+            metricas.contar('bytes', len(nuevo), etapa='feed_fetch', direccion='entrada')
+            cache.guardar(
+                url, nuevo,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+            return nuevo
+    except Exception as e:
+        # Ante un error de red se usa la última copia conocida
+        if cuerpo is not None:
+            logger.warning(f"Error al descargar {url}, se usa la copia en caché: {e}")
+            return cuerpo
+        raise
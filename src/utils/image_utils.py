@@ -4,16 +4,14 @@
 # Versión: 4.80
 # Fecha: 2024-09-30
 
-import requests
-import logging
-from io import BytesIO
-from PIL import Image
-import cairosvg
-import tempfile
+# PIL, cairosvg y aiohttp se importan dentro de las funciones que los usan,
+# para que importar este módulo no cueste nada en ejecuciones sin imágenes
+from functools import lru_cache
 import os
 import io
-import aiohttp
 from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import metricas
+from src.utils.pipeline_utils import ejecutar_bloqueante
 
 logger = get_logger(__name__)
 
@@ -21,12 +19,17 @@ async def descargar_imagen(url):
     """
     Descarga una imagen desde una URL de forma asíncrona.
     """
+    import aiohttp
+
     logger.info(f"Descargando imagen desde: {url}")
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.read()
+        with metricas.medir('image_download'):
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    datos = await response.read()
+        metricas.contar('bytes', len(datos), etapa='image_download', direccion='entrada')
+        return datos
     except Exception as e:
         logger.error(f"Error al descargar imagen: {e}")
         raise
@@ -35,6 +38,8 @@ def guardar_imagen(imagen_bytes, nombre):
     """
     Guarda una imagen en el disco.
     """
+    from PIL import Image
+
     logger.info(f"Guardando imagen como: {nombre}")
     try:
         img = Image.open(io.BytesIO(imagen_bytes))
@@ -44,46 +49,178 @@ def guardar_imagen(imagen_bytes, nombre):
         logger.error(f"Error al guardar imagen: {e}")
         raise
 
-def aplicar_sello_a_imagen(ruta_imagen, ruta_sello, ruta_salida):
+@lru_cache(maxsize=8)
+def _rasterizar_sello(ruta_sello, altura, mtime):
     """
-    Aplica un sello (marca de agua) a una imagen.
+    Rasteriza el SVG del sello a la altura indicada.
+
+    El resultado se guarda en una caché LRU por (ruta, altura, mtime), así que el
+    SVG solo se vuelve a rasterizar si cambia el archivo o el tamaño de destino.
+    La imagen devuelta es compartida y no debe modificarse.
     """
-    logger.info(f"Aplicando sello a la imagen: {ruta_imagen}")
-    try:
-        if not os.path.exists(ruta_sello):
-            raise FileNotFoundError(f"El archivo de sello no se encuentra en: {ruta_sello}")
-        
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_png:
-            cairosvg.svg2png(url=ruta_sello, write_to=temp_png.name)
-            temp_png_path = temp_png.name
+    import cairosvg
+    from PIL import Image
 
-        imagen_base = Image.open(ruta_imagen).convert("RGBA")
-        sello = Image.open(temp_png_path).convert("RGBA")
-        
-        sello_height = int(imagen_base.height * 0.1)
-        sello_width = int(sello.width * (sello_height / sello.height))
-        sello_redimensionado = sello.resize((sello_width, sello_height))
-        
-        posicion = (imagen_base.width - sello_redimensionado.width, imagen_base.height - sello_redimensionado.height)
-        
-        imagen_final = Image.new("RGBA", imagen_base.size, (0, 0, 0, 0))
-        imagen_final.paste(imagen_base, (0, 0))
-        imagen_final.paste(sello_redimensionado, posicion, sello_redimensionado)
-        
-        imagen_final.save(ruta_salida, "PNG")
+    logger.info(f"Rasterizando sello {ruta_sello} a {altura}px de alto")
+    png = cairosvg.svg2png(url=ruta_sello, output_height=altura)
+    sello = Image.open(io.BytesIO(png)).convert("RGBA")
+    sello.load()
+    return sello
+
+def obtener_sello(ruta_sello, altura):
+    """Devuelve el sello rasterizado a la altura indicada, usando la caché."""
+    if not os.path.exists(ruta_sello):
+        raise FileNotFoundError(f"El archivo de sello no se encuentra en: {ruta_sello}")
+    return _rasterizar_sello(ruta_sello, altura, os.path.getmtime(ruta_sello))
+
+def aplicar_sello(imagen_bytes, ruta_sello, ruta_salida=None):
+    """
+    Aplica un sello (marca de agua) a una imagen y devuelve la imagen PIL.
+
+    La imagen no se vuelve a codificar: se pasa tal cual a codificar_salida.
+    Solo se codifica en PNG si se guarda en disco.
+
+    :param imagen_bytes: Bytes de la imagen base
+    :param ruta_sello: Ruta al SVG del sello
+    :param ruta_salida: Si se indica, también se guarda el resultado en disco
+    :return: Imagen PIL (RGBA) con el sello
+    """
+    from PIL import Image
+
+    try:
+        with metricas.medir('watermark'):
+            imagen_base = Image.open(io.BytesIO(imagen_bytes)).convert("RGBA")
+            
+            sello = obtener_sello(ruta_sello, max(1, int(imagen_base.height * 0.1)))
+            posicion = (imagen_base.width - sello.width, imagen_base.height - sello.height)
+            imagen_base.alpha_composite(sello, dest=posicion)
         
-        os.unlink(temp_png_path)
+        if ruta_salida:
+            imagen_base.save(ruta_salida, 'PNG')
+            logger.info(f"Imagen con sello guardada como: {ruta_salida}")
         
-        logger.info(f"Sello aplicado exitosamente. Imagen guardada como: {ruta_salida}")
-        return ruta_salida
+        return imagen_base
     except Exception as e:
         logger.error(f"Error al aplicar sello a la imagen: {e}")
         raise
 
+def aplicar_sello_en_memoria(imagen_bytes, ruta_sello, formato="PNG", ruta_salida=None):
+    """
+    Aplica un sello (marca de agua) a una imagen en memoria.
+
+    :param formato: Formato de salida para PIL
+    :return: Bytes de la imagen con el sello
+    """
+    buffer = io.BytesIO()
+    aplicar_sello(imagen_bytes, ruta_sello, ruta_salida).save(buffer, formato)
+    return buffer.getvalue()
+
+def aplicar_sello_a_imagen(ruta_imagen, ruta_sello, ruta_salida):
+    """
+    Aplica un sello (marca de agua) a una imagen.
+    """
+    logger.info(f"Aplicando sello a la imagen: {ruta_imagen}")
+    with open(ruta_imagen, 'rb') as f:
+        aplicar_sello_en_memoria(f.read(), ruta_sello, ruta_salida=ruta_salida)
+    return ruta_salida
+
+FORMATOS_SALIDA = {
+    'webp': ('WEBP', 'image/webp', 'webp'),
+    'avif': ('AVIF', 'image/avif', 'avif'),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+    'png': ('PNG', 'image/png', 'png')
+}
+
+DEFAULT_OUTPUT_CONFIG = {
+    'format': 'webp',
+    'quality': 82,
+    # Ancho máximo de la imagen que se sube; WordPress genera a partir de ella
+    # los tamaños intermedios y el srcset de un solo adjunto
+    'max_width': 1024
+}
+
+def obtener_config_salida(config=None):
+    """Combina 'image_settings.output' con los valores por defecto."""
+    output_config = dict(DEFAULT_OUTPUT_CONFIG)
+    if config:
+        salida = config.get('image_settings', {}).get('output', {})
+        output_config.update(salida)
+        # Configuraciones anteriores indicaban varios anchos; se sube el mayor
+        if salida.get('widths') and 'max_width' not in salida:
+            output_config['max_width'] = max(salida['widths'])
+    return output_config
+
+def codificar_salida(imagen, formato='webp', calidad=82, ancho_maximo=1024):
+    """
+    Codifica la imagen que se sube a WordPress, comprimida y sin superar
+    ancho_maximo (nunca se amplía).
+
+    La imagen puede llegar como bytes o como imagen PIL (por ejemplo, la que
+    devuelve aplicar_sello), que se usa sin recodificar.
+
+    :return: Diccionario con ancho, alto, bytes, mime y extensión
+    """
+    from PIL import Image
+
+    formato = formato.lower()
+    if formato == 'avif' and 'AVIF' not in Image.SAVE:
+        logger.warning("Pillow no soporta AVIF en este entorno, se usa WebP")
+        formato = 'webp'
+    formato_pil, mime, extension = FORMATOS_SALIDA[formato]
+
+    if isinstance(imagen, (bytes, bytearray)):
+        imagen = Image.open(io.BytesIO(imagen))
+        imagen.load()
+    if formato_pil == 'JPEG':
+        imagen = imagen.convert('RGB')
+
+    ancho = min(int(ancho_maximo), imagen.width)
+    alto = round(imagen.height * ancho / imagen.width)
+    if ancho != imagen.width:
+        imagen = imagen.resize((ancho, alto), Image.LANCZOS)
+
+    opciones = {'quality': calidad}
+    if formato_pil == 'JPEG':
+        opciones.update(optimize=True, progressive=True)
+    elif formato_pil == 'WEBP':
+        opciones['method'] = 6
+    elif formato_pil == 'PNG':
+        opciones = {'optimize': True}
+
+    buffer = io.BytesIO()
+    imagen.save(buffer, formato_pil, **opciones)
+    return {
+        'ancho': ancho,
+        'alto': alto,
+        'bytes': buffer.getvalue(),
+        'mime': mime,
+        'extension': extension
+    }
+
+async def generar_imagen_salida(imagen, config=None):
+    """
+    Codifica la imagen de salida en el executor por defecto para no bloquear
+    el event loop. Es una sola codificación por artículo, así que no compensa
+    arrancar un pool de procesos; PIL libera el GIL mientras codifica.
+    """
+    output_config = obtener_config_salida(config)
+    with metricas.medir('image_encode'):
+        salida = await ejecutar_bloqueante(
+            codificar_salida,
+            imagen,
+            output_config['format'],
+            output_config['quality'],
+            output_config['max_width']
+        )
+    logger.info(f"Imagen codificada: {salida['ancho']}px ({len(salida['bytes']) // 1024} KB)")
+    return salida
+
 async def obtener_imagen_pixabay(tema, api_key):
     """
     Obtiene una imagen de Pixabay basada en un tema de forma asíncrona.
     """
+    import aiohttp
+
     logger.info(f"Obteniendo imagen de Pixabay para el tema: {tema}")
     palabras_clave = '+'.join(tema.split()[:2])
     url = f"https://pixabay.com/api/?key={api_key}&q={palabras_clave}&image_type=photo&lang=es"
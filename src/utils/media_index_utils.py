@@ -0,0 +1,74 @@
+# Proyecto: Content Processor
+# Script: Índice de medios subidos por hash de contenido
+# Autor: Eduardo Llaguno Velasco
+
+import hashlib
+import os
+import sqlite3
+import time
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MEDIA_INDEX_PATH = os.path.join(STORAGE_DIR, 'cache', 'medios.sqlite')
+
+_indices = {}
+
+
+def hash_contenido(datos):
+    """Hash SHA-256 de los bytes de un archivo."""
+    return hashlib.sha256(datos).hexdigest()
+
+
+class IndiceMedios:
+    """
+    Índice local (SQLite) de hash de contenido -> adjunto de WordPress, por sitio.
+
+    Permite reutilizar un adjunto existente en lugar de subir de nuevo los
+    mismos bytes (reintentos, imágenes en caché o varios sitios).
+    """
+
+    def __init__(self, path=DEFAULT_MEDIA_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS medios (
+                sitio TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                media_id INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                subido REAL NOT NULL,
+                PRIMARY KEY (sitio, hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def buscar(self, sitio, huella):
+        """Devuelve (url, media_id) si los bytes ya se subieron al sitio, o None."""
+        fila = self._conn.execute(
+            "SELECT url, media_id FROM medios WHERE sitio = ? AND hash = ?", (sitio, huella)
+        ).fetchone()
+        return (fila[0], fila[1]) if fila else None
+
+    def guardar(self, sitio, huella, url, media_id):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO medios (sitio, hash, media_id, url, subido) VALUES (?, ?, ?, ?, ?)",
+            (sitio, huella, int(media_id), url, time.time())
+        )
+        self._conn.commit()
+
+    def olvidar(self, sitio, huella):
+        """Elimina una entrada cuyo adjunto ya no existe en WordPress."""
+        self._conn.execute("DELETE FROM medios WHERE sitio = ? AND hash = ?", (sitio, huella))
+        self._conn.commit()
+
+
+def obtener_indice_medios(path=DEFAULT_MEDIA_INDEX_PATH):
+    """Devuelve el índice de medios compartido."""
+    indice = _indices.get(path)
+    if indice is None:
+        indice = IndiceMedios(path)
+        _indices[path] = indice
+    return indice
@@ -0,0 +1,180 @@
+# Proyecto: Content Processor
+# Script: Métricas por etapa (tiempos, tokens, bytes y cachés)
+# Autor: Eduardo Llaguno Velasco
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_METRICS_DIR = os.path.join(STORAGE_DIR, 'metricas')
+
+PREFIJO = 'publicador'
+
+
+def _clave(nombre, etiquetas):
+    return nombre, tuple(sorted(etiquetas.items()))
+
+
+def _escapar(valor):
+    """Escapa el valor de una etiqueta de Prometheus."""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas del proceso.
+
+    Guarda contadores y resúmenes de duración (conteo, suma y máximo) por etapa
+    y etiquetas. Es seguro usarlo desde hilos del executor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.inicio = time.time()
+            self._contadores = {}
+            self._duraciones = {}
+
+    def contar(self, nombre, valor=1, **etiquetas):
+        """Incrementa un contador."""
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def observar(self, etapa, segundos, **etiquetas):
+        """Registra la duración de una ejecución de una etapa."""
+        clave = _clave(etapa, etiquetas)
+        with self._lock:
+            conteo, suma, maximo = self._duraciones.get(clave, (0, 0.0, 0.0))
+            self._duraciones[clave] = (conteo + 1, suma + segundos, max(maximo, segundos))
+
+    @contextmanager
+    def medir(self, etapa, **etiquetas):
+        """Mide el tiempo de pared del bloque; los errores se cuentan aparte."""
+        inicio = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.contar('errores', etapa=etapa, **etiquetas)
+            raise
+        finally:
+            self.observar(etapa, time.monotonic() - inicio, **etiquetas)
+
+    def registrar_uso_tokens(self, usage, modelo, tipo):
+        """Acumula los tokens reportados en response.usage de OpenAI."""
+        if usage is None:
+            return
+        self.contar('tokens', getattr(usage, 'prompt_tokens', 0) or 0, modelo=modelo, tipo=tipo, clase='prompt')
+        self.contar('tokens', getattr(usage, 'completion_tokens', 0) or 0, modelo=modelo, tipo=tipo, clase='completion')
+
+    def resumen(self):
+        """Devuelve un diccionario serializable con todas las métricas."""
+        with self._lock:
+            contadores = [
+                {'nombre': nombre, 'etiquetas': dict(etiquetas), 'valor': valor}
+                for (nombre, etiquetas), valor in sorted(self._contadores.items())
+            ]
+            etapas = [
+                {
+                    'etapa': etapa,
+                    'etiquetas': dict(etiquetas),
+                    'conteo': conteo,
+                    'segundos_total': round(suma, 4),
+                    'segundos_max': round(maximo, 4)
+                }
+                for (etapa, etiquetas), (conteo, suma, maximo) in sorted(self._duraciones.items())
+            ]
+            inicio = self.inicio
+
+        return {
+            'inicio': inicio,
+            'duracion_total': round(time.time() - inicio, 4),
+            'etapas': etapas,
+            'contadores': contadores,
+            'caches': self._tasas_cache(contadores)
+        }
+
+    @staticmethod
+    def _tasas_cache(contadores):
+        """Calcula la tasa de aciertos a partir de los contadores cache_hits/cache_misses."""
+        tasas = {}
+        for contador in contadores:
+            if contador['nombre'] not in ('cache_hits', 'cache_misses'):
+                continue
+            cache = contador['etiquetas'].get('cache', 'desconocida')
+            datos = tasas.setdefault(cache, {'hits': 0, 'misses': 0})
+            datos['hits' if contador['nombre'] == 'cache_hits' else 'misses'] += contador['valor']
+        for datos in tasas.values():
+            total = datos['hits'] + datos['misses']
+            datos['hit_rate'] = round(datos['hits'] / total, 4) if total else 0.0
+        return tasas
+
+    def formato_prometheus(self, **etiquetas_globales):
+        """Genera las métricas en el formato de texto de Prometheus (textfile collector)."""
+        resumen = self.resumen()
+
+        def etiquetas(extra):
+            todas = {**etiquetas_globales, **extra}
+            if not todas:
+                return ''
+            return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in sorted(todas.items())) + '}'
+
+        lineas = [f'# TYPE {PREFIJO}_etapa_segundos summary']
+        for etapa in resumen['etapas']:
+            e = etiquetas({'etapa': etapa['etapa'], **etapa['etiquetas']})
+            lineas.append(f"{PREFIJO}_etapa_segundos_sum{e} {etapa['segundos_total']}")
+            lineas.append(f"{PREFIJO}_etapa_segundos_count{e} {etapa['conteo']}")
+        lineas.append(f'# TYPE {PREFIJO}_etapa_segundos_max gauge')
+        for etapa in resumen['etapas']:
+            e = etiquetas({'etapa': etapa['etapa'], **etapa['etiquetas']})
+            lineas.append(f"{PREFIJO}_etapa_segundos_max{e} {etapa['segundos_max']}")
+
+        nombres = sorted({c['nombre'] for c in resumen['contadores']})
+        for nombre in nombres:
+            lineas.append(f'# TYPE {PREFIJO}_{nombre}_total counter')
+            for contador in resumen['contadores']:
+                if contador['nombre'] == nombre:
+                    lineas.append(f"{PREFIJO}_{nombre}_total{etiquetas(contador['etiquetas'])} {contador['valor']}")
+
+        lineas.append(f'# TYPE {PREFIJO}_ejecucion_segundos gauge')
+        lineas.append(f"{PREFIJO}_ejecucion_segundos{etiquetas({})} {resumen['duracion_total']}")
+        lineas.append(f'# TYPE {PREFIJO}_ultima_ejecucion_timestamp gauge')
+        lineas.append(f"{PREFIJO}_ultima_ejecucion_timestamp{etiquetas({})} {int(time.time())}")
+        return '\n'.join(lineas) + '\n'
+
+    def exportar(self, directorio=DEFAULT_METRICS_DIR, textfile=None, **etiquetas_globales):
+        """
+        Escribe el resumen JSON de la ejecución y el archivo de texto de Prometheus.
+
+        :param textfile: Ruta del archivo .prom (por defecto, en el mismo directorio)
+        :return: Tupla (ruta JSON, ruta .prom)
+        """
+        os.makedirs(directorio, exist_ok=True)
+        fecha = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime(self.inicio))
+        ruta_json = os.path.join(directorio, f"{fecha}_resumen.json")
+        with open(ruta_json, 'w', encoding='utf-8') as f:
+            json.dump({'etiquetas': etiquetas_globales, **self.resumen()}, f, ensure_ascii=False, indent=2)
+
+        textfile = textfile or os.path.join(directorio, 'publicador.prom')
+        os.makedirs(os.path.dirname(textfile) or '.', exist_ok=True)
+        # Escritura atómica para que el collector nunca lea un archivo a medias
+        temporal = f"{textfile}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(self.formato_prometheus(**etiquetas_globales))
+        os.replace(temporal, textfile)
+
+        logger.info(f"Métricas escritas en {ruta_json} y {textfile}")
+        return ruta_json, textfile
+
+
+# Registro compartido por todo el proceso
+metricas = RegistroMetricas()
@@ -7,35 +7,99 @@ import json
 import os
 import re
 import shutil
+import time
 from contextlib import contextmanager
 from functools import wraps
-from bs4 import BeautifulSoup
 from src.utils.logging_utils import get_logger
+from src.utils.cache_utils import obtener_cache_llm, obtener_config_cache
+from src.utils.metrics_utils import metricas
+from src.utils.startup_utils import fase_arranque
+from src.utils.stream_utils import LimpiadorHTMLIncremental, ArchivoProgreso, ruta_progreso, DEFAULT_PROGRESS_DIR
 from contextlib import asynccontextmanager
-from openai import AsyncOpenAI
-import markdown2 
 
 logger = get_logger(__name__)
 
-@asynccontextmanager
-async def openai_client_context(api_key):
-    """Contexto asíncrono seguro para el cliente OpenAI"""
-    client = None
-    try:
-        client = AsyncOpenAI(api_key=api_key)
-        yield client
-    finally:
-        if client:
+# Registro de clientes compartidos, indexado por (api_key, base_url)
+_clientes_openai = {}
+
+DEFAULT_POOL_CONFIG = {
+    'max_connections': 20,
+    'max_keepalive_connections': 10,
+    'keepalive_expiry': 60,
+    'timeout': 120
+}
+
+# Máximo de tokens de salida de una respuesta con varios resúmenes
+MAX_TOKENS_AGRUPADO = 16000
+
+# Peticiones cuyo prompt solo depende del tema: fuera de la misma ejecución,
+# un acierto de caché volvería a publicar el mismo artículo
+TIPOS_CREATIVOS = ('title', 'content', 'image')
+
+
+def obtener_cliente_openai(api_key, config=None):
+    """
+    Devuelve el cliente AsyncOpenAI compartido para la API key y base_url dadas.
+
+    El cliente se crea la primera vez que se solicita y se reutiliza en todas
+    las llamadas del proceso, conservando el pool de conexiones keep-alive.
+    Los límites del pool se ajustan en la sección 'http_pool' del config de OpenAI.
+    """
+    base_url = config.base_url if config else None
+    clave = (api_key, base_url)
+
+    client = _clientes_openai.get(clave)
+    if client is None:
+        with fase_arranque('creación del cliente OpenAI'):
+            # openai y httpx se cargan solo cuando hace falta llamar a la API
+            import httpx
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            pool_config = dict(DEFAULT_POOL_CONFIG)
+            if config:
+                pool_config.update(config.http_pool)
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=pool_config['max_connections'],
+                    max_keepalive_connections=pool_config['max_keepalive_connections'],
+                    keepalive_expiry=pool_config['keepalive_expiry']
+                ),
+                timeout=pool_config['timeout']
+            )
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+        _clientes_openai[clave] = client
+        logger.info(f"Cliente OpenAI creado para {base_url or 'api.openai.com'}")
+    return client
+
+
+async def cerrar_clientes_openai():
+    """Cierra todos los clientes OpenAI registrados. Llamar al terminar el proceso."""
+    while _clientes_openai:
+        _, client = _clientes_openai.popitem()
+        try:
             await client.close()
+        except Exception as e:
+            logger.warning(f"Error al cerrar cliente OpenAI: {e}")
+
+
+@asynccontextmanager
+async def openai_client_context(api_key, config=None):
+    """Contexto asíncrono que entrega el cliente OpenAI compartido"""
+    yield obtener_cliente_openai(api_key, config)
 
 logger = get_logger(__name__)
 
 
 async def retry_with_backoff(func, *args, config, max_retries=None, **kwargs):
-    """Manejo unificado de reintentos con backoff exponencial"""
-    retries = max_retries or config['openai'].get('max_retries', 3)
-    initial_delay = config['openai'].get('initial_retry_delay', 1)
-    max_delay = config['openai'].get('max_retry_delay', 60)
+    """
+    Manejo unificado de reintentos con backoff exponencial.
+
+    :param config: Sección 'openai' de la configuración (ConfigOpenAI), como en
+                   el resto de funciones de este módulo
+    """
+    retries = max_retries or config.max_retries
+    initial_delay = config.initial_retry_delay
+    max_delay = config.max_retry_delay
 
     for attempt in range(retries):
         try:
@@ -49,8 +113,40 @@ async def retry_with_backoff(func, *args, config, max_retries=None, **kwargs):
             await asyncio.sleep(delay)
 
 
+def _consultar_cache(config, tipo, model, prompt, params, use_cache=True, ttl_seconds=None, ejecucion=None):
+    """
+    Busca una respuesta en la caché LLM.
+
+    Las peticiones de TIPOS_CREATIVOS solo se guardan dentro de una ejecución
+    ('ejecucion' forma parte de la clave), para reanudarla sin volver a
+    generar; sin ejecución no se consultan ni se guardan.
+
+    :return: Tupla (cache, clave, valor). cache es None si está deshabilitada (o
+             no aplica) y valor es None si no hubo acierto o si use_cache es False.
+    """
+    if tipo in TIPOS_CREATIVOS:
+        if not ejecucion:
+            return None, None, None
+        params = dict(params, ejecucion=ejecucion)
+    cache = obtener_cache_llm(config)
+    if cache is None:
+        return None, None, None
+    clave = cache.clave(tipo, model, prompt, params)
+    if not use_cache:
+        return cache, clave, None
+    valor = cache.get(clave, ttl_seconds)
+    if valor is not None:
+        logger.info(f"Respuesta de {tipo} obtenida de la caché")
+        metricas.contar('cache_hits', cache='llm', tipo=tipo)
+    else:
+        metricas.contar('cache_misses', cache='llm', tipo=tipo)
+    return cache, clave, valor
+
+
 def clean_html(html_content):
     """Limpia y formatea contenido HTML."""
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(html_content, 'html.parser')
         for tag in soup(['meta', 'title']):
@@ -67,157 +163,374 @@ def clean_html(html_content):
         logger.error(f"Error al limpiar HTML: {e}")
         return f"<p>{html_content}</p>"
 
-async def generate_title(tema, api_key, config=None):
-    """Genera título usando el contexto del cliente"""
-    config = config or {}  # Asegurar que config no sea None
-    
-    async with AsyncOpenAI(api_key=api_key) as client:
+def peticion_titulo(tema, config):
+    """
+    Modelo, mensajes y parámetros de la petición del título de un artículo.
+
+    :return: Tupla (model, messages, params); la usan generate_title y la Batch API
+    """
+    model = config.model
+    prompt = f"Genera un título atractivo y conciso para un artículo sobre {tema}"
+    messages = [
+        {"role": "system", "content": "Eres un experto en crear títulos atractivos."},
+        {"role": "user", "content": prompt}
+    ]
+    params = {'max_tokens': 30, 'temperature': 0.7}
+    return model, messages, params
+
+def limpiar_titulo(titulo):
+    """Quita espacios y comillas del título generado."""
+    return titulo.strip().replace('"', '').replace("'", "")
+
+async def generate_title(tema, api_key, config=None, use_cache=True, ejecucion=None):
+    """
+    Genera título usando el contexto del cliente.
+
+    :param ejecucion: Identificador de la ejecución; solo con él se usa la caché
+    """
+    if not config:
+        raise ValueError("Configuración no proporcionada")
+
+    model, messages, params = peticion_titulo(tema, config)
+    prompt = messages[-1]['content']
+    cache, clave, titulo = _consultar_cache(config, 'title', model, prompt, params, use_cache, ejecucion=ejecucion)
+    if titulo is not None:
+        return titulo
+
+    async with openai_client_context(api_key, config) as client:
         try:
-            prompt = f"Genera un título atractivo y conciso para un artículo sobre {tema}"
-            response = await client.chat.completions.create(
-                model=config.get('model', 'gpt-4o'),
-                messages=[
-                    {"role": "system", "content": "Eres un experto en crear títulos atractivos."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=30,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip().replace('"', '').replace("'", "")
+            with metricas.medir('llm', tipo='title'):
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    **params
+                )
+            metricas.registrar_uso_tokens(response.usage, model, 'title')
+            titulo = limpiar_titulo(response.choices[0].message.content)
+            if cache:
+                cache.set(clave, titulo)
+            return titulo
         except Exception as e:
             print(f"Error en generate_title: {type(e)}, {str(e)}")
             raise
 
-async def generate_content(tema, api_key, config=None):
-    """Genera contenido usando el contexto del cliente"""
-    if not config:
-        raise ValueError("No se proporcionó configuración")
+def limpiar_contenido(content):
+    """Quita las envolturas de código y de documento que a veces añade el modelo."""
+    content = content.strip()
+    content = content.replace('```html', '')
+    content = content.replace('```', '')
+    content = content.replace('<!DOCTYPE html>', '')
+    content = content.replace('<html>', '')
+    content = content.replace('</html>', '')
     
-    # Verificar estructura de configuración
-    # NOTA: Ahora config ya debería ser el openai_config
-    if 'model' not in config:
-        raise ValueError("Modelo no especificado en la configuración de OpenAI")
-
-    # Obtener configuración de contenido
-    content_settings = config.get('content_settings', {}).get('article', {})
-    min_words = content_settings.get('min_words', 1200)
-    max_words = content_settings.get('max_words', 1500)
-    min_sections = content_settings.get('min_sections', 4)
-    reading_time = content_settings.get('reading_time_minutes', {})
-    min_time = reading_time.get('min', 6)
-    max_time = reading_time.get('max', 10)
+    # Asegurar que el contenido comience con un párrafo
+    if not content.strip().startswith('<'):
+        content = f'<p>{content}</p>'
+    return content
+
+async def _generar_contenido_streaming(client, model, messages, params, tema, max_words, progress_dir=None):
+    """
+    Genera el contenido en streaming, limpiando el HTML a medida que llega.
+
+    Cuando se alcanza max_words se deja de consumir la respuesta al cerrar el
+    siguiente bloque (párrafo o lista), y se cierra la conexión para no pagar
+    los tokens restantes. El avance se escribe en un archivo de progreso.
+    """
+    limpiador = LimpiadorHTMLIncremental()
+    progreso = ArchivoProgreso(ruta_progreso(tema, progress_dir or DEFAULT_PROGRESS_DIR), tema)
+    logger.info(f"Generando contenido en streaming; progreso en {progreso.ruta}")
+    # Margen para terminar el bloque en curso antes de cortar de forma forzada
+    limite_forzado = int(max_words * 1.15) if max_words else None
+    truncado = False
+    inicio = time.monotonic()
+    primer_fragmento = None
+
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        stream_options={'include_usage': True},
+        **params
+    )
+    try:
+        async for chunk in stream:
+            if chunk.usage is not None:
+                metricas.registrar_uso_tokens(chunk.usage, model, 'content')
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            if primer_fragmento is None:
+                primer_fragmento = time.monotonic() - inicio
+                metricas.observar('llm_primer_token', primer_fragmento, tipo='content')
+
+            limpiador.agregar(chunk.choices[0].delta.content)
+            progreso.actualizar(limpiador)
+
+            if max_words and limpiador.palabras >= max_words:
+                if limpiador.termina_en_bloque() or limpiador.palabras >= limite_forzado:
+                    truncado = True
+                    break
+    finally:
+        await stream.close()
+
+    if truncado:
+        limpiador.recortar_a_bloque()
+        metricas.contar('llm_stream_truncado', tipo='content')
+        logger.info(f"Generación detenida en {limpiador.palabras} palabras (máximo {max_words})")
+    else:
+        limpiador.terminar()
+    progreso.actualizar(limpiador, estado='truncado' if truncado else 'completo', forzar=True)
+    return limpiador.contenido
+
+def peticion_contenido(tema, config, article_settings=None):
+    """
+    Mensajes y parámetros de la petición del contenido de un artículo.
+
+    :param article_settings: Sección content_settings.article (ConfigArticulo); si
+                             no se indica, se usan sus valores por defecto
+    :return: Tupla (messages, params, content_settings); la usan generate_content y la Batch API
+    """
+    if article_settings is None:
+        # Importación diferida: settings_utils importa este módulo
+        from src.utils.settings_utils import ConfigArticulo
+        article_settings = ConfigArticulo()
+    min_words = article_settings.min_words
+    max_words = article_settings.max_words
+    min_sections = article_settings.min_sections
+    min_time = article_settings.reading_time_minutes['min']
+    max_time = article_settings.reading_time_minutes['max']
 
     # Obtener parámetros de generación
-    gen_params = config.get('generation_params', {}).get('content', {})
+    gen_params = config.parametros('content')
+
+    prompt = f"""Escribe un artículo detallado sobre {tema} que cumpla con estos requisitos:
+    - Longitud: entre {min_words} y {max_words} palabras
+    - Tiempo de lectura: {min_time}-{max_time} minutos
+    - Mínimo {min_sections} secciones
+    
+    Instrucciones de formato:
+    1. Usa HTML directo (no Markdown)
+    2. Estructura el contenido así:
+        - Un párrafo introductorio
+        - Secciones con <h2> para títulos
+        - Párrafos con <p>
+        - Énfasis con <strong> para puntos clave
+        - Enlaces con <a href="url">texto</a>
+    3. No escapes los caracteres HTML
+    4. No incluyas bloques de código
+    """
+
+    params = {
+        'temperature': gen_params.get('temperature', 0.3),
+        'presence_penalty': gen_params.get('presence_penalty', 0.1),
+        'frequency_penalty': gen_params.get('frequency_penalty', 0.1),
+        'max_tokens': gen_params.get('max_tokens', 4000)
+    }
+    messages = [
+        {"role": "system", "content": "Eres un escritor experto que genera contenido detallado y bien estructurado en HTML."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, params, article_settings
+
+async def generate_content(tema, api_key, config=None, use_cache=True, article_settings=None, ejecucion=None):
+    """
+    Genera contenido usando el contexto del cliente.
+
+    :param article_settings: Sección content_settings.article (ConfigArticulo); si
+                             no se indica, se usan sus valores por defecto. Con
+                             "stream": true la respuesta se procesa en streaming
+                             y se detiene al alcanzar max_words.
+    :param ejecucion: Identificador de la ejecución; solo con él se usa la caché
+    """
+    if not config:
+        raise ValueError("No se proporcionó configuración")
+
+    messages, params, content_settings = peticion_contenido(tema, config, article_settings)
+    prompt = messages[-1]['content']
+    max_words = content_settings.max_words
+    streaming = content_settings.stream
+
+    # El streaming puede truncar en max_words, así que usa su propia entrada de caché
+    params_cache = dict(params, stream_max_words=max_words) if streaming else params
+    cache, clave, content = _consultar_cache(
+        config, 'content', config.model, prompt, params_cache, use_cache, ejecucion=ejecucion
+    )
+    if content is not None:
+        return content
 
     try:
-        async with AsyncOpenAI(api_key=api_key) as client:
-            prompt = f"""Escribe un artículo detallado sobre {tema} que cumpla con estos requisitos:
-            - Longitud: entre {min_words} y {max_words} palabras
-            - Tiempo de lectura: {min_time}-{max_time} minutos
-            - Mínimo {min_sections} secciones
-            
-            Instrucciones de formato:
-            1. Usa HTML directo (no Markdown)
-            2. Estructura el contenido así:
-                - Un párrafo introductorio
-                - Secciones con <h2> para títulos
-                - Párrafos con <p>
-                - Énfasis con <strong> para puntos clave
-                - Enlaces con <a href="url">texto</a>
-            3. No escapes los caracteres HTML
-            4. No incluyas bloques de código
-            """
-            
-            response = await client.chat.completions.create(
-                model=config['model'],  # Cambiado aquí
-                messages=[
-                    {"role": "system", "content": "Eres un escritor experto que genera contenido detallado y bien estructurado en HTML."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=gen_params.get('temperature', 0.3),
-                presence_penalty=gen_params.get('presence_penalty', 0.1),
-                frequency_penalty=gen_params.get('frequency_penalty', 0.1),
-                max_tokens=gen_params.get('max_tokens', 4000)
-            )
-            
-            content = response.choices[0].message.content.strip()
+        async with openai_client_context(api_key, config) as client:
+            with metricas.medir('llm', tipo='content'):
+                if streaming:
+                    content = await _generar_contenido_streaming(
+                        client, config.model, messages, params, tema, max_words,
+                        content_settings.progress_dir
+                    )
+                else:
+                    response = await client.chat.completions.create(
+                        model=config.model,
+                        messages=messages,
+                        **params
+                    )
+                    metricas.registrar_uso_tokens(response.usage, config.model, 'content')
+                    content = response.choices[0].message.content
             
             # Limpiar cualquier residuo de formato no deseado
-            content = content.replace('```html', '')
-            content = content.replace('```', '')
-            content = content.replace('<!DOCTYPE html>', '')
-            content = content.replace('<html>', '')
-            content = content.replace('</html>', '')
-            
-            # Asegurar que el contenido comience con un párrafo
-            if not content.strip().startswith('<'):
-                content = f'<p>{content}</p>'
+            content = limpiar_contenido(content)
             
+            if cache:
+                cache.set(clave, content)
             return content
                 
     except Exception as e:
         logger.error(f"Error al generar contenido con OpenAI: {e}")
         raise
 
-async def generate_image_dalle(tema, api_key, config=None):
-    """Genera una imagen usando DALL-E con la configuración especificada"""
-    # Asegurar que config no sea None
-    config = config or {}
+async def generate_image_dalle(tema, api_key, config=None, use_cache=True, ejecucion=None):
+    """
+    Genera una imagen usando DALL-E con la configuración especificada.
+
+    :param ejecucion: Identificador de la ejecución; solo con él se usa la caché
+    """
+    if not config:
+        raise ValueError("Configuración no proporcionada")
+
+    model = config.image_model
+    prompt = f"Una imagen creativa y atractiva relacionada con {tema}, estilo obra de arte con estilo acuarela"
+    params = {
+        'n': 1,
+        'size': config.dalle_size,
+        'quality': config.dalle_quality
+    }
+    # Las URLs de DALL-E caducan, así que se usa un TTL propio más corto
+    ttl_imagen = obtener_config_cache(config)['image_ttl_seconds']
+    cache, clave, imagen_url = _consultar_cache(
+        config, 'image', model, prompt, params, use_cache, ttl_imagen, ejecucion
+    )
+    if imagen_url is not None:
+        return imagen_url
 
-    async with AsyncOpenAI(api_key=api_key) as client:
+    async with openai_client_context(api_key, config) as client:
         try:
-            prompt = f"Una imagen creativa y atractiva relacionada con {tema}, estilo obra de arte con estilo acuarela"
-            response = await client.images.generate(
-                prompt=prompt,
-                model=config.get('image_model', 'dall-e-3'),
-                n=1,
-                size=config.get('dalle_size', '1024x1024'),
-                quality=config.get('dalle_quality', 'standard')
-            )
+            with metricas.medir('image_generation'):
+                response = await client.images.generate(
+                    prompt=prompt,
+                    model=model,
+                    **params
+                )
             
             logger.info("Imagen DALL-E generada exitosamente")
-            return response.data[0].url
+            imagen_url = response.data[0].url
+            if cache:
+                cache.set(clave, imagen_url)
+            return imagen_url
         except Exception as e:
             print(f"Error detallado en generate_image_dalle: {type(e)}, {str(e)}")
             raise
 
-async def generate_news_summary(tema, prompt, api_key, config=None):
+async def generate_news_summary(tema, prompt, api_key, config=None, use_cache=True):
     """Genera un resumen de noticias."""
     if not config:
         raise ValueError("Configuración no proporcionada")
 
     try:
-        async with AsyncOpenAI(api_key=api_key) as client:
-            # Obtener el modelo directamente del config
-            model = config['model']
-            
-            response = await client.chat.completions.create(
-                model=model,  # Usar el modelo exacto del config
-                messages=[
-                    {"role": "system", "content": "Eres un experto en resumir noticias de manera objetiva y concisa."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=config.get('generation_params', {}).get('content', {}).get('max_tokens', 1500),
-                temperature=config.get('generation_params', {}).get('content', {}).get('temperature', 0.5)
-            )
+        model = config.model
+        content_params = config.parametros('content')
+        params = {
+            'max_tokens': content_params.get('max_tokens', 1500),
+            'temperature': content_params.get('temperature', 0.5)
+        }
+        cache, clave, resumen = _consultar_cache(config, 'news_summary', model, prompt, params, use_cache)
+        if resumen is not None:
+            return resumen
+
+        async with openai_client_context(api_key, config) as client:
+            with metricas.medir('llm', tipo='news_summary'):
+                response = await client.chat.completions.create(
+                    model=model,  # Usar el modelo exacto del config
+                    messages=[
+                        {"role": "system", "content": "Eres un experto en resumir noticias de manera objetiva y concisa."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    **params
+                )
+            if response is not None:
+                metricas.registrar_uso_tokens(response.usage, model, 'news_summary')
             
             if response and response.choices:
-                return response.choices[0].message.content.strip()
+                resumen = response.choices[0].message.content.strip()
+                if cache:
+                    cache.set(clave, resumen)
+                return resumen
             else:
                 logger.error("No se recibió una respuesta válida de OpenAI")
                 return f"No se pudo generar un resumen para {tema}."
                 
     except Exception as e:
         logger.error(f"Error al generar resumen para {tema}: {str(e)}")
-        logger.error(f"Modelo configurado: {config.get('model', 'no especificado')}")
+        logger.error(f"Modelo configurado: {config.model}")
         return f"No se pudo generar un resumen para {tema} debido a un error técnico."
 
+def _seccion_valida(valor):
+    """Un resumen válido es texto no vacío que no se quedó en una frase suelta."""
+    return isinstance(valor, str) and len(valor.strip()) >= 40
+
+async def generate_news_summaries(temas, prompt, api_key, config=None, use_cache=True):
+    """
+    Genera los resúmenes de varios temas en una sola llamada con respuesta JSON.
+
+    :param temas: Claves que debe tener el objeto JSON de la respuesta
+    :return: Diccionario clave -> resumen con solo las secciones válidas; vacío
+             si la llamada falla o la respuesta no es JSON. La respuesta solo se
+             guarda en caché cuando todas las secciones son válidas.
+    """
+    if not config:
+        raise ValueError("Configuración no proporcionada")
+
+    model = config.model
+    content_params = config.parametros('content')
+    params = {
+        # Espacio para todos los temas, sin pasar del máximo de salida del modelo
+        'max_tokens': min(content_params.get('max_tokens', 1500) * len(temas), MAX_TOKENS_AGRUPADO),
+        'temperature': content_params.get('temperature', 0.5),
+        'response_format': {'type': 'json_object'}
+    }
+    cache, clave, resumenes = _consultar_cache(config, 'news_summary_batch', model, prompt, params, use_cache)
+    if resumenes is not None:
+        return resumenes
+
+    try:
+        async with openai_client_context(api_key, config) as client:
+            with metricas.medir('llm', tipo='news_summary_batch'):
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "Eres un experto en resumir noticias de manera objetiva y concisa. Respondes solo con JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    **params
+                )
+            metricas.registrar_uso_tokens(response.usage, model, 'news_summary_batch')
+            datos = json.loads(response.choices[0].message.content)
+    except Exception as e:
+        logger.error(f"Error al generar resúmenes agrupados de {len(temas)} temas: {e}")
+        return {}
+
+    if not isinstance(datos, dict):
+        logger.error("La respuesta agrupada no es un objeto JSON")
+        return {}
+    resumenes = {tema: datos[tema].strip() for tema in temas if _seccion_valida(datos.get(tema))}
+    if cache and len(resumenes) == len(temas):
+        cache.set(clave, resumenes)
+    return resumenes
+
 # Al final del archivo, agrega:
 __all__ = [
     'generate_title', 
     'generate_content', 
     'generate_image_dalle', 
     'generate_news_summary',
+    'generate_news_summaries',
+    'obtener_cliente_openai',
+    'cerrar_clientes_openai',
     'analyze_with_chatgpt'
 ]
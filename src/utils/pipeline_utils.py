@@ -0,0 +1,122 @@
+# Proyecto: Content Processor
+# Script: Ejecutor de etapas con dependencias
+# Autor: Eduardo Llaguno Velasco
+
+import asyncio
+import time
+from functools import partial
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import metricas
+
+logger = get_logger(__name__)
+
+
+class Etapa:
+    """
+    Etapa de un pipeline: una función asíncrona y los nombres de las etapas de las que depende.
+
+    La función recibe como argumentos con nombre los resultados de sus dependencias.
+    """
+
+    def __init__(self, nombre, funcion, dependencias=()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.dependencias = tuple(dependencias)
+
+
+async def ejecutar_bloqueante(funcion, *args, **kwargs):
+    """Ejecuta una función bloqueante en el executor por defecto sin bloquear el event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(funcion, *args, **kwargs))
+
+
+def _validar_grafo(etapas):
+    """Verifica que todas las dependencias existan y que no haya ciclos."""
+    for etapa in etapas.values():
+        for dep in etapa.dependencias:
+            if dep not in etapas:
+                raise ValueError(f"La etapa '{etapa.nombre}' depende de '{dep}', que no existe")
+
+    visitadas, en_curso = set(), set()
+
+    def visitar(nombre):
+        if nombre in en_curso:
+            raise ValueError(f"Ciclo detectado en el pipeline en la etapa '{nombre}'")
+        if nombre in visitadas:
+            return
+        en_curso.add(nombre)
+        for dep in etapas[nombre].dependencias:
+            visitar(dep)
+        en_curso.discard(nombre)
+        visitadas.add(nombre)
+
+    for nombre in etapas:
+        visitar(nombre)
+
+
+def ruta_critica(etapas, tiempos):
+    """
+    Calcula la ruta crítica a partir de los tiempos de cada etapa.
+
+    :param tiempos: Diccionario nombre -> (inicio, fin) relativos al arranque
+    :return: Lista de (nombre, duración) desde la primera etapa hasta la última en terminar
+    """
+    if not tiempos:
+        return []
+    nombre = max(tiempos, key=lambda n: tiempos[n][1])
+    ruta = []
+    while nombre:
+        inicio, fin = tiempos[nombre]
+        ruta.append((nombre, fin - inicio))
+        deps = [d for d in etapas[nombre].dependencias if d in tiempos]
+        nombre = max(deps, key=lambda d: tiempos[d][1]) if deps else None
+    ruta.reverse()
+    return ruta
+
+
+async def ejecutar_pipeline(etapas, nombre_pipeline="pipeline"):
+    """
+    Ejecuta un conjunto de etapas respetando sus dependencias.
+
+    Las etapas independientes corren de forma concurrente y cada etapa se ejecuta
+    exactamente una vez. Si una etapa falla, se cancelan las pendientes y se
+    propaga la excepción.
+
+    :param etapas: Lista de objetos Etapa
+    :return: Tupla (resultados por etapa, ruta crítica como lista de (nombre, duración))
+    """
+    etapas = {etapa.nombre: etapa for etapa in etapas}
+    _validar_grafo(etapas)
+
+    inicio_pipeline = time.monotonic()
+    tareas = {}
+    resultados = {}
+    tiempos = {}
+
+    async def correr(etapa):
+        if etapa.dependencias:
+            await asyncio.gather(*(tareas[dep] for dep in etapa.dependencias))
+        argumentos = {dep: resultados[dep] for dep in etapa.dependencias}
+        inicio = time.monotonic() - inicio_pipeline
+        resultado = await etapa.funcion(**argumentos)
+        tiempos[etapa.nombre] = (inicio, time.monotonic() - inicio_pipeline)
+        metricas.observar('pipeline', tiempos[etapa.nombre][1] - inicio, paso=etapa.nombre)
+        resultados[etapa.nombre] = resultado
+        return resultado
+
+    for etapa in etapas.values():
+        tareas[etapa.nombre] = asyncio.ensure_future(correr(etapa))
+
+    try:
+        await asyncio.gather(*tareas.values())
+    except Exception:
+        for tarea in tareas.values():
+            tarea.cancel()
+        await asyncio.gather(*tareas.values(), return_exceptions=True)
+        raise
+
+    ruta = ruta_critica(etapas, tiempos)
+    total = time.monotonic() - inicio_pipeline
+    detalle = " -> ".join(f"{nombre} ({duracion:.2f}s)" for nombre, duracion in ruta)
+    logger.info(f"Ruta crítica de {nombre_pipeline} ({total:.2f}s): {detalle}")
+    return resultados, ruta
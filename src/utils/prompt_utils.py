@@ -0,0 +1,134 @@
+# Proyecto: Content Processor
+# Script: Construcción compacta de prompts y presupuesto de tokens
+# Autor: Eduardo Llaguno Velasco
+
+import html
+import re
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Tokens que se reservan para el contexto de noticias de cada tema
+DEFAULT_TOKEN_BUDGET = 800
+
+# Una descripción más corta que esto no aporta nada frente al titular
+MIN_CARACTERES_DESCRIPCION = 25
+
+_ETIQUETA = re.compile(r'<[^>]+>')
+_ESPACIOS = re.compile(r'\s+')
+_SANGRIA = re.compile(r'\n[ \t]+')
+_PIEZA = re.compile(r'\w+|[^\w\s]')
+
+# Codificador de tiktoken si está instalado; False si no lo está
+_codificador = None
+
+
+def estimar_tokens(texto):
+    """
+    Estima los tokens de un texto sin llamar a la API.
+
+    Usa tiktoken si está instalado; si no, una aproximación por palabras y
+    signos que sobreestima ligeramente el español.
+    """
+    global _codificador
+    if not texto:
+        return 0
+    if _codificador is None:
+        try:
+            import tiktoken
+            _codificador = tiktoken.get_encoding('o200k_base')
+        except Exception:
+            _codificador = False
+    if _codificador:
+        return len(_codificador.encode(texto))
+
+    tokens = 0
+    for pieza in _PIEZA.findall(texto):
+        # Las palabras largas se parten en varios tokens
+        tokens += 1 + len(pieza) // 6
+    return tokens
+
+
+def texto_plano(contenido):
+    """Quita las etiquetas HTML y las entidades, y colapsa los espacios."""
+    return _ESPACIOS.sub(' ', html.unescape(_ETIQUETA.sub(' ', contenido or ''))).strip()
+
+
+def compactar_prompt(prompt):
+    """Quita la sangría que dejan las cadenas multilínea del código."""
+    return _SANGRIA.sub('\n', prompt.strip())
+
+
+def titular_sin_medio(titulo, fuente):
+    """Quita el sufijo ' - Medio' que Google News agrega cuando repite la fuente."""
+    titulo = texto_plano(titulo)
+    if fuente and titulo.endswith(f" - {fuente}"):
+        return titulo[:-len(fuente) - 3].rstrip()
+    return titulo
+
+
+def compactar_descripcion(descripcion, titulo, fuente):
+    """
+    Limpia la descripción de una noticia y quita lo que repite el titular.
+
+    Las descripciones de Google News suelen ser el mismo titular enlazado
+    seguido del nombre del medio; en ese caso no queda nada que enviar.
+    """
+    texto = texto_plano(descripcion)
+    for repetido in (titulo, fuente):
+        if repetido and texto.lower().startswith(repetido.lower()):
+            texto = texto[len(repetido):].lstrip(' -–|:')
+    if fuente and texto.endswith(fuente):
+        texto = texto[:-len(fuente)].rstrip(' -–|')
+    return texto if len(texto) >= MIN_CARACTERES_DESCRIPCION else ''
+
+
+def _linea_noticia(numero, titulo, fuente, descripcion):
+    linea = f"[{numero}] {titulo}"
+    if fuente:
+        linea += f" ({fuente})"
+    if descripcion:
+        linea += f": {descripcion}"
+    return linea
+
+
+def construir_contexto_noticias(noticias, presupuesto_tokens=DEFAULT_TOKEN_BUDGET):
+    """
+    Construye el bloque de noticias de un prompt dentro de un presupuesto de tokens.
+
+    Cada noticia ocupa una línea con un número de referencia en lugar de su
+    enlace; el número coincide con el de formatear_referencias(). Si el bloque
+    no cabe, primero se recortan las descripciones de las últimas noticias y
+    después se omiten noticias completas, empezando por las últimas.
+
+    :return: Tupla (texto del bloque, tokens estimados)
+    """
+    entradas = []
+    for numero, noticia in enumerate(noticias, 1):
+        fuente = texto_plano(noticia.get('fuente', ''))
+        titulo = titular_sin_medio(noticia['titulo'], fuente)
+        descripcion = compactar_descripcion(noticia.get('descripcion', ''), titulo, fuente)
+        entradas.append([numero, titulo, fuente, descripcion])
+
+    def medir():
+        lineas = [_linea_noticia(*entrada) for entrada in entradas]
+        texto = "\n".join(lineas)
+        return texto, estimar_tokens(texto)
+
+    texto, tokens = medir()
+    for entrada in reversed(entradas):
+        if tokens <= presupuesto_tokens:
+            break
+        if entrada[3]:
+            entrada[3] = ''
+            texto, tokens = medir()
+
+    omitidas = 0
+    while tokens > presupuesto_tokens and len(entradas) > 1:
+        entradas.pop()
+        omitidas += 1
+        texto, tokens = medir()
+    if omitidas:
+        logger.info(f"{omitidas} noticias omitidas del prompt por el presupuesto de {presupuesto_tokens} tokens")
+
+    return texto, tokens
@@ -0,0 +1,91 @@
+# Proyecto: Content Processor
+# Script: Lectura incremental de feeds RSS/Atom
+# Autor: Eduardo Llaguno Velasco
+
+import io
+from typing import TypedDict
+from lxml import etree
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+ETIQUETAS_ITEM = ('item', f'{ATOM}entry')
+
+
+class ItemFeed(TypedDict):
+    """Registro de un item de feed RSS o Atom."""
+    titulo: str
+    link: str
+    fecha: str
+    descripcion: str
+    fuente: str
+
+
+def _texto(elemento, *nombres):
+    """Devuelve el texto del primer hijo que coincida con alguno de los nombres."""
+    for nombre in nombres:
+        hijo = elemento.find(nombre)
+        if hijo is not None:
+            return (hijo.text or '').strip()
+    return ''
+
+
+def _link(elemento):
+    link = _texto(elemento, 'link')
+    if link:
+        return link
+    # Atom: <link rel="alternate" href="..."/>
+    for hijo in elemento.iterfind(f'{ATOM}link'):
+        if hijo.get('rel', 'alternate') == 'alternate':
+            return hijo.get('href', '')
+    return ''
+
+
+def iterar_items(contenido, limite=None):
+    """
+    Recorre los items de un feed RSS o Atom sin construir el árbol completo.
+
+    Cada elemento se libera en cuanto se procesa y la lectura se detiene al
+    alcanzar el límite, por lo que el resto del documento no se analiza.
+
+    :param contenido: Bytes del feed
+    :param limite: Número máximo de items a devolver (None para todos)
+    :return: Iterador de ItemFeed
+    """
+    if limite is not None and limite <= 0:
+        return
+
+    contexto = etree.iterparse(
+        io.BytesIO(contenido),
+        events=('end',),
+        tag=ETIQUETAS_ITEM,
+        recover=True,
+        resolve_entities=False
+    )
+    leidos = 0
+    try:
+        for _, elemento in contexto:
+            yield ItemFeed(
+                titulo=_texto(elemento, 'title', f'{ATOM}title'),
+                link=_link(elemento),
+                fecha=_texto(elemento, 'pubDate', f'{ATOM}published', f'{ATOM}updated'),
+                descripcion=_texto(elemento, 'description', f'{ATOM}summary', f'{ATOM}content'),
+                fuente=_texto(elemento, 'source', f'{ATOM}source')
+            )
+            leidos += 1
+
+            # Liberar el elemento y los hermanos anteriores ya procesados
+            elemento.clear()
+            while elemento.getprevious() is not None:
+                del elemento.getparent()[0]
+
+            if limite is not None and leidos >= limite:
+                break
+    finally:
+        del contexto
+
+
+def leer_items(contenido, limite=None):
+    """Devuelve como lista los primeros items del feed."""
+    return list(iterar_items(contenido, limite))
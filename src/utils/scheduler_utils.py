@@ -0,0 +1,286 @@
+# Proyecto: Content Processor
+# Script: Programador de tareas para el modo daemon
+# Autor: Eduardo Llaguno Velasco
+
+import asyncio
+import fcntl
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Mismos intervalos que el programador de cron del plugin de WordPress
+FRECUENCIAS = {
+    'hourly': 3600,
+    'sixhourly': 21600,
+    'eighthourly': 28800,
+    'twicedaily': 43200,
+    'daily': 86400,
+    'weekly': 604800
+}
+
+TIPOS_TAREA = ('articulo', 'noticias')
+
+DEFAULT_SCHEDULE_CONFIG = {
+    # Retraso aleatorio máximo que se suma a cada ejecución
+    'jitter_seconds': 120,
+    # Espera inicial de las tareas sin hora fija
+    'initial_delay_seconds': 60,
+    # Tiempo que se espera a las tareas en curso al detener el daemon
+    'shutdown_timeout': 600,
+    'lock_dir': os.path.join(STORAGE_DIR, 'locks'),
+    'jobs': []
+}
+
+
+class TrabajoEnCurso(RuntimeError):
+    """Otro proceso está ejecutando el mismo tipo de trabajo para el sitio."""
+
+
+def tomar_bloqueo(lock_dir, tipo, sitio):
+    """
+    Toma el bloqueo entre procesos de un tipo de trabajo y sitio.
+
+    :return: Archivo de bloqueo abierto, o None si otro proceso lo tiene
+    """
+    os.makedirs(lock_dir, exist_ok=True)
+    archivo = open(os.path.join(lock_dir, f"{tipo}_{sitio}.lock"), 'a+')
+    try:
+        fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        archivo.close()
+        return None
+    archivo.seek(0)
+    archivo.truncate()
+    archivo.write(str(os.getpid()))
+    archivo.flush()
+    return archivo
+
+
+def liberar_bloqueo(archivo):
+    fcntl.flock(archivo, fcntl.LOCK_UN)
+    archivo.close()
+
+
+@contextmanager
+def bloqueo_trabajo(tipo, sitio, lock_dir=DEFAULT_SCHEDULE_CONFIG['lock_dir']):
+    """
+    Bloqueo de un trabajo para las ejecuciones sueltas (cron): es el mismo
+    archivo que usa el Programador, así que no se solapan con el daemon.
+
+    :raises TrabajoEnCurso: Si otro proceso tiene el bloqueo
+    """
+    archivo = tomar_bloqueo(lock_dir, tipo, sitio)
+    if archivo is None:
+        raise TrabajoEnCurso(f"Ya hay una ejecución de {tipo} para el sitio {sitio} en curso en otro proceso")
+    try:
+        yield
+    finally:
+        liberar_bloqueo(archivo)
+
+
+class TareaProgramada:
+    """
+    Tarea periódica de un sitio: un artículo o un resumen de noticias.
+
+    Con 'hora' (HH:MM, hora local) las ejecuciones se alinean a esa hora;
+    sin ella, la primera ejecución ocurre tras el retraso inicial. El jitter
+    se suma a cada ejecución sin desplazar las siguientes.
+    """
+
+    def __init__(self, tipo, sitio, frecuencia='daily', hora=None, tema=None, jitter=0, retraso_inicial=60):
+        if tipo not in TIPOS_TAREA:
+            raise ValueError(f"Tipo de tarea desconocido: {tipo}")
+        if isinstance(frecuencia, str):
+            if frecuencia not in FRECUENCIAS:
+                raise ValueError(f"Frecuencia desconocida: {frecuencia}")
+            self.intervalo = FRECUENCIAS[frecuencia]
+        else:
+            self.intervalo = int(frecuencia)
+        if self.intervalo <= 0:
+            raise ValueError(f"Frecuencia inválida: {frecuencia}")
+
+        self.tipo = tipo
+        self.sitio = sitio
+        self.frecuencia = frecuencia
+        self.hora = self._leer_hora(hora) if hora else None
+        self.tema = tema
+        self.jitter = max(0, jitter)
+        self.retraso_inicial = retraso_inicial
+        self._base = None
+        self.proxima = None
+
+    @property
+    def nombre(self):
+        return f"{self.tipo}:{self.sitio}"
+
+    @staticmethod
+    def _leer_hora(hora):
+        try:
+            horas, minutos = (int(p) for p in str(hora).split(':'))
+        except ValueError:
+            raise ValueError(f"Hora inválida (se espera HH:MM): {hora}")
+        if not (0 <= horas < 24 and 0 <= minutos < 60):
+            raise ValueError(f"Hora inválida (se espera HH:MM): {hora}")
+        return horas, minutos
+
+    def programar(self, ahora=None):
+        """Calcula la siguiente ejecución posterior a 'ahora'."""
+        ahora = time.time() if ahora is None else ahora
+        if self._base is None:
+            if self.hora:
+                local = datetime.fromtimestamp(ahora)
+                inicio = local.replace(hour=self.hora[0], minute=self.hora[1], second=0, microsecond=0)
+                if inicio > local:
+                    inicio -= timedelta(days=1)
+                self._base = inicio.timestamp()
+            else:
+                self._base = ahora + self.retraso_inicial - self.intervalo
+
+        # Saltar las ejecuciones que ya pasaron (por ejemplo, tras una ejecución larga)
+        while self._base < ahora:
+            self._base += self.intervalo
+        self.proxima = self._base + random.uniform(0, self.jitter)
+        return self.proxima
+
+
+class Programador:
+    """
+    Ejecuta tareas periódicas dentro de un mismo proceso.
+
+    Una tarea no se lanza si la anterior del mismo tipo y sitio sigue en
+    curso, ya sea en este proceso o en otro (por ejemplo, una ejecución de
+    cron con publica.py, que toma el mismo bloqueo con bloqueo_trabajo).
+    """
+
+    def __init__(self, tareas, ejecutor, lock_dir=DEFAULT_SCHEDULE_CONFIG['lock_dir'],
+                 shutdown_timeout=DEFAULT_SCHEDULE_CONFIG['shutdown_timeout']):
+        """
+        :param tareas: Lista de TareaProgramada
+        :param ejecutor: Función asíncrona que recibe la tarea y la ejecuta
+        """
+        if not tareas:
+            raise ValueError("No hay tareas programadas")
+        self.tareas = tareas
+        self.ejecutor = ejecutor
+        self.lock_dir = lock_dir
+        self.shutdown_timeout = shutdown_timeout
+        self._detener = asyncio.Event()
+        self._en_curso = {}
+
+    def detener(self):
+        """Deja de lanzar tareas; las que están en curso terminan antes de salir."""
+        if not self._detener.is_set():
+            logger.info("Deteniendo el programador...")
+            self._detener.set()
+
+    async def _correr(self, tarea):
+        archivo = tomar_bloqueo(self.lock_dir, tarea.tipo, tarea.sitio)
+        if archivo is None:
+            logger.warning(f"Ejecución de {tarea.nombre} omitida: hay otra en curso en otro proceso")
+            return
+        inicio = time.monotonic()
+        try:
+            logger.info(f"Iniciando tarea {tarea.nombre}")
+            resultado = await self.ejecutor(tarea)
+            logger.info(f"Tarea {tarea.nombre} terminada en {time.monotonic() - inicio:.1f}s: {resultado}")
+        except asyncio.CancelledError:
+            logger.warning(f"Tarea {tarea.nombre} cancelada")
+            raise
+        except Exception as e:
+            # Un fallo no detiene el daemon; la tarea se vuelve a intentar en su siguiente turno
+            logger.error(f"Error en tarea programada {tarea.nombre}: {e}")
+        finally:
+            liberar_bloqueo(archivo)
+
+    def _lanzar(self, tarea):
+        if tarea.nombre in self._en_curso:
+            logger.warning(f"Ejecución de {tarea.nombre} omitida: la anterior sigue en curso")
+            return
+        ejecucion = asyncio.ensure_future(self._correr(tarea))
+        self._en_curso[tarea.nombre] = ejecucion
+        ejecucion.add_done_callback(lambda _: self._en_curso.pop(tarea.nombre, None))
+
+    async def ejecutar(self):
+        """Bucle principal: espera a la siguiente tarea hasta que se llame a detener()."""
+        for tarea in self.tareas:
+            tarea.programar()
+            logger.info(
+                f"Tarea {tarea.nombre} ({tarea.frecuencia}) programada para "
+                f"{datetime.fromtimestamp(tarea.proxima):%Y-%m-%d %H:%M:%S}"
+            )
+
+        while not self._detener.is_set():
+            tarea = min(self.tareas, key=lambda t: t.proxima)
+            espera = tarea.proxima - time.time()
+            if espera > 0:
+                try:
+                    await asyncio.wait_for(self._detener.wait(), timeout=espera)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            self._lanzar(tarea)
+            tarea.programar()
+            logger.info(
+                f"Siguiente ejecución de {tarea.nombre}: "
+                f"{datetime.fromtimestamp(tarea.proxima):%Y-%m-%d %H:%M:%S}"
+            )
+
+        await self._esperar_en_curso()
+
+    async def _esperar_en_curso(self):
+        pendientes = list(self._en_curso.values())
+        if not pendientes:
+            return
+        logger.info(f"Esperando a {len(pendientes)} tareas en curso (máximo {self.shutdown_timeout}s)")
+        _, sin_terminar = await asyncio.wait(pendientes, timeout=self.shutdown_timeout)
+        for ejecucion in sin_terminar:
+            ejecucion.cancel()
+        if sin_terminar:
+            await asyncio.gather(*sin_terminar, return_exceptions=True)
+
+
+def obtener_config_programador(config=None):
+    """Combina la sección 'schedule' con los valores por defecto."""
+    schedule_config = dict(DEFAULT_SCHEDULE_CONFIG)
+    if config:
+        schedule_config.update(config.get('schedule', {}))
+    return schedule_config
+
+
+def crear_programador(config, ejecutor):
+    """
+    Construye el programador a partir de 'schedule.jobs'.
+
+    Cada trabajo indica 'type' (articulo o noticias), 'site' y opcionalmente
+    'frequency', 'time', 'topic', 'jitter_seconds' y 'enabled'. Los errores de
+    configuración se detectan aquí, antes de arrancar el daemon.
+    """
+    schedule_config = obtener_config_programador(config)
+    sitios = config.get('sites', {})
+    tareas = []
+    for trabajo in schedule_config['jobs']:
+        if not trabajo.get('enabled', True):
+            continue
+        if trabajo.get('site') not in sitios:
+            raise ValueError(f"Trabajo programado con sitio no configurado: {trabajo.get('site')}")
+        tareas.append(TareaProgramada(
+            trabajo.get('type'),
+            trabajo['site'],
+            frecuencia=trabajo.get('frequency', 'daily'),
+            hora=trabajo.get('time'),
+            tema=trabajo.get('topic'),
+            jitter=trabajo.get('jitter_seconds', schedule_config['jitter_seconds']),
+            retraso_inicial=schedule_config['initial_delay_seconds']
+        ))
+    return Programador(
+        tareas,
+        ejecutor,
+        lock_dir=schedule_config['lock_dir'],
+        shutdown_timeout=schedule_config['shutdown_timeout']
+    )
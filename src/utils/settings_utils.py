@@ -0,0 +1,504 @@
+# Proyecto: Content Processor
+# Script: Configuración tipada, validada y recargable
+# Autor: Eduardo Llaguno Velasco
+
+"""
+Modelo tipado de wordpress_config.json.
+
+El archivo se lee y valida una sola vez; los errores se reúnen en una sola
+excepción (ErrorConfiguracion) con la ruta de cada problema, para que un
+proceso falle al arrancar y no a mitad de una publicación. En procesos
+largos (modo daemon), ConfiguracionRecargable vuelve a cargar el archivo
+cuando cambia su fecha de modificación y conserva la configuración anterior
+si la nueva no es válida.
+
+Las funciones de generación reciben las secciones tipadas (openai,
+articulo, noticias, sitios, temas, imagen, metricas), que son la única
+fuente de valores por defecto. Las secciones que ya tienen su DEFAULT_* en
+el módulo que las usa (http, archive, schedule, image_settings.output y las
+subsecciones de openai) se validan contra él y se leen con su
+obtener_config_*.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field, fields, MISSING
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+from src.utils.archive_utils import DEFAULT_ARCHIVE_CONFIG
+from src.utils.batch_utils import DEFAULT_BATCH_CONFIG
+from src.utils.cache_utils import DEFAULT_CACHE_CONFIG
+from src.utils.dedup_utils import DEFAULT_DISTANCIA, MAX_DISTANCIA
+from src.utils.http_utils import DEFAULT_HTTP_CONFIG
+from src.utils.image_utils import DEFAULT_OUTPUT_CONFIG, FORMATOS_SALIDA
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import DEFAULT_METRICS_DIR
+from src.utils.openai_utils import DEFAULT_POOL_CONFIG
+from src.utils.prompt_utils import DEFAULT_TOKEN_BUDGET
+from src.utils.scheduler_utils import DEFAULT_SCHEDULE_CONFIG, TareaProgramada
+
+logger = get_logger(__name__)
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / 'config' / 'wordpress_config.json'
+
+BACKENDS_WORDPRESS = ('xmlrpc', 'rest')
+
+# Configuración recargable compartida por el proceso
+_compartida = None
+
+# Secciones conocidas del archivo; las demás se señalan como posibles erratas
+SECCIONES = (
+    'openai', 'http', 'metrics', 'schedule', 'archive', 'image_settings',
+    'content_settings', 'sites', 'article_topics', 'news_topics'
+)
+
+
+class ErrorConfiguracion(ValueError):
+    """Configuración inválida; 'errores' contiene un mensaje por problema."""
+
+    def __init__(self, errores, ruta=None):
+        self.errores = errores
+        self.ruta = ruta
+        origen = f" en {ruta}" if ruta else ""
+        super().__init__(f"Configuración inválida{origen}:\n  - " + "\n  - ".join(errores))
+
+
+@dataclass(frozen=True)
+class ConfigOpenAI:
+    api_key: str
+    model: str = 'gpt-4o'
+    image_model: str = 'dall-e-3'
+    base_url: Optional[str] = None
+    max_retries: int = 3
+    initial_retry_delay: float = 1
+    max_retry_delay: float = 60
+    dalle_size: str = '1024x1024'
+    dalle_quality: str = 'standard'
+    generation_params: dict = field(default_factory=dict)
+    # Subsecciones validadas contra DEFAULT_POOL_CONFIG, DEFAULT_CACHE_CONFIG y DEFAULT_BATCH_CONFIG
+    http_pool: dict = field(default_factory=dict)
+    cache: dict = field(default_factory=dict)
+    batch: dict = field(default_factory=dict)
+
+    def parametros(self, tipo):
+        """Parámetros de generation_params para un tipo de petición ('content', ...)."""
+        return self.generation_params.get(tipo, {})
+
+    def validar(self, ruta):
+        errores = []
+        if not self.api_key.strip():
+            errores.append(f"{ruta}.api_key: no puede estar vacía")
+        if self.max_retries < 1:
+            errores.append(f"{ruta}.max_retries: debe ser al menos 1")
+        if self.initial_retry_delay < 0 or self.max_retry_delay < self.initial_retry_delay:
+            errores.append(f"{ruta}: se requiere 0 <= initial_retry_delay <= max_retry_delay")
+        return errores
+
+
+@dataclass(frozen=True)
+class ConfigSitio:
+    nombre: str
+    url: str
+    username: str = ''
+    password: str = ''
+    backend: str = 'xmlrpc'
+    rest_url: Optional[str] = None
+    application_password: str = ''
+
+    def validar(self, ruta):
+        errores = []
+        if self.backend not in BACKENDS_WORDPRESS:
+            errores.append(f"{ruta}.backend: debe ser uno de {', '.join(BACKENDS_WORDPRESS)}")
+        # Sin rest_url, la URL de la API REST se obtiene de la de XML-RPC (obtener_url_rest)
+        if self.backend == 'rest' and not (self.username and (self.application_password or self.password)):
+            errores.append(f"{ruta}: el backend 'rest' requiere username y application_password")
+        if self.backend == 'xmlrpc' and not (self.username and self.password):
+            errores.append(f"{ruta}: el backend 'xmlrpc' requiere username y password")
+        return errores
+
+
+@dataclass(frozen=True)
+class ConfigArticulo:
+    min_words: int = 1200
+    max_words: int = 1500
+    min_sections: int = 4
+    max_new_tags: int = 2
+    stream: bool = False
+    reading_time_minutes: dict = field(default_factory=lambda: {'min': 6, 'max': 10})
+    # Directorio del avance del streaming; por defecto storage/progreso
+    progress_dir: Optional[str] = None
+
+    def validar(self, ruta):
+        errores = []
+        if not 0 < self.min_words <= self.max_words:
+            errores.append(f"{ruta}: se requiere 0 < min_words <= max_words")
+        tiempo = self.reading_time_minutes
+        if not (isinstance(tiempo.get('min'), int) and isinstance(tiempo.get('max'), int)
+                and 0 < tiempo['min'] <= tiempo['max']):
+            errores.append(f"{ruta}.reading_time_minutes: se requieren min y max enteros con 0 < min <= max")
+        return errores
+
+
+@dataclass(frozen=True)
+class ConfigNoticias:
+    max_concurrent_summaries: int = 4
+    url_history_days: int = 30
+    near_duplicate_distance: int = DEFAULT_DISTANCIA
+    check_wordpress: bool = True
+    feed_base_url: str = 'https://news.google.com'
+    prompt_token_budget: int = DEFAULT_TOKEN_BUDGET
+    batch_summaries: bool = False
+    batch_size: int = 4
+
+    def validar(self, ruta):
+        errores = []
+        for nombre in ('max_concurrent_summaries', 'prompt_token_budget', 'batch_size'):
+            if getattr(self, nombre) < 1:
+                errores.append(f"{ruta}.{nombre}: debe ser al menos 1")
+        if not 0 <= self.near_duplicate_distance <= MAX_DISTANCIA:
+            errores.append(f"{ruta}.near_duplicate_distance: debe estar entre 0 y {MAX_DISTANCIA}")
+        return errores
+
+
+@dataclass(frozen=True)
+class TemaNoticias:
+    nombre: str
+    imagen: str
+
+
+@dataclass(frozen=True)
+class ConfigSello:
+    enabled: bool = False
+    path: str = ''
+
+
+@dataclass(frozen=True)
+class ConfigImagen:
+    save_local: bool = True
+    watermark: ConfigSello = ConfigSello()
+
+
+@dataclass(frozen=True)
+class ConfigMetricas:
+    enabled: bool = True
+    dir: str = DEFAULT_METRICS_DIR
+    # Textfile de Prometheus (node_exporter); sin él solo se escribe el JSON
+    textfile: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Configuracion:
+    openai: ConfigOpenAI
+    sitios: Dict[str, ConfigSitio]
+    articulo: ConfigArticulo
+    noticias: ConfigNoticias
+    temas_articulos: Tuple[str, ...]
+    temas_noticias: Tuple[TemaNoticias, ...]
+    imagen: ConfigImagen
+    metricas: ConfigMetricas
+    # Diccionario original, para las secciones que se leen con obtener_config_*
+    datos: dict = field(repr=False)
+    ruta: Optional[str] = None
+    mtime: Optional[float] = None
+
+    def sitio(self, nombre):
+        """Devuelve la configuración del sitio o lanza ErrorConfiguracion."""
+        if nombre not in self.sitios:
+            raise ErrorConfiguracion([f"sites.{nombre}: el sitio no está configurado"], self.ruta)
+        return self.sitios[nombre]
+
+
+def _nombre_tipo(tipo):
+    if get_origin(tipo) is Union:
+        return ' o '.join(_nombre_tipo(t) for t in get_args(tipo))
+    return {type(None): 'null', float: 'número'}.get(tipo, getattr(tipo, '__name__', str(tipo)))
+
+
+def _tipo_valido(valor, tipo):
+    if get_origin(tipo) is Union:
+        return any(_tipo_valido(valor, t) for t in get_args(tipo))
+    if tipo is type(None):
+        return valor is None
+    if tipo is float:
+        return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+    if tipo is int:
+        return isinstance(valor, int) and not isinstance(valor, bool)
+    return isinstance(valor, tipo)
+
+
+def _construir(clase, datos, ruta, errores, **fijos):
+    """
+    Crea una instancia de la dataclass con los campos presentes en 'datos',
+    comprobando sus tipos. Devuelve None si falta un campo obligatorio.
+    """
+    if not isinstance(datos, dict):
+        errores.append(f"{ruta}: se esperaba un objeto")
+        datos = {}
+    tipos = get_type_hints(clase)
+    valores = dict(fijos)
+    completo = True
+    for campo in fields(clase):
+        if campo.name in valores:
+            continue
+        if campo.name not in datos:
+            if campo.default is MISSING and campo.default_factory is MISSING:
+                errores.append(f"{ruta}.{campo.name}: campo obligatorio")
+                completo = False
+            continue
+        valor = datos[campo.name]
+        if not _tipo_valido(valor, tipos[campo.name]):
+            errores.append(
+                f"{ruta}.{campo.name}: se esperaba {_nombre_tipo(tipos[campo.name])}, "
+                f"no {type(valor).__name__} ({valor!r})"
+            )
+            if campo.default is MISSING and campo.default_factory is MISSING:
+                completo = False
+            continue
+        valores[campo.name] = valor
+    if not completo:
+        return None
+    instancia = clase(**valores)
+    if hasattr(instancia, 'validar'):
+        errores.extend(instancia.validar(ruta))
+    return instancia
+
+
+def _mismo_tipo(valor, referencia):
+    if isinstance(referencia, bool):
+        return isinstance(valor, bool)
+    if isinstance(referencia, (int, float)):
+        return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+    return isinstance(valor, type(referencia))
+
+
+def _validar_contra_defaults(datos, defaults, ruta, errores):
+    """Comprueba que cada clave con valor por defecto tenga el mismo tipo que este."""
+    if not isinstance(datos, dict):
+        errores.append(f"{ruta}: se esperaba un objeto")
+        return
+    for clave, valor in datos.items():
+        referencia = defaults.get(clave)
+        if referencia is None:
+            continue
+        if isinstance(referencia, dict):
+            _validar_contra_defaults(valor, referencia, f"{ruta}.{clave}", errores)
+        elif not _mismo_tipo(valor, referencia):
+            errores.append(
+                f"{ruta}.{clave}: se esperaba {type(referencia).__name__}, no {type(valor).__name__} ({valor!r})"
+            )
+
+
+# Tipos de los campos opcionales de cada trabajo; 'frequency' y 'time' los valida TareaProgramada
+TIPOS_TRABAJO = {
+    'jitter_seconds': float,
+    'enabled': bool,
+    'topic': str,
+    'time': str
+}
+
+
+def _validar_programacion(datos, sitios, errores):
+    _validar_contra_defaults(datos, DEFAULT_SCHEDULE_CONFIG, 'schedule', errores)
+    if not isinstance(datos, dict):
+        return
+    for i, trabajo in enumerate(datos.get('jobs', [])):
+        ruta = f"schedule.jobs[{i}]"
+        if not isinstance(trabajo, dict):
+            errores.append(f"{ruta}: se esperaba un objeto")
+            continue
+        if trabajo.get('site') not in sitios:
+            errores.append(f"{ruta}.site: sitio no configurado ({trabajo.get('site')!r})")
+        tipos_validos = True
+        for clave, tipo in TIPOS_TRABAJO.items():
+            if clave in trabajo and not _tipo_valido(trabajo[clave], tipo):
+                errores.append(
+                    f"{ruta}.{clave}: se esperaba {_nombre_tipo(tipo)}, "
+                    f"no {type(trabajo[clave]).__name__} ({trabajo[clave]!r})"
+                )
+                tipos_validos = False
+        if not tipos_validos:
+            continue
+        try:
+            TareaProgramada(
+                trabajo.get('type'), trabajo.get('site'),
+                frecuencia=trabajo.get('frequency', 'daily'), hora=trabajo.get('time'),
+                tema=trabajo.get('topic'), jitter=trabajo.get('jitter_seconds', 0)
+            )
+        except (TypeError, ValueError) as e:
+            errores.append(f"{ruta}: {e}")
+
+
+def validar_configuracion(datos, ruta=None, mtime=None):
+    """
+    Valida el diccionario completo y construye la Configuracion.
+
+    :raises ErrorConfiguracion: Con todos los problemas encontrados
+    """
+    if not isinstance(datos, dict):
+        raise ErrorConfiguracion(["la raíz debe ser un objeto"], ruta)
+    errores = []
+
+    for seccion in datos:
+        if seccion not in SECCIONES:
+            logger.warning(f"Sección desconocida en la configuración: {seccion}")
+
+    openai_datos = datos.get('openai', {})
+    openai = _construir(ConfigOpenAI, openai_datos, 'openai', errores)
+    if isinstance(openai_datos, dict):
+        for clave, defaults in (('http_pool', DEFAULT_POOL_CONFIG), ('cache', DEFAULT_CACHE_CONFIG),
+                                ('batch', DEFAULT_BATCH_CONFIG)):
+            _validar_contra_defaults(openai_datos.get(clave, {}), defaults, f"openai.{clave}", errores)
+
+    sitios = {}
+    sitios_datos = datos.get('sites', {})
+    if not isinstance(sitios_datos, dict) or not sitios_datos:
+        errores.append("sites: debe definir al menos un sitio")
+    else:
+        for nombre, sitio_datos in sitios_datos.items():
+            sitio = _construir(ConfigSitio, sitio_datos, f"sites.{nombre}", errores, nombre=nombre)
+            if sitio is not None:
+                sitios[nombre] = sitio
+
+    content_settings = datos.get('content_settings', {})
+    if not isinstance(content_settings, dict):
+        errores.append("content_settings: se esperaba un objeto")
+        content_settings = {}
+    articulo = _construir(ConfigArticulo, content_settings.get('article', {}), 'content_settings.article', errores)
+    noticias = _construir(ConfigNoticias, content_settings.get('news', {}), 'content_settings.news', errores)
+
+    temas_articulos = datos.get('article_topics', [])
+    if not isinstance(temas_articulos, list) or not all(isinstance(t, str) and t for t in temas_articulos):
+        errores.append("article_topics: se esperaba una lista de textos")
+        temas_articulos = []
+    temas_noticias = []
+    if not isinstance(datos.get('news_topics', []), list):
+        errores.append("news_topics: se esperaba una lista")
+    else:
+        for i, tema in enumerate(datos.get('news_topics', [])):
+            tema = _construir(TemaNoticias, tema, f"news_topics[{i}]", errores)
+            if tema is not None:
+                temas_noticias.append(tema)
+
+    image_settings = datos.get('image_settings', {})
+    if not isinstance(image_settings, dict):
+        errores.append("image_settings: se esperaba un objeto")
+        image_settings = {}
+    salida = image_settings.get('output', {})
+    _validar_contra_defaults(salida, DEFAULT_OUTPUT_CONFIG, 'image_settings.output', errores)
+    if isinstance(salida, dict) and salida.get('format', DEFAULT_OUTPUT_CONFIG['format']) not in FORMATOS_SALIDA:
+        errores.append(f"image_settings.output.format: debe ser uno de {', '.join(FORMATOS_SALIDA)}")
+    sello = _construir(ConfigSello, image_settings.get('watermark', {}), 'image_settings.watermark', errores)
+    imagen = _construir(ConfigImagen, image_settings, 'image_settings', errores, watermark=sello)
+    if sello is not None and sello.enabled and not os.path.isfile(sello.path):
+        # Solo afecta a los artículos, así que no impide arrancar
+        logger.warning(f"image_settings.watermark.path: no existe el archivo {sello.path!r}")
+
+    metricas = _construir(ConfigMetricas, datos.get('metrics', {}), 'metrics', errores)
+    _validar_contra_defaults(datos.get('http', {}), DEFAULT_HTTP_CONFIG, 'http', errores)
+    _validar_contra_defaults(datos.get('archive', {}), DEFAULT_ARCHIVE_CONFIG, 'archive', errores)
+    _validar_programacion(datos.get('schedule', {}), sitios_datos if isinstance(sitios_datos, dict) else {}, errores)
+
+    if errores:
+        raise ErrorConfiguracion(errores, ruta)
+    return Configuracion(
+        openai=openai,
+        sitios=sitios,
+        articulo=articulo,
+        noticias=noticias,
+        temas_articulos=tuple(temas_articulos),
+        temas_noticias=tuple(temas_noticias),
+        imagen=imagen,
+        metricas=metricas,
+        datos=datos,
+        ruta=ruta,
+        mtime=mtime
+    )
+
+
+def como_configuracion(config):
+    """
+    Devuelve la Configuracion de 'config', que puede ser ya una Configuracion
+    o el diccionario de wordpress_config.json (por ejemplo, el que arman los
+    benchmarks), en cuyo caso se valida.
+
+    :raises ErrorConfiguracion: Si el diccionario no es válido
+    """
+    if isinstance(config, Configuracion):
+        return config
+    if not config:
+        raise ValueError("Configuración no proporcionada")
+    return validar_configuracion(config)
+
+
+def cargar_configuracion(config_path=None):
+    """
+    Lee y valida el archivo de configuración.
+
+    :raises ErrorConfiguracion: Si el archivo no existe, no es JSON o no es válido
+    """
+    ruta = str(config_path or DEFAULT_CONFIG_PATH)
+    try:
+        mtime = os.stat(ruta).st_mtime
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+    except OSError as e:
+        raise ErrorConfiguracion([f"no se pudo leer el archivo: {e.strerror}"], ruta)
+    except json.JSONDecodeError as e:
+        raise ErrorConfiguracion([f"JSON inválido en la línea {e.lineno}, columna {e.colno}: {e.msg}"], ruta)
+    configuracion = validar_configuracion(datos, ruta, mtime)
+    logger.info(f"Configuración cargada y validada desde {ruta}")
+    return configuracion
+
+
+class ConfiguracionRecargable:
+    """
+    Configuración compartida que se recarga cuando cambia el archivo.
+
+    actual() revisa la fecha de modificación como máximo una vez por
+    'intervalo' segundos. Si el archivo nuevo no es válido se registra el
+    error y se sigue usando la última configuración válida.
+    """
+
+    def __init__(self, config_path=None, intervalo=5.0):
+        self.configuracion = cargar_configuracion(config_path)
+        self.ruta = self.configuracion.ruta
+        self.intervalo = intervalo
+        self._ultima_revision = time.monotonic()
+        self._mtime_rechazado = None
+
+    def recargar(self, forzar=False):
+        """Vuelve a cargar el archivo si cambió (o siempre, con forzar); devuelve True si se recargó."""
+        self._ultima_revision = time.monotonic()
+        try:
+            mtime = os.stat(self.ruta).st_mtime
+        except OSError as e:
+            logger.warning(f"No se pudo revisar {self.ruta}: {e}")
+            return False
+        if not forzar and mtime in (self.configuracion.mtime, self._mtime_rechazado):
+            return False
+        try:
+            self.configuracion = cargar_configuracion(self.ruta)
+        except ErrorConfiguracion as e:
+            self._mtime_rechazado = mtime
+            logger.error(f"{e}\nSe conserva la configuración anterior")
+            return False
+        self._mtime_rechazado = None
+        logger.info("Configuración recargada")
+        return True
+
+    def actual(self):
+        if time.monotonic() - self._ultima_revision >= self.intervalo:
+            self.recargar()
+        return self.configuracion
+
+
+def configuracion_compartida(config_path=None):
+    """
+    Devuelve la configuración recargable del proceso; el archivo se lee y
+    valida la primera vez que se pide.
+    """
+    global _compartida
+    if _compartida is None:
+        _compartida = ConfiguracionRecargable(config_path)
+    return _compartida
@@ -0,0 +1,150 @@
+# Proyecto: Content Processor
+# Script: Perfil de arranque (importaciones e inicialización)
+# Autor: Eduardo Llaguno Velasco
+
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+
+# Perfil activo del proceso (None si no se pidió --startup-profile)
+_perfil = None
+
+
+class _CargadorMedido:
+    """Envuelve el loader de un módulo para medir su ejecución."""
+
+    def __init__(self, loader, perfil):
+        self._loader = loader
+        self._perfil = perfil
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        try:
+            with self._perfil._medir_modulo(module.__name__):
+                self._loader.exec_module(module)
+        finally:
+            # El módulo queda con su loader original
+            module.__loader__ = self._loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, nombre):
+        return getattr(self._loader, nombre)
+
+
+class _BuscadorMedido(MetaPathFinder):
+    """Finder que delega en los demás y envuelve el loader encontrado."""
+
+    def __init__(self, perfil):
+        self._perfil = perfil
+
+    def find_spec(self, nombre, path, target=None):
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, 'find_spec'):
+                continue
+            spec = buscador.find_spec(nombre, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _CargadorMedido(spec.loader, self._perfil)
+            return spec
+        return None
+
+
+class PerfilArranque:
+    """
+    Mide el tiempo de importación e inicialización de cada módulo y de las
+    fases de arranque marcadas con fase_arranque().
+
+    El tiempo propio de un módulo excluye el de los módulos que importa; el
+    acumulado los incluye, igual que python -X importtime.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.modulos = {}
+        self.fases = []
+        self._pila = []
+        self._buscador = _BuscadorMedido(self)
+
+    def activar(self):
+        sys.meta_path.insert(0, self._buscador)
+
+    def desactivar(self):
+        if self._buscador in sys.meta_path:
+            sys.meta_path.remove(self._buscador)
+
+    @contextmanager
+    def _medir_modulo(self, nombre):
+        self._pila.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            acumulado = time.perf_counter() - inicio
+            hijos = self._pila.pop()
+            if self._pila:
+                self._pila[-1] += acumulado
+            self.modulos[nombre] = (acumulado - hijos, acumulado)
+
+    @contextmanager
+    def fase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases.append((nombre, time.perf_counter() - inicio))
+
+    def reporte(self, limite=20):
+        """Texto con las fases, los paquetes y los módulos más costosos."""
+        paquetes = {}
+        for nombre, (propio, _) in self.modulos.items():
+            raiz = nombre.split('.')[0]
+            paquetes[raiz] = paquetes.get(raiz, 0.0) + propio
+
+        lineas = [f"Perfil de arranque ({len(self.modulos)} módulos importados)", "", "Fases:"]
+        for nombre, duracion in self.fases:
+            lineas.append(f"  {duracion * 1000:9.1f} ms  {nombre}")
+
+        lineas += ["", "Paquetes (tiempo propio de todos sus módulos):"]
+        for raiz, propio in sorted(paquetes.items(), key=lambda p: p[1], reverse=True)[:limite]:
+            lineas.append(f"  {propio * 1000:9.1f} ms  {raiz}")
+
+        lineas += ["", "Módulos (propio / acumulado):"]
+        for nombre, (propio, acumulado) in sorted(
+                self.modulos.items(), key=lambda m: m[1][1], reverse=True)[:limite]:
+            lineas.append(f"  {propio * 1000:9.1f} / {acumulado * 1000:9.1f} ms  {nombre}")
+
+        total_importacion = sum(propio for propio, _ in self.modulos.values())
+        lineas += [
+            "",
+            f"Total en importaciones: {total_importacion * 1000:.1f} ms; "
+            f"desde el inicio del perfil: {(time.perf_counter() - self.inicio) * 1000:.1f} ms"
+        ]
+        return "\n".join(lineas)
+
+
+def iniciar_perfil_arranque():
+    """Activa el perfil de arranque para el resto del proceso."""
+    global _perfil
+    if _perfil is None:
+        _perfil = PerfilArranque()
+        _perfil.activar()
+    return _perfil
+
+
+def obtener_perfil_arranque():
+    return _perfil
+
+
+@contextmanager
+def fase_arranque(nombre):
+    """Marca una fase de inicialización; no hace nada si el perfil no está activo."""
+    if _perfil is None:
+        yield
+        return
+    with _perfil.fase(nombre):
+        yield
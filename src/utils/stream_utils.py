@@ -0,0 +1,138 @@
+# Proyecto: Content Processor
+# Script: Post-proceso incremental de respuestas en streaming
+# Autor: Eduardo Llaguno Velasco
+
+import json
+import os
+import re
+import time
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PROGRESS_DIR = os.path.join(STORAGE_DIR, 'progreso')
+
+# Envolturas que el modelo añade a veces alrededor del HTML
+MARCADORES_DESCARTADOS = ('```html', '```', '<!DOCTYPE html>', '<html>', '</html>')
+
+# Cierres de bloque en los que se puede cortar el contenido sin dejar etiquetas abiertas
+CIERRE_BLOQUE = re.compile(r'</(?:p|ul|ol|table|blockquote)>', re.IGNORECASE)
+
+
+class LimpiadorHTMLIncremental:
+    """
+    Limpia el HTML de una respuesta a medida que llegan los fragmentos.
+
+    Quita las mismas envolturas que la limpieza de la respuesta completa y
+    cuenta las palabras del texto (fuera de las etiquetas). Retiene el final
+    del buffer cuando puede ser el inicio de un marcador partido entre dos
+    fragmentos.
+    """
+
+    def __init__(self, marcadores=MARCADORES_DESCARTADOS):
+        self.marcadores = marcadores
+        self.contenido = ''
+        self.palabras = 0
+        self._pendiente = ''
+        self._en_etiqueta = False
+        self._en_palabra = False
+
+    def _retener(self, texto):
+        """Longitud del sufijo de texto que es prefijo propio de algún marcador."""
+        for longitud in range(min(len(texto), max(map(len, self.marcadores)) - 1), 0, -1):
+            sufijo = texto[-longitud:]
+            if any(m.startswith(sufijo) and m != sufijo for m in self.marcadores):
+                return longitud
+        return 0
+
+    def _contar_palabras(self, texto):
+        for caracter in texto:
+            if self._en_etiqueta:
+                self._en_etiqueta = caracter != '>'
+            elif caracter == '<':
+                self._en_etiqueta = True
+                self._en_palabra = False
+            elif caracter.isspace():
+                self._en_palabra = False
+            elif not self._en_palabra:
+                self._en_palabra = True
+                self.palabras += 1
+
+    def _emitir(self, texto):
+        for marcador in self.marcadores:
+            texto = texto.replace(marcador, '')
+        self.contenido += texto
+        self._contar_palabras(texto)
+        return texto
+
+    def agregar(self, fragmento):
+        """Procesa un fragmento y devuelve el texto limpio que ya es definitivo."""
+        buffer = self._pendiente + fragmento
+        retenido = self._retener(buffer)
+        self._pendiente = buffer[len(buffer) - retenido:] if retenido else ''
+        return self._emitir(buffer[:len(buffer) - retenido])
+
+    def terminar(self):
+        """Procesa lo retenido al final de la respuesta."""
+        texto, self._pendiente = self._pendiente, ''
+        return self._emitir(texto)
+
+    def termina_en_bloque(self):
+        """True si el contenido termina justo después de un cierre de bloque."""
+        final = self.contenido.rstrip()
+        coincidencia = None
+        for coincidencia in CIERRE_BLOQUE.finditer(final, max(0, len(final) - 20)):
+            pass
+        return coincidencia is not None and coincidencia.end() == len(final)
+
+    def recortar_a_bloque(self):
+        """Corta el contenido en el último cierre de bloque completo."""
+        ultimo = None
+        for ultimo in CIERRE_BLOQUE.finditer(self.contenido):
+            pass
+        if ultimo is not None:
+            self.contenido = self.contenido[:ultimo.end()]
+        return self.contenido
+
+
+class ArchivoProgreso:
+    """
+    Archivo JSON con el estado de una generación en curso, para seguirla en vivo.
+
+    Se reescribe de forma atómica como máximo una vez por intervalo.
+    """
+
+    def __init__(self, ruta, tema, intervalo=1.0):
+        self.ruta = ruta
+        self.tema = tema
+        self.intervalo = intervalo
+        self.inicio = time.time()
+        self._ultima_escritura = 0.0
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+    def actualizar(self, limpiador, estado='generando', forzar=False):
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultima_escritura < self.intervalo:
+            return
+        self._ultima_escritura = ahora
+        temporal = f"{self.ruta}.tmp"
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'tema': self.tema,
+                    'estado': estado,
+                    'palabras': limpiador.palabras,
+                    'segundos': round(time.time() - self.inicio, 2),
+                    'contenido': limpiador.contenido
+                }, f, ensure_ascii=False)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir el archivo de progreso {self.ruta}: {e}")
+
+
+def ruta_progreso(tema, directorio=DEFAULT_PROGRESS_DIR):
+    """Ruta del archivo de progreso para una generación sobre el tema."""
+    fecha = time.strftime("%Y-%m-%d_%H-%M-%S")
+    seguro = "".join(c for c in tema if c.isalnum() or c in (' ', '-', '_')).strip()[:50]
+    return os.path.join(directorio, f"{fecha}_{seguro.replace(' ', '_')}.json")
@@ -0,0 +1,210 @@
+# Proyecto: Content Processor
+# Script: Caché local de IDs de categorías y etiquetas
+# Autor: Eduardo Llaguno Velasco
+
+import asyncio
+import hashlib
+import html
+import json
+import os
+import xmlrpc.client
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+from src.utils.wordpress_rest_utils import ClienteWordPressREST, url_cliente
+
+logger = get_logger(__name__)
+
+DEFAULT_TAXONOMY_CACHE_DIR = os.path.join(STORAGE_DIR, 'cache', 'taxonomias')
+
+TAXONOMIAS = ('category', 'post_tag')
+
+# Cachés compartidas, una por sitio
+_caches = {}
+
+
+def _clave_nombre(nombre):
+    # WordPress devuelve los nombres con entidades HTML ('A &amp; B')
+    return html.unescape(nombre).strip().lower()
+
+
+async def _multicall_xmlrpc(client, llamadas):
+    """
+    Ejecuta varias llamadas XML-RPC de WordPress en una sola petición (system.multicall).
+
+    :param llamadas: Lista de (método, argumentos extra después de blog_id/usuario/contraseña)
+    :return: Lista de resultados en el mismo orden; una llamada que falla no
+             interrumpe las demás y su resultado es el xmlrpc.client.Fault
+    """
+    def ejecutar():
+        multicall = xmlrpc.client.MultiCall(client.server)
+        for metodo, argumentos in llamadas:
+            getattr(multicall, metodo)(client.blog_id, client.username, client.password, *argumentos)
+        resultados = multicall()
+        salida = []
+        for indice in range(len(llamadas)):
+            try:
+                salida.append(resultados[indice])
+            except xmlrpc.client.Fault as e:
+                salida.append(e)
+        return salida
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, ejecutar)
+
+
+async def _listar_terminos(client, taxonomia):
+    """Descarga todos los términos de una taxonomía como diccionario nombre -> ID."""
+    if isinstance(client, ClienteWordPressREST):
+        terminos = await client.listar_terminos(taxonomia)
+        return {_clave_nombre(t['name']): t['id'] for t in terminos}
+
+    from wordpress_xmlrpc.methods import taxonomies
+
+    loop = asyncio.get_running_loop()
+    terminos = await loop.run_in_executor(None, client.call, taxonomies.GetTerms(taxonomia))
+    return {_clave_nombre(t.name): int(t.id) for t in terminos}
+
+
+async def _buscar_terminos(client, taxonomia, nombres):
+    """Busca solo los nombres indicados; devuelve los que ya existen en WordPress."""
+    if isinstance(client, ClienteWordPressREST):
+        grupos = await asyncio.gather(
+            *(client.buscar_terminos(taxonomia, n) for n in nombres), return_exceptions=True
+        )
+    else:
+        grupos = await _multicall_xmlrpc(
+            client, [('wp.getTerms', (taxonomia, {'search': n})) for n in nombres]
+        )
+        # Cada resultado de multicall es la lista de structs de wp.getTerms
+        grupos = [
+            grupo if isinstance(grupo, Exception) else [{'id': int(t['term_id']), 'name': t['name']} for t in grupo]
+            for grupo in grupos
+        ]
+
+    for nombre, grupo in zip(nombres, grupos):
+        if isinstance(grupo, Exception):
+            logger.warning(f"No se pudo buscar el término {taxonomia} '{nombre}': {grupo}")
+    grupos = [grupo for grupo in grupos if not isinstance(grupo, Exception)]
+
+    buscados = {_clave_nombre(n) for n in nombres}
+    return {
+        _clave_nombre(t['name']): t['id']
+        for grupo in grupos for t in grupo
+        if _clave_nombre(t['name']) in buscados
+    }
+
+
+async def _crear_terminos(client, taxonomia, nombres):
+    """
+    Crea varios términos en un solo lote y devuelve nombre -> ID.
+
+    Si la creación de alguno falla (por ejemplo, porque ya existe con un nombre
+    que la búsqueda no encontró), se vuelve a buscar y se continúa con los que
+    se resuelvan; los demás se omiten.
+    """
+    if isinstance(client, ClienteWordPressREST):
+        creados = await asyncio.gather(
+            *(client.crear_termino(taxonomia, n) for n in nombres), return_exceptions=True
+        )
+        ids = [t if isinstance(t, Exception) else t['id'] for t in creados]
+    else:
+        ids = await _multicall_xmlrpc(
+            client, [('wp.newTerm', ({'name': n, 'taxonomy': taxonomia},)) for n in nombres]
+        )
+
+    resueltos = {}
+    fallidos = []
+    for nombre, resultado in zip(nombres, ids):
+        if isinstance(resultado, Exception):
+            logger.warning(f"No se pudo crear el término {taxonomia} '{nombre}': {resultado}")
+            fallidos.append(nombre)
+        else:
+            resueltos[_clave_nombre(nombre)] = int(resultado)
+
+    if fallidos:
+        # WordPress guarda los nombres con entidades y la búsqueda compara el texto guardado
+        resueltos.update(await _buscar_terminos(client, taxonomia, [html.escape(n, quote=False) for n in fallidos]))
+        omitidos = [n for n in fallidos if _clave_nombre(n) not in resueltos]
+        if omitidos:
+            logger.warning(f"Se omiten {taxonomia} que no se pudieron crear ni encontrar: {omitidos}")
+    return resueltos
+
+
+class CacheTaxonomias:
+    """
+    Caché en disco de nombre de término -> ID para un sitio.
+
+    Se calienta con una descarga completa de categorías y etiquetas; después
+    solo se consultan los nombres que falten y los nuevos se crean en lote.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._datos = {'calentado': False, **{t: {} for t in TAXONOMIAS}}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._datos.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def _guardar(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self._datos, f, ensure_ascii=False)
+
+    async def calentar(self, client):
+        """Descarga todas las categorías y etiquetas del sitio."""
+        resultados = await asyncio.gather(*(_listar_terminos(client, t) for t in TAXONOMIAS))
+        for taxonomia, terminos in zip(TAXONOMIAS, resultados):
+            self._datos[taxonomia] = terminos
+        self._datos['calentado'] = True
+        self._guardar()
+        logger.info(
+            "Caché de taxonomías calentada: " +
+            ", ".join(f"{t}={len(self._datos[t])}" for t in TAXONOMIAS)
+        )
+
+    def invalidar(self):
+        """Descarta la caché; se volverá a calentar en el siguiente uso."""
+        self._datos = {'calentado': False, **{t: {} for t in TAXONOMIAS}}
+        self._guardar()
+
+    async def resolver(self, client, taxonomia, nombres, max_nuevos=None):
+        """
+        Convierte nombres de términos en IDs.
+
+        :param max_nuevos: Máximo de términos nuevos a crear (None sin límite).
+                           Los que excedan el límite se omiten.
+        :return: Lista de IDs en el orden de los nombres resueltos
+        """
+        async with self._lock:
+            if not self._datos['calentado']:
+                await self.calentar(client)
+
+            conocidos = self._datos[taxonomia]
+            faltantes = list(dict.fromkeys(n.strip() for n in nombres if _clave_nombre(n) not in conocidos))
+
+            if faltantes:
+                conocidos.update(await _buscar_terminos(client, taxonomia, faltantes))
+                por_crear = [n for n in faltantes if _clave_nombre(n) not in conocidos]
+                if max_nuevos is not None and len(por_crear) > max_nuevos:
+                    logger.info(f"Se omiten {taxonomia} nuevos por límite: {por_crear[max_nuevos:]}")
+                    por_crear = por_crear[:max_nuevos]
+                if por_crear:
+                    conocidos.update(await _crear_terminos(client, taxonomia, por_crear))
+                self._guardar()
+
+            ids = [conocidos[_clave_nombre(n)] for n in nombres if _clave_nombre(n) in conocidos]
+            return list(dict.fromkeys(ids))
+
+
+def obtener_cache_taxonomias(client, directorio=DEFAULT_TAXONOMY_CACHE_DIR):
+    """Devuelve la caché de taxonomías del sitio al que apunta el cliente."""
+    url = url_cliente(client)
+    cache = _caches.get(url)
+    if cache is None:
+        nombre = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json'
+        cache = CacheTaxonomias(os.path.join(directorio, nombre))
+        _caches[url] = cache
+    return cache
@@ -0,0 +1,140 @@
+# Proyecto: Content Processor
+# Script: Registro de URLs de noticias ya utilizadas
+# Autor: Eduardo Llaguno Velasco
+
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from src.utils.config_utils import STORAGE_DIR
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_URL_STORE_PATH = os.path.join(STORAGE_DIR, 'urls_usadas.sqlite')
+
+# Parámetros de seguimiento que no cambian el recurso
+PARAMETROS_IGNORADOS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'oc'}
+
+
+def normalizar_url(url):
+    """
+    Normaliza una URL para compararla: esquema y host en minúsculas, sin fragmento,
+    sin parámetros de seguimiento y sin barra final.
+    """
+    partes = urlsplit(url.strip())
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if k.lower() not in PARAMETROS_IGNORADOS
+    ))
+    path = partes.path.rstrip('/') or '/'
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), path, query, ''))
+
+
+class RegistroURLs:
+    """
+    Registro persistente (SQLite) de URLs usadas por sitio.
+
+    La consulta de pertenencia usa la clave primaria (sitio, url), y las
+    entradas más antiguas que 'max_age_days' se purgan al abrir el registro.
+    """
+
+    def __init__(self, path=DEFAULT_URL_STORE_PATH, max_age_days=30):
+        self.path = path
+        self.max_age_days = max_age_days
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                sitio TEXT NOT NULL,
+                url TEXT NOT NULL,
+                usado REAL NOT NULL,
+                PRIMARY KEY (sitio, url)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_urls_usado ON urls (usado);
+            CREATE TABLE IF NOT EXISTS huellas (
+                sitio TEXT NOT NULL,
+                huella INTEGER NOT NULL,
+                usado REAL NOT NULL,
+                PRIMARY KEY (sitio, huella)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_huellas_usado ON huellas (usado);
+            CREATE TABLE IF NOT EXISTS estado (
+                sitio TEXT PRIMARY KEY,
+                ultimo_post_id INTEGER NOT NULL
+            );
+        """)
+        self.purgar()
+
+    def contiene(self, sitio, url):
+        """Indica si la URL ya se usó en el sitio."""
+        fila = self._conn.execute(
+            "SELECT 1 FROM urls WHERE sitio = ? AND url = ?", (sitio, normalizar_url(url))
+        ).fetchone()
+        return fila is not None
+
+    def agregar(self, sitio, urls, usado=None):
+        """Registra una colección de URLs como usadas."""
+        usado = usado or time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO urls (sitio, url, usado) VALUES (?, ?, ?)",
+            [(sitio, normalizar_url(url), usado) for url in urls]
+        )
+        self._conn.commit()
+
+    def esta_vacio(self, sitio):
+        return self._conn.execute(
+            "SELECT 1 FROM urls WHERE sitio = ? LIMIT 1", (sitio,)
+        ).fetchone() is None
+
+    def purgar(self):
+        """Elimina las URLs más antiguas que la ventana configurada."""
+        if not self.max_age_days:
+            return
+        limite = time.time() - self.max_age_days * 86400
+        cursor = self._conn.execute("DELETE FROM urls WHERE usado < ?", (limite,))
+        self._conn.execute("DELETE FROM huellas WHERE usado < ?", (limite,))
+        self._conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Se purgaron {cursor.rowcount} URLs antiguas del registro")
+
+    def agregar_huellas(self, sitio, huellas, usado=None):
+        """Registra huellas SimHash de noticias usadas (se guardan como enteros con signo)."""
+        usado = usado or time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO huellas (sitio, huella, usado) VALUES (?, ?, ?)",
+            [(sitio, h - (1 << 64) if h >= 1 << 63 else h, usado) for h in huellas if h]
+        )
+        self._conn.commit()
+
+    def huellas(self, sitio):
+        """Devuelve las huellas SimHash vigentes del sitio como enteros sin signo."""
+        return [
+            h & ((1 << 64) - 1)
+            for (h,) in self._conn.execute("SELECT huella FROM huellas WHERE sitio = ?", (sitio,))
+        ]
+
+    def ultimo_post_id(self, sitio):
+        """Devuelve el ID del post más reciente ya revisado en WordPress (0 si ninguno)."""
+        fila = self._conn.execute(
+            "SELECT ultimo_post_id FROM estado WHERE sitio = ?", (sitio,)
+        ).fetchone()
+        return fila[0] if fila else 0
+
+    def guardar_ultimo_post_id(self, sitio, post_id):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO estado (sitio, ultimo_post_id) VALUES (?, ?)", (sitio, int(post_id))
+        )
+        self._conn.commit()
+
+    def importar_archivo(self, sitio, archivo, limite=5):
+        """
+        Importa las URLs de los últimos resúmenes de noticias del archivo de contenidos.
+        Se usa una sola vez, cuando el registro del sitio está vacío.
+        """
+        for entrada in archivo.buscar(sitio=sitio, tipo='noticias', limite=limite):
+            if entrada['metadata'].get('urls'):
+                self.agregar(sitio, entrada['metadata']['urls'], entrada['creado'])
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,215 @@
+# Proyecto: Content Processor
+# Script: Cliente asíncrono de la API REST de WordPress
+# Autor: Eduardo Llaguno Velasco
+
+import os
+import re
+import time
+import unicodedata
+from urllib.parse import quote
+from src.utils.logging_utils import get_logger
+
+# aiohttp se carga al crear el primer cliente:
+# wordpress_utils y taxonomy_utils importan este módulo aunque el sitio use XML-RPC
+
+logger = get_logger(__name__)
+
+# Clientes compartidos, indexados por (url base, usuario)
+_clientes_rest = {}
+
+# Tamaño de bloque para la subida de medios
+TAMANO_BLOQUE = 64 * 1024
+
+# Taxonomías de WordPress y su endpoint REST
+ENDPOINTS_TAXONOMIA = {
+    'category': 'categories',
+    'post_tag': 'tags'
+}
+
+
+def obtener_url_rest(site_config):
+    """
+    Devuelve la URL base de la API REST del sitio (ConfigSitio).
+    Usa 'rest_url' si existe; si no, la deriva de la URL de XML-RPC.
+    """
+    if site_config.rest_url:
+        return site_config.rest_url.rstrip('/')
+    url = site_config.url
+    if url.endswith('xmlrpc.php'):
+        url = url[:-len('xmlrpc.php')]
+    return url.rstrip('/') + '/wp-json/wp/v2'
+
+
+def _content_disposition(nombre):
+    """Cabecera Content-Disposition con un nombre ASCII seguro y el original en UTF-8."""
+    ascii_nombre = unicodedata.normalize('NFKD', nombre).encode('ascii', 'ignore').decode('ascii')
+    ascii_nombre = re.sub(r'[^A-Za-z0-9._-]+', '-', ascii_nombre).strip('-') or 'archivo'
+    return f"attachment; filename=\"{ascii_nombre}\"; filename*=UTF-8''{quote(nombre)}"
+
+
+async def _bloques_de_memoria(vista, tamano_bloque):
+    """Recorre un buffer en bloques sin copiarlo."""
+    for inicio in range(0, vista.nbytes, tamano_bloque):
+        yield vista[inicio:inicio + tamano_bloque]
+
+
+class ClienteWordPressREST:
+    """
+    Cliente asíncrono para /wp-json/wp/v2 con autenticación por contraseña de aplicación.
+
+    La sesión aiohttp se crea la primera vez que se usa y mantiene un pool de
+    conexiones keep-alive para todas las llamadas al sitio.
+    """
+
+    def __init__(self, base_url, username, password, config=None):
+        import aiohttp
+        from src.utils.http_utils import obtener_config_http
+
+        self.base_url = base_url
+        self._auth = aiohttp.BasicAuth(username, password)
+        self._http_config = obtener_config_http(config)
+        self._session = None
+
+    def _obtener_sesion(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                auth=self._auth,
+                connector=aiohttp.TCPConnector(limit_per_host=self._http_config['limit_per_host']),
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    connect=self._http_config['connect_timeout'],
+                    sock_read=self._http_config['timeout']
+                )
+            )
+        return self._session
+
+    async def _request(self, metodo, ruta, **kwargs):
+        """Realiza una petición a la API y devuelve el JSON de la respuesta."""
+        session = self._obtener_sesion()
+        async with session.request(metodo, f"{self.base_url}/{ruta.lstrip('/')}", **kwargs) as response:
+            if response.status >= 400:
+                detalle = await response.text()
+                logger.error(f"Error REST {response.status} en {metodo} {ruta}: {detalle[:500]}")
+                response.raise_for_status()
+            return await response.json()
+
+    async def subir_media(self, origen, nombre, mime, tamano_bloque=TAMANO_BLOQUE):
+        """
+        Sube un archivo a la biblioteca de medios enviando el cuerpo binario
+        por bloques, sin codificarlo en base64.
+
+        :param origen: Bytes/memoryview en memoria, ruta a un archivo o archivo abierto en modo binario
+        :return: Tupla (URL, ID) del adjunto creado
+        """
+        archivo_propio = None
+        if isinstance(origen, (bytes, bytearray, memoryview)):
+            vista = memoryview(origen)
+            tamano = vista.nbytes
+            cuerpo = _bloques_de_memoria(vista, tamano_bloque)
+        else:
+            if isinstance(origen, (str, os.PathLike)):
+                origen = archivo_propio = open(origen, 'rb')
+            tamano = os.fstat(origen.fileno()).st_size - origen.tell()
+            # aiohttp lee el archivo por bloques en el executor
+            cuerpo = origen
+
+        inicio = time.monotonic()
+        try:
+            respuesta = await self._request(
+                'POST', 'media',
+                data=cuerpo,
+                headers={
+                    'Content-Type': mime,
+                    'Content-Length': str(tamano),
+                    'Content-Disposition': _content_disposition(nombre)
+                }
+            )
+        finally:
+            if archivo_propio is not None:
+                archivo_propio.close()
+
+        duracion = max(time.monotonic() - inicio, 1e-6)
+        logger.info(
+            f"Subida de {nombre}: {tamano / 1024:.0f} KB en {duracion:.2f}s "
+            f"({tamano / 1024 / duracion:.0f} KB/s)"
+        )
+        return respuesta['source_url'], respuesta['id']
+
+    async def obtener_media(self, media_id):
+        """Devuelve los datos básicos de un adjunto, o None si no existe."""
+        import aiohttp
+
+        try:
+            return await self._request('GET', f'media/{media_id}', params={'_fields': 'id,source_url'})
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    async def listar_terminos(self, taxonomia):
+        """Descarga todos los términos de una taxonomía, página por página."""
+        endpoint = ENDPOINTS_TAXONOMIA[taxonomia]
+        terminos = []
+        pagina = 1
+        while True:
+            lote = await self._request(
+                'GET', endpoint,
+                params={'per_page': 100, 'page': pagina, 'hide_empty': 'false', '_fields': 'id,name'}
+            )
+            terminos.extend(lote)
+            if len(lote) < 100:
+                return terminos
+            pagina += 1
+
+    async def buscar_terminos(self, taxonomia, nombre):
+        """Busca términos por nombre."""
+        return await self._request(
+            'GET', ENDPOINTS_TAXONOMIA[taxonomia],
+            params={'search': nombre, 'per_page': 100, '_fields': 'id,name'}
+        )
+
+    async def crear_termino(self, taxonomia, nombre):
+        """Crea un término y devuelve su representación."""
+        return await self._request('POST', ENDPOINTS_TAXONOMIA[taxonomia], json={'name': nombre})
+
+    async def crear_post(self, datos):
+        """Crea un post y devuelve su ID."""
+        respuesta = await self._request('POST', 'posts', json=datos)
+        return respuesta['id']
+
+    async def obtener_posts(self, params):
+        """Lista posts con los parámetros de consulta de la API."""
+        return await self._request('GET', 'posts', params=params)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+def url_cliente(client):
+    """Identificador del sitio de un cliente WordPress (REST o XML-RPC)."""
+    return client.base_url if isinstance(client, ClienteWordPressREST) else client.url
+
+
+def obtener_cliente_rest(site_config, config=None):
+    """Devuelve el cliente REST compartido para el sitio."""
+    base_url = obtener_url_rest(site_config)
+    clave = (base_url, site_config.username)
+    client = _clientes_rest.get(clave)
+    if client is None:
+        password = site_config.application_password or site_config.password
+        client = ClienteWordPressREST(base_url, site_config.username, password, config)
+        _clientes_rest[clave] = client
+    return client
+
+
+async def cerrar_clientes_rest():
+    """Cierra las sesiones de todos los clientes REST."""
+    while _clientes_rest:
+        _, client = _clientes_rest.popitem()
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"Error al cerrar cliente REST de WordPress: {e}")
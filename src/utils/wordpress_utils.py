@@ -1,52 +1,144 @@
+import asyncio
+import mimetypes
 import os
 import json  # Añadimos esta importación
 import logging
-from wordpress_xmlrpc import Client, WordPressPost
-from wordpress_xmlrpc.methods import posts, media, taxonomies
-import xmlrpc.client
-from wordpress_xmlrpc.compat import xmlrpc_client
 from src.utils.logging_utils import get_logger
+from src.utils.wordpress_rest_utils import ClienteWordPressREST, obtener_cliente_rest, url_cliente
+from src.utils.metrics_utils import metricas
+from src.utils.startup_utils import fase_arranque
+from src.utils.media_index_utils import obtener_indice_medios, hash_contenido
+from src.utils.taxonomy_utils import obtener_cache_taxonomias
 from typing import List  # Añadimos esta importación
 
 logger = get_logger(__name__)
 
 def get_wordpress_client(site_config):
     """
-    Crea y devuelve un cliente de WordPress.
+    Crea y devuelve un cliente de WordPress para el sitio (ConfigSitio).
+
+    Con "backend": "rest" en la configuración del sitio se usa el cliente
+    asíncrono de la API REST; en otro caso, XML-RPC.
     """
+    if site_config.backend == 'rest':
+        return obtener_cliente_rest(site_config)
+
+    # wordpress_xmlrpc solo se carga para los sitios que usan XML-RPC
+    from wordpress_xmlrpc import Client
+
     try:
-        client = Client(site_config['url'], site_config['username'], site_config['password'])
+        with fase_arranque('conexión XML-RPC con WordPress'):
+            client = Client(site_config.url, site_config.username, site_config.password)
+        # Con contraseña de aplicación, los medios se suben por REST en binario
+        # en lugar de dentro del XML (base64)
+        if site_config.application_password:
+            client.cliente_media = obtener_cliente_rest(site_config)
         return client
     except Exception as e:
         logger.error(f"Error al conectar con WordPress: {e}")
         return None
 
-def upload_to_wordpress(client, file_path):
+async def upload_to_wordpress(client, file_path):
     """
     Sube un archivo a WordPress y devuelve la URL y el ID del archivo subido.
+
+    Si hay un cliente REST disponible, el archivo se envía en streaming desde disco.
     """
+    mime = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+    cliente_media = obtener_cliente_media(client)
     try:
-        with open(file_path, 'rb') as img:
-            data = {
-                'name': os.path.basename(file_path),
-                'type': 'image/jpeg',  # Ajusta esto según el tipo de archivo
-                'bits': xmlrpc_client.Binary(img.read())
-            }
+        if cliente_media is not None:
+            return await cliente_media.subir_media(file_path, os.path.basename(file_path), mime)
+
+        def subir():
+            from wordpress_xmlrpc.compat import xmlrpc_client
+            from wordpress_xmlrpc.methods import media
 
-        response = client.call(media.UploadFile(data))
-        return response['url'], response['id']
+            with open(file_path, 'rb') as img:
+                data = {
+                    'name': os.path.basename(file_path),
+                    'type': mime,
+                    'bits': xmlrpc_client.Binary(img.read())
+                }
+            response = client.call(media.UploadFile(data))
+            return response['url'], response['id']
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, subir)
     except Exception as e:
         logger.error(f"Error al subir archivo a WordPress: {e}")
         raise
 
-def subir_imagen_wordpress(wp_client, imagen, nombre):
+def obtener_cliente_media(client):
+    """
+    Devuelve el cliente REST a usar para subir medios, o None si solo hay XML-RPC.
+    """
+    if isinstance(client, ClienteWordPressREST):
+        return client
+    return getattr(client, 'cliente_media', None)
+
+async def subir_imagen_wordpress(wp_client, imagen, nombre, mime='image/png', extension='png'):
     """
     Sube una imagen a WordPress.
+
+    Si los mismos bytes ya se subieron al sitio y el adjunto sigue existiendo,
+    se reutiliza en lugar de subirlo de nuevo.
+
+    :return: Tupla (URL, ID) de la imagen subida
     """
+    sitio = url_cliente(wp_client)
+    indice = obtener_indice_medios()
+    huella = hash_contenido(imagen)
+    existente = indice.buscar(sitio, huella)
+    if existente is not None:
+        if await _medio_existe(wp_client, existente[1]):
+            logger.info(f"Imagen ya subida a WordPress, se reutiliza el adjunto {existente[1]}")
+            metricas.contar('cache_hits', cache='medios')
+            return existente
+        indice.olvidar(sitio, huella)
+    metricas.contar('cache_misses', cache='medios')
+
     logger.info(f"Subiendo imagen a WordPress: {nombre}")
+    cliente_media = obtener_cliente_media(wp_client)
+    with metricas.medir('media_upload'):
+        if cliente_media is not None:
+            try:
+                respuesta = await cliente_media.subir_media(imagen, f'{nombre}.{extension}', mime)
+                logger.info("Imagen subida exitosamente a WordPress")
+            except Exception as e:
+                logger.error(f"Error al subir la imagen: {e}")
+                raise
+        else:
+            loop = asyncio.get_running_loop()
+            respuesta = await loop.run_in_executor(
+                None, _subir_imagen_xmlrpc, wp_client, imagen, nombre, mime, extension
+            )
+    metricas.contar('bytes', len(imagen), etapa='media_upload', direccion='salida')
+
+    indice.guardar(sitio, huella, *respuesta)
+    return respuesta
+
+async def _medio_existe(wp_client, media_id):
+    """Comprueba que un adjunto siga existiendo en WordPress."""
+    try:
+        cliente_media = obtener_cliente_media(wp_client)
+        if cliente_media is not None:
+            return await cliente_media.obtener_media(media_id) is not None
+        from wordpress_xmlrpc.methods import media
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, wp_client.call, media.GetMediaItem(media_id))
+        return True
+    except Exception as e:
+        logger.warning(f"No se pudo verificar el adjunto {media_id}: {e}")
+        return False
+
+def _subir_imagen_xmlrpc(wp_client, imagen, nombre, mime, extension):
+    from wordpress_xmlrpc.methods import media
+
     datos = {
-        'name': f'{nombre}.png',
-        'type': 'image/png',
+        'name': f'{nombre}.{extension}',
+        'type': mime,
         'bits': imagen
     }
 
@@ -58,7 +150,7 @@ def subir_imagen_wordpress(wp_client, imagen, nombre):
         logger.error(f"Error al subir la imagen: {e}")
         raise
 
-def publicar_en_wordpress(client, titulo, contenido, categorias=None, tags=None, imagen_destacada_id=None, estado='draft'):
+async def publicar_en_wordpress(client, titulo, contenido, categorias=None, tags=None, imagen_destacada_id=None, estado='draft', max_tags_nuevos=None):
     """
     Publica un post en WordPress.
     
@@ -70,35 +162,94 @@ def publicar_en_wordpress(client, titulo, contenido, categorias=None, tags=None,
         tags: Lista de etiquetas o etiqueta única
         imagen_destacada_id: ID de la imagen destacada
         estado: Estado del post ('draft' o 'publish')
+        max_tags_nuevos: Máximo de etiquetas nuevas que se pueden crear (None sin límite)
     """
+    terms_names = {}
+    
+    # Procesar categorías
+    if categorias:
+        if isinstance(categorias, str):
+            categorias = [categorias]
+        terms_names['category'] = categorias
+    else:
+        terms_names['category'] = ['Sin categoría']
+        
+    # Procesar tags
+    if tags:
+        if isinstance(tags, str):
+            tags = [tags]
+        # Limpiar y filtrar tags
+        tags = [tag.strip() for tag in tags if tag.strip()]
+        if tags:
+            terms_names['post_tag'] = tags
+
+    # Convertir nombres a IDs con la caché local de taxonomías
+    cache_taxonomias = obtener_cache_taxonomias(client)
+    try:
+        logger.info(f"Asignando términos: {terms_names}")
+        terms_ids = {
+            'category': await cache_taxonomias.resolver(client, 'category', terms_names['category'])
+        }
+        if terms_names.get('post_tag'):
+            terms_ids['post_tag'] = await cache_taxonomias.resolver(
+                client, 'post_tag', terms_names['post_tag'], max_nuevos=max_tags_nuevos
+            )
+    except Exception as e:
+        logger.error(f"Error al resolver categorías y etiquetas: {e}")
+        raise
+
+    try:
+        with metricas.medir('post_create'):
+            if isinstance(client, ClienteWordPressREST):
+                return await _publicar_rest(client, titulo, contenido, terms_ids, imagen_destacada_id, estado)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, _publicar_xmlrpc, client, titulo, contenido, terms_ids, imagen_destacada_id, estado
+            )
+    except Exception:
+        # Un ID obsoleto (término borrado en WordPress) invalida la caché para el siguiente intento
+        cache_taxonomias.invalidar()
+        raise
+
+async def _publicar_rest(client, titulo, contenido, terms_ids, imagen_destacada_id, estado):
+    try:
+        datos = {
+            'title': titulo.strip(),
+            'content': contenido,
+            'status': estado,
+            'categories': terms_ids['category']
+        }
+        if terms_ids.get('post_tag'):
+            datos['tags'] = terms_ids['post_tag']
+        if imagen_destacada_id:
+            datos['featured_media'] = imagen_destacada_id
+
+        post_id = await client.crear_post(datos)
+        logger.info(f"Post creado exitosamente con ID: {post_id}")
+        return post_id
+    except Exception as e:
+        logger.error(f"Error al publicar en WordPress: {e}")
+        raise
+
+def _publicar_xmlrpc(client, titulo, contenido, terms_ids, imagen_destacada_id, estado):
+    from wordpress_xmlrpc import WordPressPost, WordPressTerm
+    from wordpress_xmlrpc.methods import posts
+
     try:
         post = WordPressPost()
         post.title = titulo.strip()
         post.content = contenido
         post.post_status = estado
-        
-        terms_names = {}
-        
-        # Procesar categorías
-        if categorias:
-            if isinstance(categorias, str):
-                categorias = [categorias]
-            terms_names['category'] = categorias
-        else:
-            terms_names['category'] = ['Sin categoría']
-            
-        # Procesar tags
-        if tags:
-            if isinstance(tags, str):
-                tags = [tags]
-            # Limpiar y filtrar tags
-            tags = [tag.strip() for tag in tags if tag.strip()]
-            if tags:
-                terms_names['post_tag'] = tags
-
-        # Asignar términos al post
-        post.terms_names = terms_names
-        logger.info(f"Asignando términos: {terms_names}")
+
+        # Asignar términos al post por ID
+        post.terms = []
+        for taxonomia, ids in terms_ids.items():
+            for term_id in ids:
+                termino = WordPressTerm()
+                termino.id = term_id
+                termino.taxonomy = taxonomia
+                post.terms.append(termino)
 
         if imagen_destacada_id:
             post.thumbnail = imagen_destacada_id
@@ -113,4 +264,56 @@ def publicar_en_wordpress(client, titulo, contenido, categorias=None, tags=None,
         logger.error(f"Error al publicar en WordPress: {e}")
         raise
     
+async def obtener_posts_recientes(client, numero=5, desplazamiento=0):
+    """
+    Obtiene los posts publicados más recientes, del más nuevo al más antiguo.
+
+    :param desplazamiento: Posts que se saltan, para leer páginas sucesivas
+
+    :return: Lista de diccionarios con 'id', 'content' y 'categorias' (nombres)
+    """
+    if isinstance(client, ClienteWordPressREST):
+        resultados = await client.obtener_posts({
+            'per_page': numero,
+            'offset': desplazamiento,
+            'status': 'publish',
+            'orderby': 'id',
+            'order': 'desc',
+            '_embed': 'wp:term'
+        })
+        return [
+            {
+                'id': post['id'],
+                'content': post['content']['rendered'],
+                'categorias': [
+                    termino['name']
+                    for grupo in post.get('_embedded', {}).get('wp:term', [])
+                    for termino in grupo
+                    if termino.get('taxonomy') == 'category'
+                ]
+            }
+            for post in resultados
+        ]
+
+    from wordpress_xmlrpc.methods import posts
+
+    query = {
+        'number': numero,
+        'offset': desplazamiento,
+        'post_type': 'post',
+        'post_status': 'publish',
+        'orderby': 'ID',
+        'order': 'DESC'
+    }
+    loop = asyncio.get_running_loop()
+    resultados = await loop.run_in_executor(None, client.call, posts.GetPosts(query))
+    return [
+        {
+            'id': int(post.id),
+            'content': post.content,
+            'categorias': [term.name for term in post.terms if term.taxonomy == 'category']
+        }
+        for post in resultados
+    ]
+
 # Asegúrate de que todas las funciones que necesitas exportar estén definidas aquí
\ No newline at end of file